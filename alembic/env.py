@@ -27,6 +27,13 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Tables gérées hors des modèles (index FTS5 et ses tables internes) :
+# l'autogénération ne doit ni les créer ni proposer de les supprimer.
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not (name or "").startswith("book_fts")
+    return True
+
 # Remplacer l'URL de la base de données par celle de la configuration
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
@@ -38,6 +45,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -53,7 +61,8 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,65 @@
+"""add book full-text search index
+
+Revision ID: 7c1e2f4a9b10
+Revises: 3bddbe16bd79
+Create Date: 2026-10-17 09:12:44.105233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2f4a9b10'
+down_revision: Union[str, None] = '3bddbe16bd79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 n'existe que sous SQLite : les autres bases gardent la recherche LIKE
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5(
+            title, author, isbn, description,
+            content='book', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN
+            INSERT INTO book_fts(rowid, title, author, isbn, description)
+            VALUES (new.id, new.title, new.author, new.isbn, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author, isbn, description)
+            VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF title, author, isbn, description ON book BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author, isbn, description)
+            VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+            INSERT INTO book_fts(rowid, title, author, isbn, description)
+            VALUES (new.id, new.title, new.author, new.isbn, new.description);
+        END
+    """)
+    # Indexer les livres déjà présents
+    op.execute("INSERT INTO book_fts(book_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS book_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS book_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS book_fts_ai")
+    op.execute("DROP TABLE IF EXISTS book_fts")
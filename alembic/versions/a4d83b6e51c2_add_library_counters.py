@@ -0,0 +1,56 @@
+"""add library counters and monthly loan rollup
+
+Revision ID: a4d83b6e51c2
+Revises: 7c1e2f4a9b10
+Create Date: 2026-10-17 11:03:27.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d83b6e51c2'
+down_revision: Union[str, None] = '7c1e2f4a9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les tables sont créées vides : elles sont remplies par la migration
+    # f4c2a8d17b63 (ou via scripts/rebuild_counters.py).
+    op.create_table('library_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_library_counters_id'), 'library_counters', ['id'], unique=False)
+    op.create_index(op.f('ix_library_counters_name'), 'library_counters', ['name'], unique=True)
+    op.create_table('loan_monthly_count',
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('loan_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_loan_monthly_count_id'), 'loan_monthly_count', ['id'], unique=False)
+    op.create_index(op.f('ix_loan_monthly_count_month'), 'loan_monthly_count', ['month'], unique=True)
+    op.create_index('idx_loan_return_due', 'loan', ['return_date', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_loan_return_due', table_name='loan')
+    op.drop_index(op.f('ix_loan_monthly_count_month'), table_name='loan_monthly_count')
+    op.drop_index(op.f('ix_loan_monthly_count_id'), table_name='loan_monthly_count')
+    op.drop_table('loan_monthly_count')
+    op.drop_index(op.f('ix_library_counters_name'), table_name='library_counters')
+    op.drop_index(op.f('ix_library_counters_id'), table_name='library_counters')
+    op.drop_table('library_counters')
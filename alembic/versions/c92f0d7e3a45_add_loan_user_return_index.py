@@ -0,0 +1,27 @@
+"""add loan (user_id, return_date) index
+
+Revision ID: c92f0d7e3a45
+Revises: a4d83b6e51c2
+Create Date: 2026-10-17 13:41:09.274118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c92f0d7e3a45'
+down_revision: Union[str, None] = 'a4d83b6e51c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_loan_user_return', 'loan', ['user_id', 'return_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_loan_user_return', table_name='loan')
@@ -0,0 +1,27 @@
+"""add book_category (category_id, book_id) index
+
+Revision ID: e3b71a9d5c28
+Revises: c92f0d7e3a45
+Create Date: 2026-10-17 15:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b71a9d5c28'
+down_revision: Union[str, None] = 'c92f0d7e3a45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_book_category_category_book', 'book_category', ['category_id', 'book_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_book_category_category_book', table_name='book_category')
@@ -0,0 +1,82 @@
+"""seed library counters and monthly loan rollup
+
+Revision ID: f4c2a8d17b63
+Revises: e3b71a9d5c28
+Create Date: 2026-10-17 16:20:41.093512
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c2a8d17b63'
+down_revision: Union[str, None] = 'e3b71a9d5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+book = sa.table('book', sa.column('id'), sa.column('quantity'))
+user = sa.table('user', sa.column('id'), sa.column('is_active'))
+loan = sa.table('loan', sa.column('id'), sa.column('loan_date'), sa.column('return_date'))
+library_counters = sa.table(
+    'library_counters', sa.column('name'), sa.column('value'), sa.column('created_at'), sa.column('updated_at')
+)
+loan_monthly_count = sa.table(
+    'loan_monthly_count', sa.column('month'), sa.column('loan_count'), sa.column('created_at'), sa.column('updated_at')
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les compteurs sont remplis ici plutôt qu'à la première lecture des statistiques :
+    # les lectures n'écrivent plus (deux premières lectures concurrentes se heurtaient
+    # à l'unicité de library_counters.name).
+    bind = op.get_bind()
+    if bind.execute(sa.select(sa.func.count()).select_from(library_counters)).scalar():
+        return
+
+    active = lambda condition: sa.func.coalesce(sa.func.sum(sa.case((condition, 1), else_=0)), 0)
+    total_books, unique_books = bind.execute(
+        sa.select(sa.func.coalesce(sa.func.sum(book.c.quantity), 0), sa.func.count(book.c.id))
+    ).one()
+    total_users, active_users = bind.execute(
+        sa.select(sa.func.count(user.c.id), active(user.c.is_active == sa.true()))
+    ).one()
+    total_loans, active_loans = bind.execute(
+        sa.select(sa.func.count(loan.c.id), active(loan.c.return_date.is_(None)))
+    ).one()
+    now = datetime.utcnow()
+    counters = {
+        "total_books": total_books,
+        "unique_books": unique_books,
+        "total_users": total_users,
+        "active_users": active_users,
+        "total_loans": total_loans,
+        "active_loans": active_loans,
+    }
+    op.bulk_insert(library_counters, [
+        {"name": name, "value": value, "created_at": now, "updated_at": now}
+        for name, value in counters.items()
+    ])
+
+    if bind.dialect.name == "sqlite":
+        month = sa.func.strftime("%Y-%m", loan.c.loan_date)
+    else:
+        month = sa.func.to_char(loan.c.loan_date, "YYYY-MM")
+    months = bind.execute(sa.select(month, sa.func.count(loan.c.id)).group_by(month)).all()
+    bind.execute(sa.delete(loan_monthly_count))
+    if months:
+        op.bulk_insert(loan_monthly_count, [
+            {"month": value, "loan_count": count, "created_at": now, "updated_at": now}
+            for value, count in months
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.delete(loan_monthly_count))
+    op.execute(sa.delete(library_counters))
@@ -381,11 +381,22 @@ const Api = {
 
     // =================== LOANS API FUNCTIONS ===================
 
+    // Les listes d'emprunts renvoient une vue compacte (book_title, user_full_name...) :
+    // on reconstruit les objets book/user attendus par l'affichage
+    withLoanRelations: function(loans) {
+        if (!Array.isArray(loans)) return loans;
+        return loans.map(loan => ({
+            ...loan,
+            book: loan.book || { id: loan.book_id, title: loan.book_title, author: loan.book_author, isbn: loan.book_isbn },
+            user: loan.user || { id: loan.user_id, full_name: loan.user_full_name, email: loan.user_email }
+        }));
+    },
+
     // Get all loans (admin only)
     getLoans: async function(skip = 0, limit = 100) {
         console.log('Fetching loans list...');
         try {
-            const result = await this.call(`/loans/?skip=${skip}&limit=${limit}`);
+            const result = this.withLoanRelations(await this.call(`/loans/?skip=${skip}&limit=${limit}`));
             console.log('Loans list fetched successfully:', result);
             return result;
         } catch (error) {
@@ -394,22 +405,33 @@ const Api = {
         }
     },
 
-    // Get current user's own loans
-    getMyLoans: async function() {
-        const user = Auth.getUser();
-        if (!user || !user.id) {
-            throw new Error('Utilisateur non authentifié');
-        }
-        return this.call(`/loans/user/${user.id}`);
+    // Get one page of the current user's loans (most recent first) with counts per status
+    getMyLoansPage: async function(status = null, limit = 20, after = null) {
+        const queryParams = new URLSearchParams({ limit: limit });
+        if (status) queryParams.append('status', status);
+        if (after) queryParams.append('after', after);
+        const page = await this.call(`/loans/me?${queryParams.toString()}`);
+        page.items = this.withLoanRelations(page.items);
+        return page;
     },
 
+    // Get all of the current user's loans, optionally filtered by status (active, overdue, returned)
+    getMyLoans: async function(status = null) {
+        const loans = [];
+        let after = null;
+        do {
+            const page = await this.getMyLoansPage(status, 100, after);
+            loans.push(...page.items);
+            after = page.next_cursor;
+        } while (after);
+        return loans;
+    },
 
     // Get current user's active loans
     getMyActiveLoans: async function() {
         console.log('Fetching current user active loans...');
         try {
-            const allLoans = await this.getMyLoans();
-            const activeLoans = allLoans.filter(loan => !loan.return_date);
+            const activeLoans = await this.getMyLoans('active');
             console.log('My active loans:', activeLoans);
             return activeLoans;
         } catch (error) {
@@ -422,11 +444,7 @@ const Api = {
     getMyOverdueLoans: async function() {
         console.log('Fetching current user overdue loans...');
         try {
-            const allLoans = await this.getMyLoans();
-            const now = new Date();
-            const overdueLoans = allLoans.filter(loan => 
-                !loan.return_date && new Date(loan.due_date) < now
-            );
+            const overdueLoans = await this.getMyLoans('overdue');
             console.log('My overdue loans:', overdueLoans);
             return overdueLoans;
         } catch (error) {
@@ -508,7 +526,7 @@ const Api = {
     getLoansByUser: async function(userId) {
         console.log(`Fetching loans for user: ${userId}`);
         try {
-            const result = await this.call(`/loans/user/${userId}`);
+            const result = this.withLoanRelations(await this.call(`/loans/user/${userId}`));
             console.log('User loans fetched successfully:', result);
             return result;
         } catch (error) {
@@ -521,7 +539,7 @@ const Api = {
     getActiveLoans: async function() {
         console.log('Fetching active loans...');
         try {
-            const result = await this.call('/loans/active/');
+            const result = this.withLoanRelations(await this.call('/loans/active/'));
             console.log('Active loans fetched successfully:', result);
             return result;
         } catch (error) {
@@ -534,7 +552,7 @@ const Api = {
     getLoansByBook: async function(bookId) {
         console.log(`Fetching loans for book: ${bookId}`);
         try {
-            const result = await this.call(`/loans/book/${bookId}`);
+            const result = this.withLoanRelations(await this.call(`/loans/book/${bookId}`));
             console.log('Book loans fetched successfully:', result);
             return result;
         } catch (error) {
@@ -547,7 +565,7 @@ const Api = {
     getOverdueLoans: async function() {
         console.log('Fetching overdue loans...');
         try {
-            const result = await this.call('/loans/overdue/');
+            const result = this.withLoanRelations(await this.call('/loans/overdue/'));
             console.log('Overdue loans fetched successfully:', result);
             return result;
         } catch (error) {
@@ -648,10 +666,11 @@ const Api = {
     // =================== CATEGORIES API FUNCTIONS ===================
 
     // Get all categories
-    getCategories: async function(skip = 0, limit = 100) {
+    // withCounts: ajoute book_count à chaque catégorie (un seul GROUP BY côté serveur)
+    getCategories: async function(skip = 0, limit = 100, withCounts = false) {
         console.log('Fetching categories list...');
         try {
-            const result = await this.call(`/categories/?skip=${skip}&limit=${limit}`);
+            const result = await this.call(`/categories/?skip=${skip}&limit=${limit}${withCounts ? '&with_counts=true' : ''}`);
             console.log('Categories list fetched successfully:', result);
             return result;
         } catch (error) {
@@ -660,6 +679,13 @@ const Api = {
         }
     },
 
+    // Get one page of a category's books (pass next_cursor as after for the next page)
+    getCategoryBooks: async function(id, limit = 100, after = null) {
+        const queryParams = new URLSearchParams({ limit: limit });
+        if (after) queryParams.append('after', after);
+        return this.call(`/categories/${id}/books?${queryParams.toString()}`);
+    },
+
     // Get a specific category by ID
     getCategory: async function(id) {
         console.log(`Fetching category with ID: ${id}`);
@@ -743,18 +743,12 @@ const App = {
             let loanStats = null;
             if (!user.is_admin) {
                 try {
-                    const [myLoans, myActiveLoans, myOverdueLoans] = await Promise.all([
-                        Api.getMyLoans(),
-                        Api.getMyActiveLoans(),
-                        Api.getMyOverdueLoans()
-                    ]);
-                    
+                    // Une seule requête : les 3 emprunts les plus récents et les totaux par statut
+                    const myLoans = await Api.getMyLoansPage(null, 3);
+
                     loanStats = {
-                        total: myLoans.length,
-                        active: myActiveLoans.length,
-                        overdue: myOverdueLoans.length,
-                        returned: myLoans.filter(l => l.return_date).length,
-                        recentLoans: myLoans.slice(0, 3) // Get 3 most recent loans
+                        ...myLoans.summary,
+                        recentLoans: myLoans.items
                     };
                 } catch (loanError) {
                     console.warn('Error fetching loan data for profile:', loanError);
@@ -2078,8 +2072,7 @@ const App = {
                     loans = await Api.getMyOverdueLoans();
                     break;
                 case 'returned':
-                    const allLoans = await Api.getMyLoans();
-                    loans = allLoans.filter(loan => loan.return_date);
+                    loans = await Api.getMyLoans('returned');
                     break;
                 default:
                     loans = await Api.getMyLoans();
@@ -0,0 +1,46 @@
+import argparse
+import sys
+import os
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import SessionLocal
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.services.books import BookService
+from src.utils.importers import IMPORT_FORMATS, detect_format, iter_records
+
+def main():
+    parser = argparse.ArgumentParser(description="Importe un catalogue de livres (CSV ou JSONL).")
+    parser.add_argument("path", help="Fichier à importer ('-' pour l'entrée standard)")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Déduit de l'extension par défaut")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Nombre de lignes par lot (un commit par lot)")
+    parser.add_argument("--update-existing", action="store_true", help="Met à jour les ISBN déjà présents")
+    args = parser.parse_args()
+
+    format = args.format or detect_format(None if args.path == "-" else args.path)
+    db = SessionLocal()
+    try:
+        service = BookService(BookRepository(Book, db))
+        if args.path == "-":
+            records = iter_records(sys.stdin, format)
+            report = service.bulk_import(records, batch_size=args.batch_size, update_existing=args.update_existing)
+        else:
+            with open(args.path, encoding="utf-8-sig", newline="") as lines:
+                records = iter_records(lines, format)
+                report = service.bulk_import(records, batch_size=args.batch_size, update_existing=args.update_existing)
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        print(f"ligne {error['line']} ({error['isbn']}): {error['message']}", file=sys.stderr)
+    print(
+        f"{report['received']} lignes lues, {report['created']} créées, {report['updated']} mises à jour, "
+        f"{report['skipped']} ignorées, {report['failed']} en erreur "
+        f"en {report['duration_seconds']} s ({report['rows_per_second']} lignes/s)"
+    )
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
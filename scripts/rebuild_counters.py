@@ -0,0 +1,20 @@
+import sys
+import os
+
+# Ajouter le répertoire parent au chemin Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db.session import SessionLocal
+from src.services.stats import StatsService
+
+def main():
+    db = SessionLocal()
+    try:
+        counters = StatsService(db).rebuild_counters()
+        for name, value in counters.items():
+            print(f"{name}: {value}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
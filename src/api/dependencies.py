@@ -1,42 +1,38 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Optional
 
-from ..db.session import get_db
+from ..db.session import get_async_read_db, get_read_db
 from ..models.users import User
-from ..repositories.users import UserRepository
-from ..services.users import UserService
+from ..repositories.users import AsyncUserRepository, UserRepository
+from ..services.users import UserService, cache_auth_user, get_cached_auth_user
 from ..api.schemas.token import TokenPayload
-from ..utils.security import ALGORITHM
+from ..api.schemas.users import AuthUser
+from ..utils.security import decode_access_token
 from ..config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def decode_token(token: str) -> TokenPayload:
     """
-    Dépendance pour obtenir l'utilisateur actuel à partir du token JWT.
+    Décode et valide le token JWT.
     """
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        payload = decode_access_token(token)
+        return TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Impossible de valider les informations d'identification",
         )
-    
-    repository = UserRepository(User, db)
-    service = UserService(repository)
-    user = service.get(id=token_data.sub)
-    
+
+
+def _check_found(user: Optional[AuthUser]) -> AuthUser:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -45,29 +41,86 @@ def get_current_user(
     return user
 
 
-def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
-    """
-    Dépendance pour obtenir l'utilisateur actif actuel.
-    """
-    if not current_user.is_active:
+def _check_active(user: AuthUser) -> AuthUser:
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Utilisateur inactif",
         )
-    return current_user
+    return user
 
 
-def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    """
-    Dépendance pour obtenir l'utilisateur administrateur actuel.
-    """
-    if not current_user.is_admin:
+def _check_admin(user: AuthUser) -> AuthUser:
+    if not user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Privilèges insuffisants",
         )
-    return current_user
\ No newline at end of file
+    return user
+
+
+def get_current_user(
+    db: Session = Depends(get_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> AuthUser:
+    """
+    Dépendance pour obtenir l'utilisateur actuel à partir du token JWT.
+    Seuls les champs d'authentification sont chargés, depuis le cache par processus si possible.
+    """
+    token_data = decode_token(token)
+    
+    repository = UserRepository(User, db)
+    service = UserService(repository)
+    return _check_found(service.get_auth_user(id=token_data.sub))
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> AuthUser:
+    """
+    Variante asynchrone de get_current_user, pour les routes async def.
+    """
+    token_data = decode_token(token)
+    auth_user = get_cached_auth_user(token_data.sub)
+    if auth_user is None:
+        user = await AsyncUserRepository(User, db).get(id=token_data.sub)
+        if user:
+            auth_user = cache_auth_user(user)
+    return _check_found(auth_user)
+
+
+def get_current_active_user(
+    current_user: AuthUser = Depends(get_current_user),
+) -> AuthUser:
+    """
+    Dépendance pour obtenir l'utilisateur actif actuel.
+    """
+    return _check_active(current_user)
+
+
+async def get_current_active_user_async(
+    current_user: AuthUser = Depends(get_current_user_async),
+) -> AuthUser:
+    """
+    Variante asynchrone de get_current_active_user.
+    """
+    return _check_active(current_user)
+
+
+def get_current_admin_user(
+    current_user: AuthUser = Depends(get_current_active_user),
+) -> AuthUser:
+    """
+    Dépendance pour obtenir l'utilisateur administrateur actuel.
+    """
+    return _check_admin(current_user)
+
+
+async def get_current_admin_user_async(
+    current_user: AuthUser = Depends(get_current_active_user_async),
+) -> AuthUser:
+    """
+    Variante asynchrone de get_current_admin_user.
+    """
+    return _check_admin(current_user)
@@ -7,6 +7,7 @@ from .auth import router as auth_router
 from .stats import router as stats_router
 from .categories import router as categories_router
 from .admin import router as admin_router
+from .export import router as export_router
 
 api_router = APIRouter()
 
@@ -17,3 +18,4 @@ api_router.include_router(loans_router, prefix="/loans", tags=["loans"])
 api_router.include_router(stats_router, prefix="/stats", tags=["stats"])
 api_router.include_router(categories_router, prefix="/categories", tags=["categories"])
 api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
+api_router.include_router(export_router, prefix="/export", tags=["export"])
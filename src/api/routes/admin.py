@@ -1,22 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from ..dependencies import get_db, get_current_user
-from ...models import User, Loan
-from typing import List
+from ...db.session import get_read_db
+from ..dependencies import get_current_user
+from ...models import User
+from ...repositories.users import UserRepository
+from ...utils.pagination import PaginationParams, paginate_cursor
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+
+def _user_loans(user: User) -> Dict[str, Any]:
+    return {
+        "user": {"id": user.id, "email": user.email},
+        "loans": [
+            {"book_id": loan.book_id, "due_date": loan.due_date, "return_date": loan.return_date}
+            for loan in user.loans
+        ]
+    }
+
+
+def _stream_users_loans(db: Session, repository: UserRepository) -> Iterator[str]:
+    try:
+        for user in repository.iter_with_loans():
+            yield json.dumps(jsonable_encoder(_user_loans(user))) + "\n"
+    finally:
+        db.close()
+
+
 @router.get("/users_loans")
-def list_users_loans(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def list_users_loans(
+    db: Session = Depends(get_read_db),
+    cursor: bool = Query(False, description="Renvoie une page {items, size, next_cursor} au lieu de la liste complète"),
+    limit: int = Query(100, ge=1, le=1000, description="Taille de page (avec cursor=true)"),
+    after: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente (avec cursor=true)"),
+    stream: bool = Query(False, description="Renvoie tous les utilisateurs en NDJSON"),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Liste les utilisateurs et leurs emprunts : liste complète par défaut, par page
+    (curseur) avec cursor=true, ou en flux NDJSON. Le nombre de requêtes ne dépend
+    pas du nombre d'utilisateurs d'une page.
+    """
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Accès réservé aux administrateurs")
 
-    users = db.query(User).all()
-    results = []
-    for user in users:
-        loans = db.query(Loan).filter(Loan.user_id == user.id).all()
-        results.append({
-            "user": {"id": user.id, "email": user.email},
-            "loans": [{"book_id": loan.book_id, "due_date": loan.due_date, "return_date": loan.return_date} for loan in loans]
-        })
-    return results
+    repository = UserRepository(User, db)
+    if stream:
+        return StreamingResponse(
+            _stream_users_loans(db, repository), media_type="application/x-ndjson"
+        )
+    if not cursor:
+        return [_user_loans(user) for user in repository.iter_with_loans()]
+
+    params = PaginationParams(limit=limit, cursor=True, after=after)
+    try:
+        page = paginate_cursor(repository.query_with_loans(), params, User)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {
+        "items": [_user_loans(user) for user in page.items],
+        "size": page.size,
+        "next_cursor": page.next_cursor
+    }
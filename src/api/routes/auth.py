@@ -1,32 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from src.db.session import get_db
+from src.db.session import get_async_write_db
 from src.models.users import User as UserModel
 from src.api.schemas.token import Token
-from src.repositories.users import UserRepository
-from src.services.users import UserService
 from src.utils.security import create_access_token
 from src.config import settings
-from src.services.auth import get_current_user
+from src.services.auth import authenticate_async, get_current_user_async
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db),
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_write_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    repository = UserRepository(UserModel, db)
-    service = UserService(repository)
-    
-    user = service.authenticate(email=form_data.username, password=form_data.password)
+    user = await authenticate_async(db, email=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,7 +29,7 @@ def login_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not service.is_active(user=user):
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Utilisateur inactif",
@@ -51,7 +46,7 @@ def login_access_token(
 
 
 @router.get("/me")
-def get_current_user_data(current_user: UserModel = Depends(get_current_user)):
+async def get_current_user_data(current_user: UserModel = Depends(get_current_user_async)):
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -1,48 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import io
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from typing import List, Any, Optional
 from datetime import datetime, timedelta
-from ...utils.pagination import PaginationParams, paginate, Page
-from ...db.session import get_db
+from ...utils.pagination import PaginationParams, paginate_async, Page
+from ...config import settings
+from ...db.session import get_async_read_db, get_async_write_db, get_read_db, get_write_db
 from ...models.books import Book as BookModel
 from ...models.loans import Loan as LoanModel
 from ...models.categories import book_category
-from ..schemas.books import Book, BookCreate, BookUpdate
+from ...models.counters import LibraryCounter
+from ..schemas.books import Book, BookCreate, BookUpdate, BookImportReport, BookSearchPage
 
 from ..schemas.users import User  # Add this import, adjust path if needed
-from ...repositories.books import BookRepository
+from ...repositories.books import AsyncBookRepository, BookRepository
+from ...repositories.counters import CounterRepository
 from ...services.books import BookService
-from ..dependencies import get_current_active_user, get_current_admin_user
-from ..dependencies import get_current_active_user as get_current_user
+from ...utils.importers import IMPORT_FORMATS, detect_format, iter_records
+from ..dependencies import get_current_active_user, get_current_admin_user, get_current_active_user_async
 
 
 router = APIRouter()
 
 
 @router.get("/", response_model=Page[Book])
-def read_books(
-    db: Session = Depends(get_db),
+async def read_books(
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
     sort_desc: bool = Query(False),
-    current_user = Depends(get_current_active_user)
+    cursor: bool = Query(False, description="Pagination par curseur (sans total)"),
+    after: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    current_user = Depends(get_current_active_user_async)
 ) -> Any:
     """
     Récupère la liste des livres avec pagination.
     """
-    repository = BookRepository(BookModel, db)
-    query = db.query(BookModel)
+    repository = AsyncBookRepository(BookModel, db)
     
-    params = PaginationParams(skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc)
-    return paginate(query, params, BookModel)
+    params = PaginationParams(
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc, cursor=cursor, after=after
+    )
+    try:
+        return await paginate_async(db, repository.list_statement(), params, BookModel)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.post("/", response_model=Book, status_code=status.HTTP_201_CREATED)
 def create_book(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     book_in: BookCreate,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -62,10 +75,38 @@ def create_book(
         )
 
 
+@router.post("/import", response_model=BookImportReport)
+def import_books(
+    *,
+    db: Session = Depends(get_write_db),
+    file: UploadFile = File(..., description="Catalogue CSV (avec en-tête) ou JSONL"),
+    format: Optional[str] = Query(None, description="csv ou jsonl (déduit de l'extension par défaut)"),
+    update_existing: bool = Query(False, description="Met à jour les livres dont l'ISBN existe déjà"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Importe un catalogue de livres en masse, avec un rapport par ligne.
+    """
+    format = format or detect_format(file.filename)
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Format d'import inconnu : {format}"
+        )
+    
+    repository = BookRepository(BookModel, db)
+    service = BookService(repository)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    return service.bulk_import(
+        iter_records(lines, format), batch_size=batch_size, update_existing=update_existing
+    )
+
+
 @router.get("/{id}", response_model=Book)
 def read_book(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     id: int,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -86,7 +127,7 @@ def read_book(
 @router.put("/{id}", response_model=Book)
 def update_book(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     book_in: BookUpdate,
     current_user = Depends(get_current_admin_user)
@@ -116,7 +157,7 @@ def update_book(
 @router.delete("/{id}", response_model=Book)
 def delete_book(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -138,7 +179,7 @@ def delete_book(
 @router.get("/search/title/{title}", response_model=List[Book])
 def search_books_by_title(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     title: str,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -154,7 +195,7 @@ def search_books_by_title(
 @router.get("/search/author/{author}", response_model=List[Book])
 def search_books_by_author(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     author: str,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -170,7 +211,7 @@ def search_books_by_author(
 @router.get("/search/isbn/{isbn}", response_model=Book)
 def search_book_by_isbn(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     isbn: str,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -187,9 +228,9 @@ def search_book_by_isbn(
         )
     return book
 
-@router.get("/search/", response_model=Page[Book])
-def search_books(
-    db: Session = Depends(get_db),
+@router.get("/search/", response_model=BookSearchPage)
+async def search_books(
+    db: AsyncSession = Depends(get_async_read_db),
     query: Optional[str] = Query(None, min_length=1),
     category_id: Optional[int] = Query(None),
     author: Optional[str] = Query(None),
@@ -198,26 +239,36 @@ def search_books(
     limit: int = Query(100, ge=1, le=100),
     sort_by: Optional[str] = Query(None),
     sort_desc: bool = Query(False),
-    current_user = Depends(get_current_active_user)
+    cursor: bool = Query(False, description="Pagination par curseur (sans total)"),
+    after: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    facets: bool = Query(False, description="Ajoute les comptes par catégorie, langue, décennie et disponibilité"),
+    facet_limit: int = Query(10, ge=1, le=50, description="Nombre maximal de valeurs par facette"),
+    current_user = Depends(get_current_active_user_async)
 ) -> Any:
     """
-    Recherche avancée de livres.
+    Recherche avancée de livres, avec en option les comptes par facette des résultats.
     """
-    repository = BookRepository(BookModel, db)
+    # Le curseur pagine par id : il perdrait l'ordre de pertinence de la recherche
+    if cursor and query and not sort_by:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La pagination par curseur d'une recherche exige un tri explicite (sort_by)"
+        )
+
+    repository = AsyncBookRepository(BookModel, db)
+
+    # Saisies normalisées une seule fois : les filtres et la clé du cache des facettes
+    # utilisent les mêmes valeurs ("Python ", "python" et "PYTHON" sont équivalents)
+    query = " ".join(query.lower().split()) if query else None
+    author = " ".join(author.lower().split()) if author else None
     
-    # Construire la requête de base
-    search_query = db.query(BookModel)
+    # Construire la requête de base (index plein texte si un terme est fourni)
+    if query:
+        search_query = repository.search_statement(query, ranked=not sort_by)
+    else:
+        search_query = repository.list_statement()
     
     # Appliquer les filtres
-    if query:
-        search_query = search_query.filter(
-            or_(
-                BookModel.title.ilike(f"%{query}%"),
-                BookModel.author.ilike(f"%{query}%"),
-                BookModel.isbn.ilike(f"%{query}%"),
-                BookModel.description.ilike(f"%{query}%")
-            )
-        )
     
     if category_id:
         search_query = search_query.join(book_category).filter(
@@ -231,19 +282,42 @@ def search_books(
         search_query = search_query.filter(BookModel.publication_year == publication_year)
     
     # Paginer les résultats
-    params = PaginationParams(skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc)
-    return paginate(search_query, params, BookModel)
+    params = PaginationParams(
+        skip=skip, limit=limit, sort_by=sort_by, sort_desc=sort_desc, cursor=cursor, after=after
+    )
+    try:
+        page = await paginate_async(db, search_query, params, BookModel)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not facets:
+        return page
+
+    filters = (query, category_id, author, publication_year)
+    return {
+        **dict(page),
+        "facets": await repository.facet_counts(
+            search_query, limit=facet_limit, key=filters, expiry=settings.SEARCH_FACETS_TTL
+        ),
+    }
 
 
 @router.post("/{book_id}/borrow")
-def borrow_book(book_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):    
+async def borrow_book(
+    book_id: int,
+    db: AsyncSession = Depends(get_async_write_db),
+    current_user: User = Depends(get_current_active_user_async)
+):
     # 1. Vérifier que le livre existe
-    book = db.query(BookModel).filter(BookModel.id == book_id).first()
+    repository = AsyncBookRepository(BookModel, db)
+    book = await repository.get(id=book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Livre non trouvé")
 
-    # 2. Vérifier la disponibilité
-    if book.quantity < 1:
+    # 2. Réserver un exemplaire : UPDATE conditionnel, sûr face aux emprunts concurrents
+    if not await repository.decrement_stock(book_id=book.id):
         raise HTTPException(status_code=400, detail="Ce livre n'est pas disponible")
 
     # 3. Créer l'emprunt
@@ -256,11 +330,11 @@ def borrow_book(book_id: int, db: Session = Depends(get_db), current_user: User
         extended=False
     )
     db.add(loan)
+    await db.run_sync(
+        lambda session: CounterRepository(LibraryCounter, session).record_loan(loan_date=loan.loan_date)
+    )
 
-    # 4. Mettre à jour la quantité du livre
-    book.quantity -= 1
-
-    db.commit()
-    db.refresh(loan)
+    # 4. Valider le décrément et l'emprunt en une seule transaction
+    await db.commit()
 
-    return {"message":"Livre emprunte avec succes"}
\ No newline at end of file
+    return {"message":"Livre emprunte avec succes"}
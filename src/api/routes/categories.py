@@ -1,27 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Optional, Union
 
-from ...db.session import get_db
+from ...db.session import get_read_db, get_write_db
+from ...models.books import Book as BookModel
 from ...models.categories import Category as CategoryModel
-from ..schemas.books import Category, CategoryCreate, CategoryUpdate
+from ..schemas.books import Book, Category, CategoryCreate, CategoryUpdate, CategoryWithCount
+from ...repositories.books import BookRepository
 from ...repositories.categories import CategoryRepository
+from ...utils.pagination import Page, PaginationParams, paginate_cursor
 from ..dependencies import get_current_active_user, get_current_admin_user
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Category])
+@router.get("/", response_model=List[Union[CategoryWithCount, Category]])
 def read_categories(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    with_counts: bool = Query(False, description="Ajoute le nombre de livres de chaque catégorie"),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
     Récupère la liste des catégories.
     """
     repository = CategoryRepository(CategoryModel, db)
+    if with_counts:
+        return repository.get_multi_with_counts(skip=skip, limit=limit)
     categories = repository.get_multi(skip=skip, limit=limit)
     return categories
 
@@ -29,7 +35,7 @@ def read_categories(
 @router.post("/", response_model=Category, status_code=status.HTTP_201_CREATED)
 def create_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     category_in: CategoryCreate,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -53,7 +59,7 @@ def create_category(
 @router.get("/{id}", response_model=Category)
 def read_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     id: int,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -70,10 +76,42 @@ def read_category(
     return category
 
 
+@router.get("/{id}/books", response_model=Page[Book])
+def read_category_books(
+    *,
+    db: Session = Depends(get_read_db),
+    id: int,
+    limit: int = Query(100, ge=1, le=100),
+    sort_by: Optional[str] = Query(None),
+    sort_desc: bool = Query(False),
+    after: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Livres d'une catégorie, par page (curseur).
+    """
+    category = CategoryRepository(CategoryModel, db).get(id=id)
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Catégorie non trouvée"
+        )
+
+    repository = BookRepository(BookModel, db)
+    params = PaginationParams(limit=limit, sort_by=sort_by, sort_desc=sort_desc, cursor=True, after=after)
+    try:
+        return paginate_cursor(repository.category_query(category_id=id), params, BookModel)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.put("/{id}", response_model=Category)
 def update_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     category_in: CategoryUpdate,
     current_user = Depends(get_current_admin_user)
@@ -105,7 +143,7 @@ def update_category(
 @router.delete("/{id}", response_model=Category)
 def delete_category(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -127,7 +165,7 @@ def delete_category(
 @router.get("/name/{name}", response_model=Category)
 def get_category_by_name(
     name: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     """
@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import Any, Iterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from ...db.session import get_read_db
+from ...models.books import Book
+from ...models.loans import Loan
+from ...models.users import User
+from ...repositories.base import BaseRepository
+from ...repositories.books import BookRepository
+from ...repositories.loans import LoanRepository
+from ...repositories.users import UserRepository
+from ...utils.export import iter_csv, iter_ndjson
+from ..dependencies import get_current_admin_user
+
+router = APIRouter()
+
+# Ressource exportable -> (repository, modèle, colonnes exclues)
+EXPORTS = {
+    "books": (BookRepository, Book, ()),
+    "loans": (LoanRepository, Loan, ()),
+    "users": (UserRepository, User, ("hashed_password",)),
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _close_after(db: Session, chunks: Iterator[str]) -> Iterator[str]:
+    try:
+        yield from chunks
+    finally:
+        db.close()
+
+
+@router.get("/{resource}")
+def export_resource(
+    resource: Literal["books", "loans", "users"],
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    updated_since: Optional[datetime] = Query(None, description="Uniquement les lignes modifiées depuis cette date"),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Exporte une table complète en flux NDJSON ou CSV (mémoire constante).
+    """
+    repository_class, model, exclude = EXPORTS[resource]
+    repository: BaseRepository = repository_class(model, db)
+    columns = repository.export_columns(exclude=exclude)
+    rows = repository.iter_rows(columns=columns, updated_since=updated_since)
+    chunks = iter_csv(rows, columns) if format == "csv" else iter_ndjson(rows)
+
+    return StreamingResponse(
+        _close_after(db, chunks),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{resource}.{format}"'}
+    )
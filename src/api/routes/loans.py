@@ -1,27 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Any
+from typing import List, Any, Literal, Optional, Set, Union
 from datetime import datetime, timedelta
 
-from ...db.session import get_db
+from ...db.session import get_async_write_db, get_read_db, get_write_db
 from ...models.loans import Loan as LoanModel
 from ...models.books import Book as BookModel
 from ...models.users import User as UserModel
-from ..schemas.loans import Loan, LoanCreate, LoanUpdate
-from ...repositories.loans import LoanRepository
+from ..schemas.loans import (
+    BatchCheckout, BatchReport, BatchReturn, Loan, LoanSummary, MyLoansPage
+)
+from ...repositories.loans import LOAN_RELATIONS, AsyncLoanRepository, LoanRepository
 from ...repositories.books import BookRepository
 from ...repositories.users import UserRepository
 from ...services.loans import LoanService
-from ..dependencies import get_current_active_user, get_current_admin_user
+from ...utils.pagination import PaginationParams, paginate_cursor
+from ..dependencies import (
+    get_current_active_user, get_current_admin_user,
+    get_current_active_user_async, get_current_admin_user_async
+)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[Loan])
+def _loan_service(db: Session) -> LoanService:
+    return LoanService(LoanRepository(LoanModel, db), BookRepository(BookModel, db), UserRepository(UserModel, db))
+
+
+def loan_expand(
+    expand: Optional[str] = Query(None, description="Relations complètes à embarquer : book, user (ex. book,user)")
+) -> Set[str]:
+    """
+    Relations demandées par ?expand= ; sans elles, les listes renvoient la vue compacte.
+    """
+    relations = {name.strip() for name in expand.split(",") if name.strip()} if expand else set()
+    unknown = relations.difference(LOAN_RELATIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valeur d'expand inconnue : {', '.join(sorted(unknown))}"
+        )
+    return relations
+
+
+@router.get("/", response_model=List[Union[LoanSummary, Loan]])
 def read_loans(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    expand: Set[str] = Depends(loan_expand),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -31,45 +59,118 @@ def read_loans(
     book_repository = BookRepository(BookModel, db)
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
-    loans = service.get_multi(skip=skip, limit=limit)
+    loans = service.get_loans(skip=skip, limit=limit, expand=expand)
     return loans
 
 
 @router.post("/", response_model=Loan, status_code=status.HTTP_201_CREATED)
-def create_loan(
+async def create_loan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_write_db),
     user_id: int,
     book_id: int,
     loan_period_days: int = 14,
-    current_user = Depends(get_current_admin_user)
+    current_user = Depends(get_current_admin_user_async)
 ) -> Any:
     """
     Crée un nouvel emprunt.
     """
-    loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-    
+    # Les règles d'emprunt du service s'exécutent sur la connexion asynchrone
     try:
-        loan = service.create_loan(
+        loan = await db.run_sync(lambda session: _loan_service(session).create_loan(
             user_id=user_id,
             book_id=book_id,
             loan_period_days=loan_period_days
+        ))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return await AsyncLoanRepository(LoanModel, db).get_with_details(id=loan.id)
+
+
+@router.post("/batch-checkout", response_model=BatchReport)
+async def batch_checkout(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    batch: BatchCheckout,
+    current_user = Depends(get_current_admin_user_async)
+) -> Any:
+    """
+    Emprunte plusieurs livres pour un même utilisateur (comptoir de prêt), en un seul commit.
+    """
+    try:
+        return await db.run_sync(lambda session: _loan_service(session).batch_checkout(
+            user_id=batch.user_id,
+            book_ids=batch.book_ids,
+            loan_period_days=batch.loan_period_days
+        ))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/batch-return", response_model=BatchReport)
+async def batch_return(
+    *,
+    db: AsyncSession = Depends(get_async_write_db),
+    batch: BatchReturn,
+    current_user = Depends(get_current_admin_user_async)
+) -> Any:
+    """
+    Retourne plusieurs emprunts, par id ou par ISBN, en un seul commit.
+    """
+    try:
+        return await db.run_sync(lambda session: _loan_service(session).batch_return(
+            loan_ids=batch.loan_ids,
+            isbns=batch.isbns,
+            user_id=batch.user_id
+        ))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/me", response_model=MyLoansPage)
+def read_my_loans(
+    db: Session = Depends(get_read_db),
+    loan_status: Optional[Literal["active", "overdue", "returned"]] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Curseur renvoyé par la page précédente"),
+    current_user = Depends(get_current_active_user)
+) -> Any:
+    """
+    Emprunts de l'utilisateur connecté, du plus récent au plus ancien (vue compacte,
+    pagination par curseur), avec le nombre d'emprunts par statut.
+    """
+    repository = LoanRepository(LoanModel, db)
+    params = PaginationParams(limit=limit, sort_desc=True, cursor=True, after=after)
+    try:
+        page = paginate_cursor(
+            repository.user_loans_query(user_id=current_user.id, status=loan_status), params, LoanModel
         )
-        return loan
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    return {
+        "items": page.items,
+        "size": page.size,
+        "next_cursor": page.next_cursor,
+        "summary": repository.count_user_loans_by_status(user_id=current_user.id),
+    }
 
 
 @router.get("/{id}", response_model=Loan)
 def read_loan(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     id: int,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -99,32 +200,27 @@ def read_loan(
 
 
 @router.post("/{id}/return", response_model=Loan)
-def return_loan(
+async def return_loan(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_write_db),
     id: int,
-    current_user = Depends(get_current_admin_user)
+    current_user = Depends(get_current_admin_user_async)
 ) -> Any:
     """
     Marque un emprunt comme retourné.
     """
-    loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
-    
     try:
-        loan = service.return_loan(loan_id=id)
-        return loan
+        loan = await db.run_sync(lambda session: _loan_service(session).return_loan(loan_id=id))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    return await AsyncLoanRepository(LoanModel, db).get_with_details(id=loan.id)
 
 
 @router.post("/{loan_id}/extend")
-def extend_loan(loan_id: int, db: Session = Depends(get_db)):
+def extend_loan(loan_id: int, db: Session = Depends(get_write_db)):
     service = LoanService(LoanRepository(LoanModel, db))
     loan = service.get(id=loan_id)
 
@@ -144,9 +240,10 @@ def extend_loan(loan_id: int, db: Session = Depends(get_db)):
 
 
 
-@router.get("/active/", response_model=List[Loan])
+@router.get("/active/", response_model=List[Union[LoanSummary, Loan]])
 def read_active_loans(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    expand: Set[str] = Depends(loan_expand),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -157,13 +254,14 @@ def read_active_loans(
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
     
-    loans = service.get_active_loans()
+    loans = service.get_active_loans(expand=expand)
     return loans
 
 
-@router.get("/overdue/", response_model=List[Loan])
+@router.get("/overdue/", response_model=List[Union[LoanSummary, Loan]])
 def read_overdue_loans(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    expand: Set[str] = Depends(loan_expand),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -174,15 +272,16 @@ def read_overdue_loans(
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
     
-    loans = service.get_overdue_loans()
+    loans = service.get_overdue_loans(expand=expand)
     return loans
 
 
-@router.get("/user/{user_id}", response_model=List[Loan])
+@router.get("/user/{user_id}", response_model=List[Union[LoanSummary, Loan]])
 def read_user_loans(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int,
+    expand: Set[str] = Depends(loan_expand),
     current_user = Depends(get_current_active_user)
 ) -> Any:
     if not current_user.is_admin and current_user.id != user_id:
@@ -196,15 +295,16 @@ def read_user_loans(
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
     
-    loans = service.get_loans_by_user(user_id=user_id)
+    loans = service.get_loans_by_user(user_id=user_id, expand=expand)
     return loans
 
 
-@router.get("/book/{book_id}", response_model=List[Loan])
+@router.get("/book/{book_id}", response_model=List[Union[LoanSummary, Loan]])
 def read_book_loans(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     book_id: int,
+    expand: Set[str] = Depends(loan_expand),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -215,31 +315,28 @@ def read_book_loans(
     user_repository = UserRepository(UserModel, db)
     service = LoanService(loan_repository, book_repository, user_repository)
     
-    loans = service.get_loans_by_book(book_id=book_id)
+    loans = service.get_loans_by_book(book_id=book_id, expand=expand)
     return loans
 
 @router.post("/{book_id}/borrow", status_code=status.HTTP_200_OK)
-def borrow_book(
+async def borrow_book(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_write_db),
     book_id: int,
-    current_user = Depends(get_current_active_user)
+    current_user = Depends(get_current_active_user_async)
 ):
     """
     Permet à un utilisateur connecté d'emprunter un livre (si disponible).
     """
-    loan_repository = LoanRepository(LoanModel, db)
-    book_repository = BookRepository(BookModel, db)
-    user_repository = UserRepository(UserModel, db)
-    service = LoanService(loan_repository, book_repository, user_repository)
+    user_id = current_user.id
 
     # Crée un emprunt via le service, gère les exceptions
     try:
-        loan = service.create_loan(
-            user_id=current_user.id,
+        await db.run_sync(lambda session: _loan_service(session).create_loan(
+            user_id=user_id,
             book_id=book_id,
             loan_period_days=14
-        )
+        ))
         return {"message": "Livre emprunté avec succès"}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List
 
-from ...db.session import get_db
+from ...db.session import get_read_db, get_write_db
 from ...services.stats import StatsService
+from ...utils.cache import cache_stats
 from ..dependencies import get_current_admin_user
 
 router = APIRouter()
@@ -11,7 +12,7 @@ router = APIRouter()
 
 @router.get("/general", response_model=Dict[str, Any])
 def get_general_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -21,9 +22,21 @@ def get_general_stats(
     return service.get_general_stats()
 
 
+@router.post("/rebuild-counters", response_model=Dict[str, Any])
+def rebuild_counters(
+    db: Session = Depends(get_write_db),
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Recalcule les compteurs de statistiques à partir des tables (réparation d'une dérive).
+    """
+    service = StatsService(db)
+    return service.rebuild_counters()
+
+
 @router.get("/most-borrowed-books", response_model=List[Dict[str, Any]])
 def get_most_borrowed_books(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = 10,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -36,7 +49,7 @@ def get_most_borrowed_books(
 
 @router.get("/most-active-users", response_model=List[Dict[str, Any]])
 def get_most_active_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = 10,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -49,7 +62,7 @@ def get_most_active_users(
 
 @router.get("/monthly-loans", response_model=List[Dict[str, Any]])
 def get_monthly_loans(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     months: int = 12,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -57,4 +70,14 @@ def get_monthly_loans(
     Récupère le nombre d'emprunts par mois pour les derniers mois.
     """
     service = StatsService(db)
-    return service.get_monthly_loans(months=months)
\ No newline at end of file
+    return service.get_monthly_loans(months=months)
+
+
+@router.get("/cache", response_model=Dict[str, int])
+def get_cache_stats(
+    current_user = Depends(get_current_admin_user)
+) -> Any:
+    """
+    Récupère les statistiques du cache mémoire (succès, échecs, évictions).
+    """
+    return cache_stats()
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Any
 
-from ...db.session import get_db
+from ...db.session import get_read_db, get_write_db
 from ...models.users import User as UserModel
 from ..schemas.users import User, UserCreate, UserUpdate
 from ...repositories.users import UserRepository
@@ -14,7 +14,7 @@ router = APIRouter()
 
 @router.get("/", response_model=List[User])
 def read_users(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100 #,
     #current_user = Depends(get_current_admin_user)
@@ -31,7 +31,7 @@ def read_users(
 @router.post("/", response_model=User, status_code=status.HTTP_201_CREATED)
 def create_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     user_in: UserCreate
     #,
     #current_user = Depends(get_current_admin_user)
@@ -56,18 +56,28 @@ def create_user(
 
 @router.get("/me", response_model=User)
 def read_user_me(
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_active_user),
 ) -> Any:
     """
     Récupère l'utilisateur connecté.
     """
-    return current_user
+    # current_user ne porte que les champs d'authentification (voir AuthUser)
+    repository = UserRepository(UserModel, db)
+    service = UserService(repository)
+    user = service.get(id=current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Utilisateur non trouvé"
+        )
+    return user
 
 
 @router.put("/me", response_model=User)
 def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     user_in: UserUpdate,
     current_user = Depends(get_current_active_user)
 ) -> Any:
@@ -77,8 +87,10 @@ def update_user_me(
     repository = UserRepository(UserModel, db)
     service = UserService(repository)
     
+    # current_user ne porte que les champs d'authentification : on charge l'instance de la session d'écriture
+    user = service.get(id=current_user.id)
     try:
-        user = service.update(db_obj=current_user, obj_in=user_in)
+        user = service.update(db_obj=user, obj_in=user_in)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -90,7 +102,7 @@ def update_user_me(
 @router.get("/{id}", response_model=User)
 def read_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     id: int,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -111,7 +123,7 @@ def read_user(
 @router.put("/{id}", response_model=User)
 def update_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     user_in: UserUpdate,
     current_user = Depends(get_current_admin_user)
@@ -141,7 +153,7 @@ def update_user(
 @router.delete("/{id}", response_model=User)
 def delete_user(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     id: int,
     current_user = Depends(get_current_admin_user)
 ) -> Any:
@@ -171,7 +183,7 @@ def delete_user(
 @router.get("/by-email/{email}", response_model=User)
 def get_user_by_email(
     email: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user = Depends(get_current_admin_user)
 ) -> Any:
     """
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
+from ...utils.pagination import Page
+
 
 class CategoryBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=50, description="Nom de la catégorie")
@@ -29,6 +31,10 @@ class Category(CategoryInDBBase):
     pass
 
 
+class CategoryWithCount(Category):
+    book_count: int
+
+
 class BookBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100, description="Titre du livre")
     author: str = Field(..., min_length=1, max_length=100, description="Auteur du livre")
@@ -68,4 +74,30 @@ class BookInDBBase(BookBase):
 
 
 class Book(BookInDBBase):
-    categories: List[Category] = []
\ No newline at end of file
+    categories: List[Category] = []
+
+class FacetCount(BaseModel):
+    value: Optional[str] = Field(None, description="Valeur filtrable (id de catégorie, langue, décennie, disponibilité)")
+    label: Optional[str] = Field(None, description="Libellé affichable, si différent de la valeur")
+    count: int
+
+
+class BookSearchPage(Page[Book]):
+    facets: Optional[Dict[str, List[FacetCount]]] = None
+
+
+class BookImportError(BaseModel):
+    line: int
+    isbn: Optional[str] = None
+    message: str
+
+
+class BookImportReport(BaseModel):
+    received: int
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+    errors: List[BookImportError] = []
+    duration_seconds: float
+    rows_per_second: float
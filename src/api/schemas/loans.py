@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from .users import User
 from .books import Book
+from ...utils.pagination import Page
 
 
 class LoanBase(BaseModel):
@@ -38,6 +39,54 @@ class Loan(LoanInDBBase):
     book: Optional[Book]
 
 
+class LoanSummary(LoanInDBBase):
+    """
+    Vue compacte d'un emprunt pour les listes.
+    """
+    book_title: str
+    book_author: str
+    book_isbn: str
+    user_full_name: str
+    user_email: str
+
+
+class LoanStatusSummary(BaseModel):
+    total: int
+    active: int = Field(..., description="Emprunts non retournés, retards compris")
+    overdue: int
+    returned: int
+
+
+class MyLoansPage(Page[LoanSummary]):
+    summary: LoanStatusSummary
+
+
+class BatchCheckout(BaseModel):
+    user_id: int = Field(..., description="ID de l'emprunteur")
+    book_ids: List[int] = Field(..., min_length=1, max_length=50, description="Livres à emprunter")
+    loan_period_days: int = Field(14, ge=1, description="Durée de l'emprunt en jours")
+
+
+class BatchReturn(BaseModel):
+    loan_ids: List[int] = Field([], max_length=50, description="Emprunts à retourner")
+    isbns: List[str] = Field([], max_length=50, description="ISBN des livres rapportés")
+    user_id: Optional[int] = Field(None, description="Emprunteur, pour lever l'ambiguïté des ISBN")
+
+
+class BatchItemResult(BaseModel):
+    book_id: Optional[int] = None
+    loan_id: Optional[int] = None
+    isbn: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+
+
+class BatchReport(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BatchItemResult]
+
+
 class LoanWithDetails(Loan):
     user: User
     book: Book
\ No newline at end of file
@@ -39,5 +39,18 @@ class User(UserInDBBase):
     pass
 
 
+class AuthUser(BaseModel):
+    """
+    Champs d'un utilisateur nécessaires aux contrôles d'accès.
+    """
+    id: int
+    is_active: bool
+    is_admin: bool
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class UserWithPassword(UserInDBBase):
     hashed_password: str
\ No newline at end of file
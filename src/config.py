@@ -24,6 +24,52 @@ class Settings(BaseSettings):
 
     # Base de données
     DATABASE_URL: str = "sqlite:///./library.db"
+    # Base des lectures (get_read_db), DATABASE_URL si vide
+    DATABASE_READ_URL: Optional[str] = None
+    # Pools : un seul écrivain à la fois en WAL, les lecteurs en parallèle dans
+    # leur propre pool, dimensionné pour le threadpool de FastAPI (40 threads)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Écritures des routes async def : pool propre au pilote asynchrone. Sous SQLite, il partage
+    # le verrou d'écriture du fichier avec le pool synchrone : le budget d'écrivains est
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW connexions,
+    # qui attendent toutes le même verrou (busy_timeout)
+    DB_ASYNC_POOL_SIZE: int = 2
+    DB_ASYNC_MAX_OVERFLOW: int = 3
+    DB_READ_POOL_SIZE: int = 20
+    DB_READ_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+
+    # Profil SQLite appliqué à chaque connexion (db/session.py), 0 ou vide = valeur par défaut de SQLite
+    SQLITE_JOURNAL_MODE: Optional[str] = "WAL"
+    SQLITE_SYNCHRONOUS: Optional[str] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = 5000
+    SQLITE_CACHE_SIZE_KB: Optional[int] = 64 * 1024
+    SQLITE_MMAP_SIZE: Optional[int] = 256 * 1024 * 1024
+    SQLITE_TEMP_STORE: Optional[str] = "MEMORY"
+
+    # Cache mémoire (utils/cache.py)
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_SWEEP_INTERVAL: float = 60.0
+    # Tier partagé entre workers (fichier SQLite), désactivé si vide
+    CACHE_SHARED_PATH: Optional[str] = None
+    # Délai maximal de prise en compte des invalidations des autres workers : sans lui,
+    # chaque lecture du cache local interrogerait le fichier partagé
+    CACHE_SHARED_POLL_INTERVAL: float = 0.5
+    # Cache par processus des champs d'authentification (services/users.py), TTL en secondes
+    AUTH_USER_CACHE_TTL: float = 5.0
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10000
+    # Comptes par facette de /books/search/, mis en cache par filtres normalisés (secondes)
+    SEARCH_FACETS_TTL: float = 10.0
+    # Tokens JWT déjà vérifiés (utils/security.py)
+    JWT_CACHE_MAX_ENTRIES: int = 4096
+
+    # Hachage des mots de passe (utils/security.py) : coût bcrypt, pool de processus
+    # (0 = dans le thread de la requête) et nombre de calculs en attente avant un 429
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
 
     class Config:
         case_sensitive = True
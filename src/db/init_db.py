@@ -6,6 +6,8 @@ from ..models.users import User
 from ..models.books import Book
 from ..models.loans import Loan
 from ..models.categories import Category
+from ..models.counters import LibraryCounter
+from ..repositories.counters import CounterRepository
 from ..utils.security import get_password_hash
 
 logger = logging.getLogger(__name__)
@@ -187,4 +189,9 @@ def init_db(db: Session) -> None:
             db.add(loan2)
         
         db.commit()
-        logger.info("Emprunts créés")
\ No newline at end of file
+        logger.info("Emprunts créés")
+    
+    # Les données ont été insérées directement : recalculer les compteurs
+    CounterRepository(LibraryCounter, db).rebuild()
+    db.commit()
+    logger.info("Compteurs recalculés")
\ No newline at end of file
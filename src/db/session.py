@@ -1,21 +1,222 @@
-from sqlalchemy import create_engine
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from ..config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+# Clé de Session.info marquant les sessions de lecture (get_read_db)
+READ_ONLY_KEY = "read_only"
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Pragmas SQLite du profil configuré dans Settings (les valeurs nulles ou vides sont ignorées).
+    """
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Valeur négative : taille en KiB plutôt qu'en pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB if settings.SQLITE_CACHE_SIZE_KB else None,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+    return {name: value for name, value in pragmas.items() if value}
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Exécute les pragmas à l'ouverture de chaque connexion du pool.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def is_memory_database(database_url: str) -> bool:
+    """
+    Indique si l'URL désigne une base SQLite en mémoire (propre à chaque moteur).
+    """
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_options(
+    database_url: str,
+    pragmas: Optional[Dict[str, Any]],
+    read_only: bool,
+    asynchronous: bool = False
+) -> Dict[str, Any]:
+    """
+    Options de create_engine communes aux moteurs synchrones et asynchrones.
+    """
+    options: Dict[str, Any] = {}
+    if not is_memory_database(database_url):
+        if read_only:
+            pool_size, max_overflow = settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW
+        elif asynchronous:
+            pool_size, max_overflow = settings.DB_ASYNC_POOL_SIZE, settings.DB_ASYNC_MAX_OVERFLOW
+        else:
+            pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+        options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # Le timeout du pilote (en secondes) double busy_timeout
+        timeout = pragmas.get("busy_timeout", 5000) / 1000
+        options["connect_args"] = {"check_same_thread": False, "timeout": timeout}
+    return options
+
+
+def _sqlite_profile(pragmas: Optional[Dict[str, Any]], read_only: bool) -> Dict[str, Any]:
+    pragmas = dict(sqlite_pragmas() if pragmas is None else pragmas)
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def create_db_engine(
+    database_url: str,
+    *,
+    pragmas: Optional[Dict[str, Any]] = None,
+    read_only: bool = False
+) -> Engine:
+    """
+    Crée un moteur de l'application. Pour SQLite, applique le profil de pragmas
+    (celui de Settings par défaut) et dimensionne le pool pour un fichier en WAL.
+    Un moteur read_only a son propre pool ; sous SQLite, ses connexions refusent toute écriture.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, **_engine_options(database_url, {}, read_only))
+
+    pragmas = _sqlite_profile(pragmas, read_only)
+    engine = create_engine(url, **_engine_options(database_url, pragmas, read_only))
+    if pragmas:
+        apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
+# Pilotes asynchrones utilisés à la place des pilotes synchrones par défaut
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(database_url: str) -> URL:
+    """
+    Convertit l'URL synchrone en URL de pilote asynchrone (sqlite -> aiosqlite).
+    """
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def create_async_db_engine(
+    database_url: str,
+    *,
+    pragmas: Optional[Dict[str, Any]] = None,
+    read_only: bool = False
+) -> AsyncEngine:
+    """
+    Variante asynchrone de create_db_engine : même profil SQLite, appliqué sur le
+    moteur synchrone sous-jacent ; les écritures ont leur propre pool (DB_ASYNC_POOL_SIZE).
+    """
+    url = async_database_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(url, **_engine_options(database_url, {}, read_only, asynchronous=True))
+
+    pragmas = _sqlite_profile(pragmas, read_only)
+    engine = create_async_engine(url, **_engine_options(database_url, pragmas, read_only, asynchronous=True))
+    if pragmas:
+        apply_sqlite_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Lectures : pool séparé, connexions en lecture seule. Une base en mémoire
+# n'existe que dans son moteur : les lectures passent alors par celui d'écriture.
+read_database_url = settings.DATABASE_READ_URL or settings.DATABASE_URL
+read_engine = engine if is_memory_database(read_database_url) else create_db_engine(read_database_url, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={READ_ONLY_KEY: True})
+
+# Pile asynchrone (routes async def) : mêmes bases et séparation lecture/écriture.
+# Les moteurs sont créés au premier usage : le pilote asynchrone (aiosqlite, asyncpg)
+# n'est requis que si une route async def est appelée, pas à l'import de l'application.
+_async_engines: Dict[bool, AsyncEngine] = {}
+_async_sessionmakers: Dict[bool, async_sessionmaker] = {}
+
+
+def get_async_engine(read_only: bool = False) -> AsyncEngine:
+    """
+    Moteur asynchrone d'écriture, ou de lecture si read_only (créé une fois par processus).
+    """
+    read_only = bool(read_only)
+    if read_only not in _async_engines:
+        database_url = settings.DATABASE_READ_URL or settings.DATABASE_URL
+        if not read_only:
+            _async_engines[read_only] = create_async_db_engine(settings.DATABASE_URL)
+        elif is_memory_database(database_url):
+            _async_engines[read_only] = get_async_engine()
+        else:
+            _async_engines[read_only] = create_async_db_engine(database_url, read_only=True)
+    return _async_engines[read_only]
+
+
+def get_async_sessionmaker(read_only: bool = False) -> async_sessionmaker:
+    """
+    Fabrique des sessions asynchrones d'écriture, ou de lecture si read_only.
+    """
+    read_only = bool(read_only)
+    if read_only not in _async_sessionmakers:
+        _async_sessionmakers[read_only] = async_sessionmaker(
+            get_async_engine(read_only), autoflush=False, expire_on_commit=False,
+            info={READ_ONLY_KEY: True} if read_only else {}
+        )
+    return _async_sessionmakers[read_only]
+
+
 Base = declarative_base()
 
-# Dépendance pour obtenir la session de base de données
-def get_db():
+# Dépendances pour obtenir une session de base de données
+def get_write_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Nom historique : les routes qui écrivent
+get_db = get_write_db
+
+
+async def get_async_write_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker(read_only=True)() as db:
+        yield db
@@ -1,8 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config import settings
 from .api.routes import api_router
+from .utils.security import PasswordHasherBusy
 from .models import base, books, users, loans  # Importer les modèles pour Alembic
 
 app = FastAPI(
@@ -20,6 +22,13 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Trop de requêtes d'authentification, réessayez plus tard"},
+        headers={"Retry-After": "1"},
+    )
 
 
 # Inclusion des routes API
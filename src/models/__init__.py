@@ -2,4 +2,5 @@ from .base import Base
 from .categories import Category, book_category
 from .books import Book
 from .users import User
-from .loans import Loan
\ No newline at end of file
+from .loans import Loan
+from .counters import LibraryCounter, LoanMonthlyCount
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Index, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, Index, CheckConstraint, DDL, event
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import table, column
 from datetime import datetime
 
 from .base import Base
@@ -29,3 +30,46 @@ class Book(Base):
     # Relations
     loans = relationship("Loan", back_populates="book", cascade="all, delete-orphan")
     categories = relationship("Category", secondary=book_category, back_populates="books")
+
+
+# Index plein texte FTS5 (SQLite uniquement) sur la table book.
+# La table virtuelle est "external content" : elle ne stocke que l'index,
+# les triggers la maintiennent synchronisée lors des INSERT/UPDATE/DELETE.
+BOOK_FTS_TABLE = "book_fts"
+
+BOOK_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS book_fts USING fts5(
+        title, author, isbn, description,
+        content='book', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_ai AFTER INSERT ON book BEGIN
+        INSERT INTO book_fts(rowid, title, author, isbn, description)
+        VALUES (new.id, new.title, new.author, new.isbn, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_ad AFTER DELETE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, isbn, description)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS book_fts_au AFTER UPDATE OF title, author, isbn, description ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, isbn, description)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn, old.description);
+        INSERT INTO book_fts(rowid, title, author, isbn, description)
+        VALUES (new.id, new.title, new.author, new.isbn, new.description);
+    END
+    """,
+]
+
+for _statement in BOOK_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Book.__table__, "before_drop", DDL("DROP TABLE IF EXISTS book_fts").execute_if(dialect="sqlite"))
+
+# Construction légère (hors metadata) pour interroger l'index depuis les repositories
+book_fts = table(BOOK_FTS_TABLE, column("rowid"), column(BOOK_FTS_TABLE), column("rank"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Table
 from sqlalchemy.orm import relationship
 
 from .base import Base
@@ -9,6 +9,8 @@ book_category = Table(
     Base.metadata,
     Column("book_id", Integer, ForeignKey("book.id"), primary_key=True),
     Column("category_id", Integer, ForeignKey("category.id"), primary_key=True),
+    # La clé primaire (book_id, category_id) ne sert pas les recherches par catégorie
+    Index("idx_book_category_category_book", "category_id", "book_id"),
 )
 
 
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String
+
+from .base import Base
+
+
+class LibraryCounter(Base):
+    """
+    Compteur agrégé de la bibliothèque (livres, utilisateurs, emprunts),
+    maintenu de façon incrémentale par les services.
+    """
+    __tablename__ = "library_counters"
+
+    name = Column(String(50), nullable=False, unique=True, index=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class LoanMonthlyCount(Base):
+    """
+    Nombre d'emprunts par mois (format YYYY-MM), maintenu de façon incrémentale.
+    """
+    month = Column(String(7), nullable=False, unique=True, index=True)
+    loan_count = Column(Integer, nullable=False, default=0)
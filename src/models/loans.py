@@ -21,6 +21,10 @@ class Loan(Base):
         Index('idx_loan_user_id', 'user_id'),
         Index('idx_loan_book_id', 'book_id'),
         Index('idx_loan_return_date', 'return_date'),
+        # Comptage des retards : return_date IS NULL AND due_date < now
+        Index('idx_loan_return_due', 'return_date', 'due_date'),
+        # Emprunts actifs d'un utilisateur : user_id = ? AND return_date IS NULL
+        Index('idx_loan_user_return', 'user_id', 'return_date'),
     )
     
     # Relations
@@ -1,15 +1,46 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..db.session import READ_ONLY_KEY
 from ..models.base import Base
+from ..utils.cache import invalidate_cache
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Clé de Session.info indiquant qu'une unité de travail est en cours (voir BaseService.unit_of_work)
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+# Clé de Session.info : préfixes de cache à invalider à la fin de la transaction
+PENDING_INVALIDATIONS_KEY = "pending_invalidations"
+
+
+def invalidate_after_commit(db: Union[Session, AsyncSession], prefix: str) -> None:
+    """
+    Programme l'invalidation d'un préfixe de cache à la fin de la transaction en cours
+    (ou de la prochaine). Invalider avant le COMMIT laisserait une lecture concurrente
+    remettre en cache l'état d'avant l'écriture, jusqu'à l'expiration de l'entrée.
+    """
+    db.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(prefix)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _flush_pending_invalidations(session: Session, transaction) -> None:
+    """
+    Invalide les préfixes en attente une fois la transaction externe terminée
+    (après un rollback, l'invalidation est inutile mais sans danger).
+    """
+    if transaction.parent is None:
+        for prefix in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+            invalidate_cache(prefix)
+
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType], db: Session):
@@ -19,6 +50,32 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self.db = db
 
+    @property
+    def in_unit_of_work(self) -> bool:
+        """
+        Indique si une unité de travail est ouverte sur la session.
+        """
+        return self.db.info.get(UNIT_OF_WORK_KEY, 0) > 0
+
+    @property
+    def read_only(self) -> bool:
+        """
+        Indique si la session est une session de lecture (get_read_db).
+        """
+        return self.db.info.get(READ_ONLY_KEY, False)
+
+    def _commit(self, db_obj: Optional[ModelType] = None) -> None:
+        """
+        Valide les changements : dans une unité de travail, un simple flush
+        (le service valide une seule fois à la fin), sinon commit + refresh.
+        """
+        if self.in_unit_of_work:
+            self.db.flush()
+            return
+        self.db.commit()
+        if db_obj is not None:
+            self.db.refresh(db_obj)
+
     def get(self, id: Any) -> Optional[ModelType]:
         """
         Récupère un objet par son ID.
@@ -33,16 +90,44 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         return self.db.query(self.model).offset(skip).limit(limit).all()
 
+    def export_columns(self, *, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Noms des colonnes exportables du modèle.
+        """
+        return [column.name for column in self.model.__table__.columns if column.name not in exclude]
+
+    def iter_rows(
+        self,
+        *,
+        columns: List[str],
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt la table par lots de batch_size lignes (curseur côté serveur,
+        sans entités ORM) : la mémoire utilisée ne dépend pas de la taille de la table.
+        """
+        table = self.model.__table__
+        stmt = select(*(table.c[name] for name in columns)).order_by(table.c.id)
+        if updated_since is not None:
+            stmt = stmt.where(table.c.updated_at >= updated_since)
+        result = self.db.execute(stmt.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield dict(row)
+
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Crée un nouvel objet.
         """
-        obj_in_data = jsonable_encoder(obj_in)
+        # Un dict est déjà prêt pour le modèle : l'encoder en JSON convertirait les dates en chaînes
+        if isinstance(obj_in, dict):
+            obj_in_data = dict(obj_in)
+        else:
+            obj_in_data = jsonable_encoder(obj_in)
         obj_in_data.pop("category_ids", None)
         db_obj = self.model(**obj_in_data)
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self._commit(db_obj)
         return db_obj
 
     def update(
@@ -54,27 +139,102 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Met à jour un objet existant.
         """
-        obj_data = jsonable_encoder(db_obj)
-
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.dict(exclude_unset=True)
 
-        for field in obj_data:
+        # Seules les colonnes du modèle sont modifiables
+        columns = inspect(type(db_obj)).column_attrs.keys()
+        for field in columns:
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
 
         self.db.add(db_obj)
-        self.db.commit()
-        self.db.refresh(db_obj)
+        self._commit(db_obj)
         return db_obj
 
     def remove(self, *, id: int) -> ModelType:
         """
         Supprime un objet.
         """
-        obj = self.db.query(self.model).get(id)
+        obj = self.db.get(self.model, id)
         self.db.delete(obj)
-        self.db.commit()
-        return obj
\ No newline at end of file
+        self._commit()
+        return obj
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """
+    Variante asynchrone de BaseRepository (AsyncSession), pour les routes async def.
+    Les relations ne se chargent pas à la demande : les requêtes doivent les
+    charger explicitement (selectinload).
+    """
+    def __init__(self, model: Type[ModelType], db: AsyncSession):
+        """
+        Initialise le repository avec un modèle et une session asynchrone.
+        """
+        self.model = model
+        self.db = db
+
+    @property
+    def in_unit_of_work(self) -> bool:
+        """
+        Indique si une unité de travail est ouverte sur la session.
+        """
+        return self.db.info.get(UNIT_OF_WORK_KEY, 0) > 0
+
+    async def _commit(self) -> None:
+        """
+        Valide les changements (simple flush dans une unité de travail).
+        """
+        if self.in_unit_of_work:
+            await self.db.flush()
+        else:
+            await self.db.commit()
+
+    async def get(self, id: Any) -> Optional[ModelType]:
+        """
+        Récupère un objet par son ID.
+        """
+        return await self.db.get(self.model, id)
+
+    async def get_multi(self, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        """
+        Récupère plusieurs objets avec pagination.
+        """
+        result = await self.db.scalars(select(self.model).offset(skip).limit(limit))
+        return list(result)
+
+    async def create(self, *, obj_in: Union[BaseModel, Dict[str, Any]]) -> ModelType:
+        """
+        Crée un nouvel objet.
+        """
+        obj_in_data = dict(obj_in) if isinstance(obj_in, dict) else jsonable_encoder(obj_in)
+        obj_in_data.pop("category_ids", None)
+        db_obj = self.model(**obj_in_data)
+        self.db.add(db_obj)
+        await self._commit()
+        return db_obj
+
+    async def update(self, *, db_obj: ModelType, obj_in: Union[BaseModel, Dict[str, Any]]) -> ModelType:
+        """
+        Met à jour un objet existant.
+        """
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        for field in inspect(type(db_obj)).column_attrs.keys():
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        self.db.add(db_obj)
+        await self._commit()
+        return db_obj
+
+    async def remove(self, *, id: int) -> Optional[ModelType]:
+        """
+        Supprime un objet.
+        """
+        obj = await self.db.get(self.model, id)
+        if obj is not None:
+            await self.db.delete(obj)
+            await self._commit()
+        return obj
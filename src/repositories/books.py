@@ -1,13 +1,20 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, or_
-from typing import List, Optional, Dict, Any
-from sqlalchemy import or_
+import re
+from sqlalchemy.orm import Query, joinedload, selectinload
+from sqlalchemy import (
+    Select, String, bindparam, case, cast, func, insert, literal, null, or_, select, union_all, update
+)
+from typing import Hashable, List, Optional, Dict, Any, Tuple
 from ..models.books import Book as BookModel
 
-from .base import BaseRepository
-from ..models.books import Book
+from .base import AsyncBaseRepository, BaseRepository, invalidate_after_commit
+from ..models.books import Book, book_fts
 from ..models.categories import Category, book_category
-from ..utils.cache import cache, invalidate_cache
+from ..utils.cache import _MISSING, cache, cache_backend
+
+# Préfixe du cache des livres, invalidé après le commit de chaque écriture
+CACHE_NAMESPACE = "src.repositories.books"
+# Sous CACHE_NAMESPACE : invalidé avec le reste du cache des livres
+FACETS_NAMESPACE = f"{CACHE_NAMESPACE}.facets"
 
 class BookRepository(BaseRepository[Book, None, None]):
     def get_by_isbn(self, *, isbn: str) -> Optional[Book]:
@@ -16,17 +23,24 @@ class BookRepository(BaseRepository[Book, None, None]):
         """
         return self.db.query(Book).filter(Book.isbn == isbn).first()
     
+    def list_query(self) -> Query:
+        """
+        Requête de base des livres renvoyés en liste : les catégories sont chargées
+        en une seule requête IN (selectinload), sans multiplier les lignes comptées.
+        """
+        return self.db.query(Book).options(selectinload(Book.categories))
+
     def get_by_title(self, *, title: str) -> List[Book]:
         """
         Récupère des livres par leur titre (recherche partielle).
         """
-        return self.db.query(Book).filter(Book.title.ilike(f"%{title}%")).all()
+        return self.list_query().filter(Book.title.ilike(f"%{title}%")).all()
     
     def get_by_author(self, *, author: str) -> List[Book]:
         """
         Récupère des livres par leur auteur (recherche partielle).
         """
-        return self.db.query(Book).filter(Book.author.ilike(f"%{author}%")).all()
+        return self.list_query().filter(Book.author.ilike(f"%{author}%")).all()
     
     def get_with_categories(self, *, id: int) -> Optional[Book]:
         """
@@ -38,27 +52,21 @@ class BookRepository(BaseRepository[Book, None, None]):
         """
         Récupère plusieurs livres avec leurs catégories.
         """
-        return self.db.query(Book).options(joinedload(Book.categories)).offset(skip).limit(limit).all()
+        return self.list_query().offset(skip).limit(limit).all()
     
-    def search(self, *, query: str) -> List[Book]:
+    def category_query(self, *, category_id: int) -> Query:
         """
-        Recherche des livres par titre, auteur ou ISBN.
+        Livres d'une catégorie (index (category_id, book_id) de book_category).
         """
-        return self.db.query(Book).filter(
-            or_(
-                Book.title.ilike(f"%{query}%"),
-                Book.author.ilike(f"%{query}%"),
-                Book.isbn.ilike(f"%{query}%")
-            )
-        ).all()
-    
+        return self.list_query().join(book_category).filter(
+            book_category.c.category_id == category_id
+        )
+
     def get_by_category(self, *, category_id: int, skip: int = 0, limit: int = 100) -> List[Book]:
         """
         Récupère des livres par catégorie.
         """
-        return self.db.query(Book).join(book_category).filter(
-            book_category.c.category_id == category_id
-        ).offset(skip).limit(limit).all()
+        return self.category_query(category_id=category_id).offset(skip).limit(limit).all()
     
     def add_category(self, *, book_id: int, category_id: int) -> None:
         """
@@ -73,7 +81,7 @@ class BookRepository(BaseRepository[Book, None, None]):
             raise ValueError(f"Catégorie avec l'ID {category_id} non trouvée")
         
         book.categories.append(category)
-        self.db.commit()
+        self._commit()
     
     def remove_category(self, *, book_id: int, category_id: int) -> None:
         """
@@ -88,9 +96,74 @@ class BookRepository(BaseRepository[Book, None, None]):
             raise ValueError(f"Catégorie avec l'ID {category_id} non trouvée")
         
         book.categories.remove(category)
-        self.db.commit()
+        self._commit()
+    
+    def decrement_stock(self, *, book_id: int) -> bool:
+        """
+        Retire un exemplaire du stock de façon atomique (UPDATE conditionnel,
+        sans commit ; le cache des livres est invalidé après le commit).
+        Renvoie False si le livre n'a plus d'exemplaire disponible.
+        """
+        updated = self.db.query(Book).filter(
+            Book.id == book_id,
+            Book.quantity > 0
+        ).update({Book.quantity: Book.quantity - 1}, synchronize_session="fetch")
+        if updated:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return updated == 1
+    
+    def increment_stock(self, *, book_id: int) -> bool:
+        """
+        Remet un exemplaire en stock de façon atomique (sans commit ; le cache
+        des livres est invalidé après le commit).
+        """
+        updated = self.db.query(Book).filter(
+            Book.id == book_id
+        ).update({Book.quantity: Book.quantity + 1}, synchronize_session="fetch")
+        if updated:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return updated == 1
     
-    @cache(expiry=60)  # Cache pendant 1 minute
+    def get_stock(self, *, book_ids: List[int]) -> Dict[int, int]:
+        """
+        Charge en une requête la quantité disponible de plusieurs livres (id -> quantité).
+        """
+        if not book_ids:
+            return {}
+        return dict(self.db.execute(select(Book.id, Book.quantity).where(Book.id.in_(book_ids))).all())
+
+    def decrement_stock_many(self, *, book_ids: List[int]) -> List[int]:
+        """
+        Retire un exemplaire de chaque livre encore disponible, en un seul UPDATE
+        conditionnel (sans commit ; le cache des livres est invalidé après le commit).
+        Renvoie les id des livres effectivement décrémentés.
+        """
+        if not book_ids:
+            return []
+        invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return list(self.db.scalars(
+            update(Book)
+            .where(Book.id.in_(book_ids), Book.quantity > 0)
+            .values(quantity=Book.quantity - 1)
+            .returning(Book.id)
+            .execution_options(synchronize_session="fetch")
+        ))
+
+    def increment_stock_many(self, *, counts: Dict[int, int]) -> None:
+        """
+        Remet en stock counts[id] exemplaires de chaque livre, en un seul UPDATE
+        (sans commit ; le cache des livres est invalidé après le commit).
+        """
+        if counts:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+            self.db.execute(
+                update(Book)
+                .where(Book.id.in_(list(counts)))
+                .values(quantity=Book.quantity + case(counts, value=Book.id, else_=0))
+                .execution_options(synchronize_session="fetch")
+            )
+
+    @cache(expiry=60, ignore_self=True)  # Cache pendant 1 minute, partagé entre requêtes
     def get_stats(self) -> Dict[str, Any]:
         """
         Récupère des statistiques sur les livres.
@@ -104,37 +177,198 @@ class BookRepository(BaseRepository[Book, None, None]):
             "unique_books": unique_books,
             "avg_publication_year": avg_publication_year
         }
+
     def create(self, *, obj_in: Any) -> Book:
         """
-        Crée un nouveau livre et invalide le cache.
+        Crée un nouveau livre et invalide le cache après le commit.
         """
-        book = super().create(obj_in=obj_in)
-        invalidate_cache("src.repositories.books")
-        return book
+        invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return super().create(obj_in=obj_in)
     
     def update(self, *, db_obj: Book, obj_in: Any) -> Book:
         """
-        Met à jour un livre et invalide le cache.
+        Met à jour un livre et invalide le cache après le commit.
         """
-        book = super().update(db_obj=db_obj, obj_in=obj_in)
-        invalidate_cache("src.repositories.books")
-        return book
+        invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return super().update(db_obj=db_obj, obj_in=obj_in)
     
     def remove(self, *, id: int) -> Book:
         """
-        Supprime un livre et invalide le cache.
+        Supprime un livre et invalide le cache après le commit.
         """
-        book = super().remove(id=id)
-        invalidate_cache("src.repositories.books")
-        return book
-    
+        invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return super().remove(id=id)
+
+    def get_isbn_quantities(self) -> Dict[str, int]:
+        """
+        Charge en une requête l'ISBN et la quantité de tous les livres.
+        """
+        return dict(self.db.execute(select(Book.isbn, Book.quantity)).all())
+
+    def bulk_insert(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insère des livres en un seul executemany (sans entités ORM ni commit).
+        """
+        if rows:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+            self.db.execute(insert(Book.__table__), rows)
+
+    def bulk_update_by_isbn(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Met à jour des livres existants, identifiés par leur ISBN (sans commit) :
+        un executemany par jeu de colonnes, seules les clés de chaque ligne sont écrites.
+        """
+        if rows:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+            table = Book.__table__
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for row in rows:
+                groups.setdefault(tuple(sorted(row)), []).append({**row, "match_isbn": row["isbn"]})
+            for params in groups.values():
+                self.db.execute(update(table).where(table.c.isbn == bindparam("match_isbn")), params)
+
+    def search_query(self, query: str, *, ranked: bool = True) -> Query:
+        """
+        Construit la requête de recherche par titre, auteur, ISBN ou description.
+        Sous SQLite, la recherche passe par l'index FTS5 et les résultats sont
+        classés par pertinence (BM25) ; sinon on retombe sur des filtres LIKE.
+        """
+        return apply_search(
+            self.list_query(), query, dialect_name=self.db.get_bind().dialect.name, ranked=ranked
+        )
 
     def search(self, query: str) -> List[BookModel]:
-        return self.db.query(self.model).filter(
+        """
+        Recherche des livres par titre, auteur, ISBN ou description.
+        """
+        return self.search_query(query).all()
+
+
+class AsyncBookRepository(AsyncBaseRepository[Book]):
+    """
+    Variante asynchrone de BookRepository pour les routes les plus sollicitées.
+    """
+    def list_statement(self) -> Select:
+        """
+        Requête de base des livres, catégories chargées en une requête IN.
+        """
+        return select(Book).options(selectinload(Book.categories))
+
+    def search_statement(self, query: str, *, ranked: bool = True) -> Select:
+        """
+        Requête de recherche (voir BookRepository.search_query).
+        """
+        return apply_search(
+            self.list_statement(), query, dialect_name=self.db.get_bind().dialect.name, ranked=ranked
+        )
+
+    async def facet_counts(
+        self, statement: Select, *, limit: int, key: Hashable, expiry: float
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Comptes par facette des résultats d'une recherche (voir facet_statement), mis en
+        cache `expiry` secondes sous `key`, qui doit identifier les filtres normalisés.
+        """
+        cache_key = (key, limit)
+        facets = cache_backend.get(FACETS_NAMESPACE, cache_key)
+        if facets is _MISSING:
+            facets = {name: [] for name in FACETS}
+            for facet, value, label, count in await self.db.execute(facet_statement(statement, limit=limit)):
+                facets[facet].append({"value": value, "label": label, "count": count})
+            cache_backend.set(FACETS_NAMESPACE, cache_key, facets, expiry)
+        return facets
+
+    async def decrement_stock(self, *, book_id: int) -> bool:
+        """
+        Retire un exemplaire du stock de façon atomique (UPDATE conditionnel,
+        sans commit ; le cache des livres est invalidé après le commit).
+        Renvoie False si le livre n'a plus d'exemplaire disponible.
+        """
+        result = await self.db.execute(
+            update(Book).where(Book.id == book_id, Book.quantity > 0)
+            .values(quantity=Book.quantity - 1)
+            .execution_options(synchronize_session="fetch")
+        )
+        if result.rowcount:
+            invalidate_after_commit(self.db, CACHE_NAMESPACE)
+        return result.rowcount == 1
+
+
+def apply_search(statement, query: str, *, dialect_name: str, ranked: bool = True):
+    """
+    Ajoute la recherche plein texte à une Query ou un Select sur Book : index FTS5
+    classé par BM25 sous SQLite, filtres LIKE sinon ou sans mot exploitable.
+    """
+    match = fts_match_expression(query)
+    if match is None or dialect_name != "sqlite":
+        return statement.filter(
             or_(
-                self.model.title.ilike(f"%{query}%"),
-                self.model.author.ilike(f"%{query}%"),
-                self.model.description.ilike(f"%{query}%"),
-                self.model.isbn.ilike(f"%{query}%")
+                Book.title.ilike(f"%{query}%"),
+                Book.author.ilike(f"%{query}%"),
+                Book.description.ilike(f"%{query}%"),
+                Book.isbn.ilike(f"%{query}%")
             )
-        ).all()
+        )
+
+    statement = statement.join(
+        book_fts, book_fts.c.rowid == Book.id
+    ).filter(
+        book_fts.c.book_fts.op("MATCH")(match)
+    )
+    if ranked:
+        statement = statement.order_by(book_fts.c.rank)
+    return statement
+
+
+FACETS = ("category", "language", "decade", "availability")
+
+
+def facet_statement(statement: Select, *, limit: int) -> Select:
+    """
+    Compte les résultats d'une recherche par catégorie, langue, décennie de publication
+    et disponibilité, en une seule requête : les livres retenus forment une CTE, chaque
+    facette un GROUP BY, et seules les `limit` valeurs les plus fréquentes sont gardées.
+    Renvoie des lignes (facet, value, label, count).
+    """
+    hits = statement.with_only_columns(Book.id).order_by(None).cte("hits")
+    in_hits = Book.id.in_(select(hits.c.id))
+    groups = [
+        select(
+            literal("category").label("facet"),
+            cast(Category.id, String).label("value"),
+            Category.name.label("label"),
+            func.count().label("count")
+        ).join(book_category, book_category.c.category_id == Category.id)
+        .where(book_category.c.book_id.in_(select(hits.c.id)))
+        .group_by(Category.id, Category.name),
+    ]
+    for facet, value in (
+        ("language", Book.language),
+        ("decade", cast(Book.publication_year // 10 * 10, String)),
+        ("availability", case((Book.quantity > 0, "available"), else_="unavailable")),
+    ):
+        groups.append(
+            select(literal(facet), value, null(), func.count()).where(in_hits).group_by(value)
+        )
+
+    counts = union_all(*groups).subquery()
+    ranked = select(
+        counts,
+        func.row_number().over(
+            partition_by=counts.c.facet, order_by=(counts.c.count.desc(), counts.c.value)
+        ).label("rank")
+    ).subquery()
+    return select(ranked.c.facet, ranked.c.value, ranked.c.label, ranked.c.count).where(
+        ranked.c.rank <= limit
+    ).order_by(ranked.c.facet, ranked.c.rank)
+
+
+def fts_match_expression(query: str) -> Optional[str]:
+    """
+    Transforme une saisie utilisateur en expression MATCH FTS5 : chaque mot
+    devient un préfixe entre guillemets, combinés par un ET implicite.
+    """
+    tokens = re.findall(r"\w+", query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
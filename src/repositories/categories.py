@@ -1,8 +1,8 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, select
+from typing import Any, List, Optional
 
 from .base import BaseRepository
-from ..models.categories import Category
+from ..models.categories import Category, book_category
 
 
 class CategoryRepository(BaseRepository[Category, None, None]):
@@ -22,4 +22,17 @@ class CategoryRepository(BaseRepository[Category, None, None]):
             if description:
                 category_data["description"] = description
             category = self.create(obj_in=category_data)
-        return category
\ No newline at end of file
+        return category
+
+    def get_multi_with_counts(self, *, skip: int = 0, limit: int = 100) -> List[Any]:
+        """
+        Récupère des catégories avec leur nombre de livres, en une requête GROUP BY.
+        """
+        return self.db.execute(
+            select(*Category.__table__.columns, func.count(book_category.c.book_id).label("book_count"))
+            .outerjoin(book_category, book_category.c.category_id == Category.id)
+            .group_by(Category.id)
+            .order_by(Category.id)
+            .offset(skip)
+            .limit(limit)
+        ).all()
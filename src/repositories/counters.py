@@ -0,0 +1,162 @@
+from typing import Any, Dict, List
+from datetime import datetime
+from sqlalchemy import func, case, select, true, update, delete
+
+from .base import BaseRepository
+from ..models.counters import LibraryCounter, LoanMonthlyCount
+from ..models.books import Book
+from ..models.users import User
+from ..models.loans import Loan
+
+
+COUNTER_NAMES = (
+    "total_books",
+    "unique_books",
+    "total_users",
+    "active_users",
+    "total_loans",
+    "active_loans",
+)
+
+
+def loan_month(date: datetime) -> str:
+    """
+    Clé de mois (YYYY-MM) utilisée par le cumul mensuel des emprunts.
+    """
+    return date.strftime("%Y-%m")
+
+
+class CounterRepository(BaseRepository[LibraryCounter, None, None]):
+    """
+    Compteurs de la bibliothèque et cumul mensuel des emprunts.
+    Les mises à jour sont de simples UPDATE relatifs exécutés dans la
+    transaction de l'appelant : elles sont validées avec elle.
+    """
+    def get_counters(self) -> Dict[str, int]:
+        """
+        Lit les compteurs, sans effet de bord. Tant qu'ils n'ont pas été construits
+        (migration f4c2a8d17b63, scripts/rebuild_counters.py), ils sont calculés
+        à partir des tables sans être enregistrés.
+        """
+        rows = self.db.query(LibraryCounter.name, LibraryCounter.value).all()
+        if not rows:
+            return self.compute_counters()
+        return {name: value for name, value in rows}
+    
+    def get_monthly_loans(self, *, since: str) -> List[Any]:
+        """
+        Récupère le cumul mensuel des emprunts à partir du mois donné (inclus) : lignes
+        (month, loan_count). Calculé à partir des emprunts si les compteurs n'ont pas
+        été construits (le cumul est alors incomplet).
+        """
+        if self.db.query(LibraryCounter.id).first() is None:
+            month = func.strftime("%Y-%m", Loan.loan_date)
+            return self.db.query(
+                month.label("month"), func.count(Loan.id).label("loan_count")
+            ).filter(month >= since).group_by(month).order_by(month).all()
+        return self.db.query(LoanMonthlyCount.month, LoanMonthlyCount.loan_count).filter(
+            LoanMonthlyCount.month >= since
+        ).order_by(LoanMonthlyCount.month).all()
+    
+    def increment(self, **deltas: int) -> None:
+        """
+        Applique des variations aux compteurs. Sans effet tant que les compteurs
+        n'ont pas été construits : la reconstruction partira des tables.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        # Un seul UPDATE pour tous les compteurs concernés
+        self.db.execute(
+            update(LibraryCounter)
+            .where(LibraryCounter.name.in_(list(deltas)))
+            .values(value=LibraryCounter.value + case(deltas, value=LibraryCounter.name, else_=0)),
+            execution_options={"synchronize_session": False}
+        )
+    
+    def increment_month(self, *, month: str, delta: int = 1) -> None:
+        """
+        Met à jour le cumul d'emprunts d'un mois, en créant la ligne si besoin.
+        """
+        result = self.db.execute(
+            update(LoanMonthlyCount)
+            .where(LoanMonthlyCount.month == month)
+            .values(loan_count=LoanMonthlyCount.loan_count + delta)
+        )
+        if result.rowcount == 0 and delta > 0:
+            self.db.add(LoanMonthlyCount(month=month, loan_count=delta))
+    
+    def record_loan(self, *, loan_date: datetime, count: int = 1) -> None:
+        """
+        Enregistre de nouveaux emprunts (autant d'exemplaires de moins en stock).
+        """
+        self.increment(total_loans=count, active_loans=count, total_books=-count)
+        self.increment_month(month=loan_month(loan_date), delta=count)
+    
+    def record_return(self, *, count: int = 1) -> None:
+        """
+        Enregistre des retours d'emprunts (autant d'exemplaires de plus en stock).
+        """
+        self.increment(active_loans=-count, total_books=count)
+    
+    def discount_loans(self, *criteria: Any) -> None:
+        """
+        Retire des compteurs les emprunts qui vont être supprimés en cascade.
+        """
+        total, active = self.db.query(
+            func.count(Loan.id),
+            func.coalesce(func.sum(case((Loan.return_date == None, 1), else_=0)), 0)
+        ).filter(*criteria).one()
+        if not total:
+            return
+        self.increment(total_loans=-total, active_loans=-active)
+        
+        months = self.db.query(
+            func.strftime("%Y-%m", Loan.loan_date),
+            func.count(Loan.id)
+        ).filter(*criteria).group_by(func.strftime("%Y-%m", Loan.loan_date)).all()
+        for month, count in months:
+            self.increment_month(month=month, delta=-count)
+    
+    def compute_counters(self) -> Dict[str, int]:
+        """
+        Calcule les compteurs à partir des tables, en une seule requête :
+        un agrégat conditionnel par table, joints entre eux.
+        """
+        book_stats = self.db.query(
+            func.coalesce(func.sum(Book.quantity), 0).label("total_books"),
+            func.count(Book.id).label("unique_books")
+        ).subquery()
+        user_stats = self.db.query(
+            func.count(User.id).label("total_users"),
+            func.coalesce(func.sum(case((User.is_active == True, 1), else_=0)), 0).label("active_users")
+        ).subquery()
+        loan_stats = self.db.query(
+            func.count(Loan.id).label("total_loans"),
+            func.coalesce(func.sum(case((Loan.return_date == None, 1), else_=0)), 0).label("active_loans")
+        ).subquery()
+        
+        row = self.db.execute(
+            select(book_stats, user_stats, loan_stats).select_from(
+                book_stats.join(user_stats, true()).join(loan_stats, true())
+            )
+        ).one()
+        return {name: getattr(row, name) for name in COUNTER_NAMES}
+    
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Recalcule entièrement les compteurs et le cumul mensuel (réparation d'une dérive).
+        """
+        counters = self.compute_counters()
+        self.db.execute(delete(LibraryCounter))
+        self.db.add_all([LibraryCounter(name=name, value=value) for name, value in counters.items()])
+        
+        months = self.db.query(
+            func.strftime("%Y-%m", Loan.loan_date),
+            func.count(Loan.id)
+        ).group_by(func.strftime("%Y-%m", Loan.loan_date)).all()
+        self.db.execute(delete(LoanMonthlyCount))
+        self.db.add_all([LoanMonthlyCount(month=month, loan_count=count) for month, count in months])
+        
+        self.db.flush()
+        return counters
@@ -1,42 +1,206 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Query, joinedload, noload, selectinload
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, or_
+from sqlalchemy import case, func, and_, select, insert, update
 
-from .base import BaseRepository
+from .base import AsyncBaseRepository, BaseRepository
+from .counters import CounterRepository, loan_month
 from ..models.loans import Loan
 from ..models.books import Book
 from ..models.users import User
+from ..models.counters import LibraryCounter
+
+
+# Relations d'un emprunt pouvant être embarquées dans les listes (?expand=book,user)
+LOAN_RELATIONS = ("book", "user")
+
+# Statuts d'un emprunt vus par l'emprunteur ; "active" inclut les emprunts en retard
+LOAN_STATUSES = ("active", "overdue", "returned")
+
+
+def loan_status_criteria(status: str, now: datetime) -> tuple:
+    """
+    Critères SQL d'un statut d'emprunt.
+    """
+    if status == "active":
+        return (Loan.return_date == None,)
+    if status == "overdue":
+        return (Loan.return_date == None, Loan.due_date < now)
+    if status == "returned":
+        return (Loan.return_date != None,)
+    raise ValueError(f"Statut d'emprunt inconnu : {status}")
 
 
 class LoanRepository(BaseRepository[Loan, None, None]):
-    def get_active_loans(self) -> List[Loan]:
+    def summary_query(self) -> Query:
+        """
+        Vue compacte des emprunts : colonnes de l'emprunt, titre, auteur et ISBN du livre,
+        nom et email de l'emprunteur, en une seule requête jointe.
+        """
+        return self.db.query(
+            *Loan.__table__.columns,
+            Book.title.label("book_title"),
+            Book.author.label("book_author"),
+            Book.isbn.label("book_isbn"),
+            User.full_name.label("user_full_name"),
+            User.email.label("user_email"),
+        ).join(Book, Book.id == Loan.book_id).join(User, User.id == Loan.user_id)
+
+    def list_query(self, *, expand: Collection[str] = LOAN_RELATIONS) -> Query:
+        """
+        Requête de base des listes d'emprunts. Sans relation à embarquer, renvoie la vue
+        compacte ; sinon des entités Loan dont seules les relations demandées sont chargées
+        (livre avec ses catégories, emprunteur), chacune en une requête IN.
+        """
+        if not expand:
+            return self.summary_query()
+        return self.db.query(Loan).options(
+            selectinload(Loan.book).selectinload(Book.categories) if "book" in expand else noload(Loan.book),
+            selectinload(Loan.user) if "user" in expand else noload(Loan.user),
+        )
+
+    def list_loans(
+        self, *criteria, expand: Collection[str] = LOAN_RELATIONS, skip: int = 0, limit: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Liste les emprunts correspondant aux critères, du plus ancien au plus récent.
+        """
+        query = self.list_query(expand=expand).filter(*criteria).order_by(Loan.id).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_active_loans(self, *, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts actifs (non retournés).
         """
-        return self.db.query(Loan).filter(Loan.return_date == None).all()
+        return self.list_loans(Loan.return_date == None, expand=expand)
     
-    def get_overdue_loans(self) -> List[Loan]:
+    def get_overdue_loans(self, *, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts en retard.
         """
         now = datetime.utcnow()
-        return self.db.query(Loan).filter(
-            Loan.return_date == None,
-            Loan.due_date < now
-        ).all()
+        return self.list_loans(Loan.return_date == None, Loan.due_date < now, expand=expand)
     
-    def get_loans_by_user(self, *, user_id: int) -> List[Loan]:
+    def get_loans_by_user(self, *, user_id: int, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts d'un utilisateur.
         """
-        return self.db.query(Loan).filter(Loan.user_id == user_id).all()
+        return self.list_loans(Loan.user_id == user_id, expand=expand)
     
-    def get_loans_by_book(self, *, book_id: int) -> List[Loan]:
+    def user_loans_query(self, *, user_id: int, status: Optional[str] = None) -> Query:
+        """
+        Vue compacte des emprunts d'un utilisateur, éventuellement filtrés par statut
+        (index (user_id, return_date)).
+        """
+        query = self.summary_query().filter(Loan.user_id == user_id)
+        if status:
+            query = query.filter(*loan_status_criteria(status, datetime.utcnow()))
+        return query
+
+    def count_user_loans_by_status(self, *, user_id: int) -> Dict[str, int]:
+        """
+        Compte les emprunts d'un utilisateur par statut, en une requête agrégée.
+        """
+        now = datetime.utcnow()
+        row = self.db.query(
+            func.count(Loan.id),
+            *(func.count(case((and_(*loan_status_criteria(status, now)), 1))) for status in LOAN_STATUSES)
+        ).filter(Loan.user_id == user_id).one()
+        return dict(zip(("total",) + LOAN_STATUSES, row))
+
+    def get_active_book_ids(self, *, user_id: int) -> Set[int]:
+        """
+        Livres empruntés et non rendus par un utilisateur (index (user_id, return_date)).
+        """
+        return set(self.db.scalars(
+            select(Loan.book_id).where(Loan.user_id == user_id, Loan.return_date == None)
+        ))
+
+    def bulk_create(self, rows: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """
+        Crée des emprunts en un seul INSERT multi-lignes (sans entités ORM ni commit) ;
+        renvoie (id de l'emprunt, id du livre) de chaque ligne créée.
+        """
+        if not rows:
+            return []
+        return [tuple(row) for row in self.db.execute(
+            insert(Loan.__table__).values(rows).returning(Loan.id, Loan.book_id)
+        )]
+
+    def get_return_states(self, *, loan_ids: List[int]) -> Dict[int, Tuple[int, Optional[datetime]]]:
+        """
+        Charge en une requête le livre et la date de retour de plusieurs emprunts.
+        """
+        if not loan_ids:
+            return {}
+        rows = self.db.execute(
+            select(Loan.id, Loan.book_id, Loan.return_date).where(Loan.id.in_(loan_ids))
+        ).all()
+        return {id: (book_id, return_date) for id, book_id, return_date in rows}
+
+    def get_active_loans_by_isbn(
+        self, *, isbns: List[str], user_id: Optional[int] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Emprunts non rendus de chaque ISBN, du plus ancien au plus récent
+        (isbn -> [(id de l'emprunt, id du livre)]), éventuellement limités à un
+        emprunteur, en une requête.
+        """
+        if not isbns:
+            return {}
+        statement = select(Book.isbn, Loan.id, Loan.book_id).join(Book, Book.id == Loan.book_id).where(
+            Book.isbn.in_(isbns), Loan.return_date == None
+        )
+        if user_id is not None:
+            statement = statement.where(Loan.user_id == user_id)
+        loans: Dict[str, List[Tuple[int, int]]] = {}
+        for isbn, loan_id, book_id in self.db.execute(statement.order_by(Loan.loan_date, Loan.id)):
+            loans.setdefault(isbn, []).append((loan_id, book_id))
+        return loans
+
+    def mark_returned(self, *, loan_ids: List[int], return_date: datetime) -> List[Tuple[int, int]]:
+        """
+        Marque comme retournés les emprunts encore actifs, en un seul UPDATE (sans commit).
+        Renvoie (id de l'emprunt, id du livre) des emprunts effectivement modifiés.
+        """
+        if not loan_ids:
+            return []
+        return [tuple(row) for row in self.db.execute(
+            update(Loan)
+            .where(Loan.id.in_(loan_ids), Loan.return_date == None)
+            .values(return_date=return_date)
+            .returning(Loan.id, Loan.book_id)
+            .execution_options(synchronize_session="fetch")
+        )]
+
+    def has_active_loan(self, *, user_id: int, book_id: int) -> bool:
+        """
+        Indique si l'utilisateur a un emprunt non retourné de ce livre (EXISTS indexé).
+        """
+        return self.db.query(
+            self.db.query(Loan.id).filter(
+                Loan.user_id == user_id,
+                Loan.return_date == None,
+                Loan.book_id == book_id
+            ).exists()
+        ).scalar()
+    
+    def count_active_loans_by_user(self, *, user_id: int) -> int:
+        """
+        Compte les emprunts non retournés d'un utilisateur (index (user_id, return_date)).
+        """
+        return self.db.query(func.count(Loan.id)).filter(
+            Loan.user_id == user_id,
+            Loan.return_date == None
+        ).scalar() or 0
+    
+    def get_loans_by_book(self, *, book_id: int, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts d'un livre.
         """
-        return self.db.query(Loan).filter(Loan.book_id == book_id).all()
+        return self.list_loans(Loan.book_id == book_id, expand=expand)
     
     def get_with_details(self, *, id: int) -> Optional[Loan]:
         """
@@ -58,11 +222,11 @@ class LoanRepository(BaseRepository[Loan, None, None]):
     
     def get_loans_stats(self) -> Dict[str, Any]:
         """
-        Récupère des statistiques sur les emprunts.
+        Récupère des statistiques sur les emprunts (depuis les compteurs).
         """
         now = datetime.utcnow()
-        total_loans = self.db.query(func.count(Loan.id)).scalar() or 0
-        active_loans = self.db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0
+        counters = CounterRepository(LibraryCounter, self.db)
+        totals = counters.get_counters()
         overdue_loans = self.db.query(func.count(Loan.id)).filter(
             Loan.return_date == None,
             Loan.due_date < now
@@ -70,20 +234,29 @@ class LoanRepository(BaseRepository[Loan, None, None]):
         
         # Emprunts par mois (12 derniers mois)
         start_date = now - timedelta(days=365)
-        loans_by_month = self.db.query(
-            func.strftime("%Y-%m", Loan.loan_date).label("month"),
-            func.count(Loan.id).label("count")
-        ).filter(
-            Loan.loan_date >= start_date
-        ).group_by(
-            func.strftime("%Y-%m", Loan.loan_date)
-        ).all()
+        loans_by_month = counters.get_monthly_loans(since=loan_month(start_date))
         
-        loans_by_month_dict = {month: count for month, count in loans_by_month}
+        loans_by_month_dict = {row.month: row.loan_count for row in loans_by_month if row.loan_count > 0}
         
         return {
-            "total_loans": total_loans,
-            "active_loans": active_loans,
+            "total_loans": totals["total_loans"],
+            "active_loans": totals["active_loans"],
             "overdue_loans": overdue_loans,
             "loans_by_month": loans_by_month_dict
-        }
\ No newline at end of file
+        }
+
+
+class AsyncLoanRepository(AsyncBaseRepository[Loan]):
+    """
+    Variante asynchrone de LoanRepository pour les routes les plus sollicitées.
+    """
+    async def get_with_details(self, *, id: int) -> Optional[Loan]:
+        """
+        Récupère un emprunt avec son utilisateur, son livre et les catégories du livre.
+        """
+        return await self.db.scalar(
+            select(Loan).options(
+                selectinload(Loan.user),
+                selectinload(Loan.book).selectinload(Book.categories)
+            ).where(Loan.id == id)
+        )
@@ -1,6 +1,9 @@
-from sqlalchemy.orm import Session
+from typing import Iterator, Optional
 
-from .base import BaseRepository
+from sqlalchemy import select
+from sqlalchemy.orm import Query, selectinload
+
+from .base import AsyncBaseRepository, BaseRepository
 from ..models.users import User
 
 
@@ -9,4 +12,29 @@ class UserRepository(BaseRepository[User, None, None]):
         """
         Récupère un utilisateur par son email.
         """
-        return self.db.query(User).filter(User.email == email).first()
\ No newline at end of file
+        return self.db.query(User).filter(User.email == email).first()
+
+    def query_with_loans(self) -> Query:
+        """
+        Requête des utilisateurs avec leurs emprunts chargés par lot
+        (une requête IN par page d'utilisateurs au lieu d'une par utilisateur).
+        """
+        return self.db.query(User).options(selectinload(User.loans))
+
+    def iter_with_loans(self, *, batch_size: int = 500) -> Iterator[User]:
+        """
+        Parcourt tous les utilisateurs et leurs emprunts par lots de batch_size,
+        sans charger la table entière en mémoire.
+        """
+        return iter(self.query_with_loans().order_by(User.id).yield_per(batch_size))
+
+
+class AsyncUserRepository(AsyncBaseRepository[User]):
+    """
+    Variante asynchrone de UserRepository (authentification des routes async).
+    """
+    async def get_by_email(self, *, email: str) -> Optional[User]:
+        """
+        Récupère un utilisateur par son email.
+        """
+        return await self.db.scalar(select(User).where(User.email == email))
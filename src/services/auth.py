@@ -1,37 +1,73 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Optional
 
-from src.config import settings
-from src.db.session import get_db
+from src.db.session import get_async_read_db, get_read_db
 from src.models.users import User as UserModel
-from src.repositories.users import UserRepository
+from src.repositories.users import AsyncUserRepository, UserRepository
+from src.utils.security import decode_access_token, verify_and_update_password_async
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> UserModel:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les identifiants",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> int:
+    credentials_exception = _credentials_exception()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = decode_access_token(token)
         user_id: int = int(payload.get("sub"))
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    return user_id
 
-    user = UserRepository(UserModel, db).get(id=user_id)
+
+def _check_user(user: Optional[UserModel]) -> UserModel:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
+def get_current_user(
+    db: Session = Depends(get_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> UserModel:
+    user_id = _user_id_from_token(token)
+    return _check_user(UserRepository(UserModel, db).get(id=user_id))
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> UserModel:
+    user_id = _user_id_from_token(token)
+    return _check_user(await AsyncUserRepository(UserModel, db).get(id=user_id))
+
+
+async def authenticate_async(db: AsyncSession, *, email: str, password: str) -> Optional[UserModel]:
+    """
+    Variante asynchrone de UserService.authenticate : la route attend bcrypt sans
+    occuper de thread, et le hash est recalculé si le coût bcrypt configuré a changé.
+    """
+    repository = AsyncUserRepository(UserModel, db)
+    user = await repository.get_by_email(email=email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        user = await repository.update(db_obj=user, obj_in={"hashed_password": new_hash})
+    return user
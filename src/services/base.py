@@ -1,11 +1,12 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from contextlib import contextmanager
+from typing import Any, Dict, Generic, Iterator, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..models.base import Base
-from ..repositories.base import BaseRepository
+from ..repositories.base import BaseRepository, UNIT_OF_WORK_KEY
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
@@ -19,6 +20,36 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, repository: BaseRepository):
         self.repository = repository
     
+    @contextmanager
+    def unit_of_work(self) -> Iterator[Session]:
+        """
+        Regroupe les écritures des repositories dans une seule transaction :
+        pendant le bloc, les repositories partageant la session font un flush
+        au lieu d'un commit, et la transaction est validée une fois à la sortie
+        (annulée en cas d'exception). Les blocs imbriqués rejoignent le bloc externe.
+
+        Les objets ne sont pas expirés au commit : leur état en mémoire vient
+        d'être écrit, inutile de les recharger.
+        """
+        db = self.repository.db
+        depth = db.info.get(UNIT_OF_WORK_KEY, 0)
+        db.info[UNIT_OF_WORK_KEY] = depth + 1
+        try:
+            yield db
+            if depth == 0:
+                expire_on_commit = db.expire_on_commit
+                db.expire_on_commit = False
+                try:
+                    db.commit()
+                finally:
+                    db.expire_on_commit = expire_on_commit
+        except Exception:
+            if depth == 0:
+                db.rollback()
+            raise
+        finally:
+            db.info[UNIT_OF_WORK_KEY] = depth
+    
     def get(self, id: Any) -> Optional[ModelType]:
         """
         Récupère un objet par son ID.
@@ -35,7 +66,8 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Crée un nouvel objet.
         """
-        return self.repository.create(obj_in=obj_in)
+        with self.unit_of_work():
+            return self.repository.create(obj_in=obj_in)
     
     def update(
         self,
@@ -46,10 +78,12 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         Met à jour un objet existant.
         """
-        return self.repository.update(db_obj=db_obj, obj_in=obj_in)
+        with self.unit_of_work():
+            return self.repository.update(db_obj=db_obj, obj_in=obj_in)
     
     def remove(self, *, id: int) -> ModelType:
         """
         Supprime un objet.
         """
-        return self.repository.remove(id=id)
\ No newline at end of file
+        with self.unit_of_work():
+            return self.repository.remove(id=id)
\ No newline at end of file
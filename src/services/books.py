@@ -1,10 +1,17 @@
-from typing import List, Optional, Any, Dict, Union
+import time
+from typing import Iterable, List, Optional, Any, Dict, Union
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from ..repositories.books import BookRepository
+from ..repositories.counters import CounterRepository
 from ..models.books import Book
 from ..models.books import Book as BookModel
+from ..models.loans import Loan
+from ..models.counters import LibraryCounter
 from ..api.schemas.books import BookCreate, BookUpdate
+from ..utils.importers import ImportRecord, chunked
 from .base import BaseService
 
 
@@ -15,6 +22,7 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
     def __init__(self, repository: BookRepository):
         super().__init__(repository)
         self.repository = repository
+        self.counter_repository = CounterRepository(LibraryCounter, repository.db)
     
     def get_by_isbn(self, *, isbn: str) -> Optional[Book]:
         """
@@ -43,7 +51,30 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
         if existing_book:
             raise ValueError("L'ISBN est déjà utilisé")
         
-        return self.repository.create(obj_in=obj_in)
+        with self.unit_of_work():
+            self.counter_repository.increment(unique_books=1, total_books=obj_in.quantity)
+            return self.repository.create(obj_in=obj_in)
+    
+    def update(self, *, db_obj: Book, obj_in: Union[BookUpdate, Dict[str, Any]]) -> Book:
+        """
+        Met à jour un livre, en répercutant un changement de quantité sur les compteurs.
+        """
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        with self.unit_of_work():
+            if update_data.get("quantity") is not None:
+                self.counter_repository.increment(total_books=update_data["quantity"] - db_obj.quantity)
+            return self.repository.update(db_obj=db_obj, obj_in=update_data)
+    
+    def remove(self, *, id: int) -> Book:
+        """
+        Supprime un livre et ses emprunts, en mettant à jour les compteurs.
+        """
+        book = self.get(id=id)
+        with self.unit_of_work():
+            if book:
+                self.counter_repository.discount_loans(Loan.book_id == id)
+                self.counter_repository.increment(unique_books=-1, total_books=-book.quantity)
+            return self.repository.remove(id=id)
     
     def update_quantity(self, *, book_id: int, quantity_change: int) -> Book:
         """
@@ -57,7 +88,84 @@ class BookService(BaseService[Book, BookCreate, BookUpdate]):
         if new_quantity < 0:
             raise ValueError("La quantité ne peut pas être négative")
         
-        return self.repository.update(db_obj=book, obj_in={"quantity": new_quantity})
+        return self.update(db_obj=book, obj_in={"quantity": new_quantity})
     
+    def bulk_import(
+        self,
+        records: Iterable[ImportRecord],
+        *,
+        batch_size: int = 1000,
+        update_existing: bool = False,
+        max_errors: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Importe un catalogue par lots de batch_size lignes : validation, dédoublonnage
+        des ISBN contre un index chargé en une requête, executemany et un commit par lot.
+        Les ISBN déjà présents sont ignorés, ou mis à jour si update_existing.
+        """
+        started = time.perf_counter()
+        report = {"received": 0, "created": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": []}
+
+        def fail(line: int, isbn: Optional[str], message: str) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < max_errors:
+                report["errors"].append({"line": line, "isbn": isbn, "message": message})
+
+        # ISBN -> quantité, tenu à jour au fil de l'import (doublons internes au fichier compris)
+        known = self.repository.get_isbn_quantities()
+        for chunk in chunked(records, batch_size):
+            new_rows, existing_rows, accepted = [], [], []
+            total_delta = 0
+            for line, data, error in chunk:
+                report["received"] += 1
+                isbn = data.get("isbn") if data else None
+                if error is None:
+                    try:
+                        book = BookCreate.model_validate(data)
+                    except ValidationError as e:
+                        error = "; ".join(
+                            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+                            for detail in e.errors()
+                        )
+                if error is not None:
+                    fail(line, isbn, error)
+                    continue
+
+                isbn = book.isbn
+                if isbn in known:
+                    if not update_existing:
+                        report["skipped"] += 1
+                        continue
+                    # Seules les colonnes fournies par la ligne sont mises à jour
+                    row = book.model_dump(exclude_unset=True, exclude={"category_ids"})
+                    total_delta += row["quantity"] - known[isbn]
+                    existing_rows.append(row)
+                else:
+                    row = book.model_dump(exclude={"category_ids"})
+                    total_delta += row["quantity"]
+                    new_rows.append(row)
+                known[isbn] = row["quantity"]
+                accepted.append((line, isbn))
+
+            try:
+                with self.unit_of_work():
+                    self.repository.bulk_insert(new_rows)
+                    self.repository.bulk_update_by_isbn(existing_rows)
+                    self.counter_repository.increment(unique_books=len(new_rows), total_books=total_delta)
+            except SQLAlchemyError as e:
+                # Le lot est annulé en entier : l'index des ISBN est rechargé
+                message = f"Lot rejeté par la base : {getattr(e, 'orig', None) or e}"
+                for line, isbn in accepted:
+                    fail(line, isbn, message)
+                known = self.repository.get_isbn_quantities()
+                continue
+            report["created"] += len(new_rows)
+            report["updated"] += len(existing_rows)
+
+        elapsed = time.perf_counter() - started
+        report["duration_seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["received"] / elapsed, 1) if elapsed > 0 else 0.0
+        return report
+
     def search(self, query: str) -> List[BookModel]:
         return self.repository.search(query=query)
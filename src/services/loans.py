@@ -1,16 +1,22 @@
-from typing import List, Optional, Any, Dict, Union
+from collections import Counter
+from typing import Collection, List, Optional, Any, Dict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from ..repositories.loans import LoanRepository
+from ..repositories.loans import LOAN_RELATIONS, LoanRepository
 from ..repositories.books import BookRepository
 from ..repositories.users import UserRepository
+from ..repositories.counters import CounterRepository
 from ..models.loans import Loan
 from ..models.books import Book
 from ..models.users import User
+from ..models.counters import LibraryCounter
 from ..api.schemas.loans import LoanCreate, LoanUpdate
 from .base import BaseService
 
+# Nombre maximal d'emprunts simultanés par utilisateur
+MAX_ACTIVE_LOANS = 5
+
 
 class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
     """
@@ -26,30 +32,39 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         self.loan_repository = loan_repository
         self.book_repository = book_repository
         self.user_repository = user_repository
+        self.counter_repository = CounterRepository(LibraryCounter, loan_repository.db)
     
-    def get_active_loans(self) -> List[Loan]:
+    def get_loans(
+        self, *, skip: int = 0, limit: int = 100, expand: Collection[str] = LOAN_RELATIONS
+    ) -> List[Any]:
+        """
+        Récupère une page d'emprunts (vue compacte si expand est vide).
+        """
+        return self.loan_repository.list_loans(expand=expand, skip=skip, limit=limit)
+
+    def get_active_loans(self, *, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts actifs (non retournés).
         """
-        return self.loan_repository.get_active_loans()
+        return self.loan_repository.get_active_loans(expand=expand)
     
-    def get_overdue_loans(self) -> List[Loan]:
+    def get_overdue_loans(self, *, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts en retard.
         """
-        return self.loan_repository.get_overdue_loans()
+        return self.loan_repository.get_overdue_loans(expand=expand)
     
-    def get_loans_by_user(self, *, user_id: int) -> List[Loan]:
+    def get_loans_by_user(self, *, user_id: int, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts d'un utilisateur.
         """
-        return self.loan_repository.get_loans_by_user(user_id=user_id)
+        return self.loan_repository.get_loans_by_user(user_id=user_id, expand=expand)
     
-    def get_loans_by_book(self, *, book_id: int) -> List[Loan]:
+    def get_loans_by_book(self, *, book_id: int, expand: Collection[str] = LOAN_RELATIONS) -> List[Any]:
         """
         Récupère les emprunts d'un livre.
         """
-        return self.loan_repository.get_loans_by_book(book_id=book_id)
+        return self.loan_repository.get_loans_by_book(book_id=book_id, expand=expand)
     
     def create_loan(
         self,
@@ -80,32 +95,30 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
             raise ValueError("Le livre n'est pas disponible pour l'emprunt")
         
         # Vérifier si l'utilisateur a déjà emprunté ce livre et ne l'a pas rendu
-        active_loans = self.loan_repository.get_active_loans()
-        for loan in active_loans:
-            if loan.user_id == user_id and loan.book_id == book_id:
-                raise ValueError("L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu")
-        
-        # Vérifier le nombre d'emprunts actifs de l'utilisateur (limite à 5 par exemple)
-        user_active_loans = [loan for loan in active_loans if loan.user_id == user_id]
-        if len(user_active_loans) >= 5:
-            raise ValueError("L'utilisateur a atteint la limite d'emprunts simultanés (5)")
+        if self.loan_repository.has_active_loan(user_id=user_id, book_id=book_id):
+            raise ValueError("L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu")
         
-        # Créer l'emprunt
-        loan_data = {
-            "user_id": user_id,
-            "book_id": book_id,
-            "loan_date": datetime.utcnow(),
-            "due_date": datetime.utcnow() + timedelta(days=loan_period_days),
-            "return_date": None
-        }
-        
-        loan = self.loan_repository.create(obj_in=loan_data)
-        
-        # Mettre à jour la quantité de livres disponibles
-        book.quantity -= 1
-        self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
+        # Vérifier le nombre d'emprunts actifs de l'utilisateur
+        if self.loan_repository.count_active_loans_by_user(user_id=user_id) >= MAX_ACTIVE_LOANS:
+            raise ValueError(f"L'utilisateur a atteint la limite d'emprunts simultanés ({MAX_ACTIVE_LOANS})")
         
-        return loan
+        # Le décrément, les compteurs et l'emprunt sont validés en un seul commit
+        with self.unit_of_work():
+            # Réserver un exemplaire : UPDATE conditionnel, sûr face aux emprunts concurrents
+            if not self.book_repository.decrement_stock(book_id=book_id):
+                raise ValueError("Le livre n'est pas disponible pour l'emprunt")
+            
+            # Créer l'emprunt
+            loan_data = {
+                "user_id": user_id,
+                "book_id": book_id,
+                "loan_date": datetime.utcnow(),
+                "due_date": datetime.utcnow() + timedelta(days=loan_period_days),
+                "return_date": None
+            }
+            
+            self.counter_repository.record_loan(loan_date=loan_data["loan_date"])
+            return self.loan_repository.create(obj_in=loan_data)
     
     def return_loan(self, *, loan_id: int) -> Loan:
         """
@@ -120,18 +133,144 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         if loan.return_date:
             raise ValueError("L'emprunt a déjà été retourné")
         
-        # Marquer l'emprunt comme retourné
-        loan_data = {"return_date": datetime.utcnow()}
-        loan = self.loan_repository.update(db_obj=loan, obj_in=loan_data)
-        
-        # Mettre à jour la quantité de livres disponibles
-        book = self.book_repository.get(id=loan.book_id)
-        if book:
-            book.quantity += 1
-            self.book_repository.update(db_obj=book, obj_in={"quantity": book.quantity})
-        
+        # Marquer l'emprunt comme retourné par un UPDATE conditionnel (return_date IS NULL) :
+        # de deux retours concurrents, un seul remet l'exemplaire en stock. Un seul commit.
+        with self.unit_of_work():
+            if not self.loan_repository.mark_returned(loan_ids=[loan.id], return_date=datetime.utcnow()):
+                raise ValueError("L'emprunt a déjà été retourné")
+            self.book_repository.increment_stock(book_id=loan.book_id)
+            self.counter_repository.record_return()
         return loan
     
+    def batch_checkout(
+        self,
+        *,
+        user_id: int,
+        book_ids: List[int],
+        loan_period_days: int = 14
+    ) -> Dict[str, Any]:
+        """
+        Emprunte plusieurs livres pour un même utilisateur, avec les règles de create_loan :
+        chargements ensemblistes, un UPDATE de stock, un INSERT et un seul commit.
+        Renvoie un résultat par livre ; les livres refusés n'empêchent pas les autres.
+        """
+        user = self.user_repository.get(id=user_id)
+        if not user:
+            raise ValueError(f"Utilisateur avec l'ID {user_id} non trouvé")
+        if not user.is_active:
+            raise ValueError("L'utilisateur est inactif et ne peut pas emprunter de livres")
+
+        stock = self.book_repository.get_stock(book_ids=book_ids)
+        borrowed = self.loan_repository.get_active_book_ids(user_id=user_id)
+        items, accepted = [], []
+        for book_id in book_ids:
+            error = None
+            if book_id not in stock:
+                error = f"Livre avec l'ID {book_id} non trouvé"
+            elif stock[book_id] <= 0:
+                error = "Le livre n'est pas disponible pour l'emprunt"
+            elif book_id in borrowed:
+                error = "L'utilisateur a déjà emprunté ce livre et ne l'a pas encore rendu"
+            elif len(borrowed) >= MAX_ACTIVE_LOANS:
+                error = f"L'utilisateur a atteint la limite d'emprunts simultanés ({MAX_ACTIVE_LOANS})"
+            else:
+                borrowed.add(book_id)
+                accepted.append(book_id)
+            items.append({"book_id": book_id, "loan_id": None, "success": error is None, "error": error})
+
+        loan_ids: Dict[int, int] = {}
+        if accepted:
+            with self.unit_of_work():
+                # Réserver les exemplaires : un UPDATE conditionnel, sûr face aux emprunts concurrents
+                reserved = set(self.book_repository.decrement_stock_many(book_ids=accepted))
+                now = datetime.utcnow()
+                rows = [
+                    {
+                        "user_id": user_id,
+                        "book_id": book_id,
+                        "loan_date": now,
+                        "due_date": now + timedelta(days=loan_period_days),
+                        "return_date": None
+                    }
+                    for book_id in accepted if book_id in reserved
+                ]
+                if rows:
+                    loan_ids = {
+                        book_id: loan_id for loan_id, book_id in self.loan_repository.bulk_create(rows)
+                    }
+                    self.counter_repository.record_loan(loan_date=now, count=len(rows))
+
+        for item in items:
+            if item["success"]:
+                item["loan_id"] = loan_ids.get(item["book_id"])
+                if item["loan_id"] is None:
+                    item["success"] = False
+                    item["error"] = "Le livre n'est pas disponible pour l'emprunt"
+        return _batch_report(items)
+
+    def batch_return(
+        self,
+        *,
+        loan_ids: Collection[int] = (),
+        isbns: Collection[str] = (),
+        user_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Retourne plusieurs emprunts, désignés par leur id ou par l'ISBN du livre (emprunts
+        en cours du plus ancien au plus récent, de user_id si fourni : un ISBN présent
+        N fois désigne N emprunts distincts) : chargements ensemblistes, un UPDATE
+        des emprunts, un UPDATE de stock et un seul commit. Renvoie un résultat par élément.
+        """
+        if not loan_ids and not isbns:
+            raise ValueError("Aucun emprunt à retourner")
+
+        states = self.loan_repository.get_return_states(loan_ids=list(loan_ids))
+        by_isbn = {
+            isbn: iter(loans)
+            for isbn, loans in self.loan_repository.get_active_loans_by_isbn(
+                isbns=list(isbns), user_id=user_id
+            ).items()
+        }
+        items, accepted = [], set()
+
+        def add(item: Dict[str, Any], loan_id: Optional[int], error: Optional[str]) -> None:
+            if error is None and loan_id in accepted:
+                error = "Emprunt en double dans le lot"
+            if error is None:
+                accepted.add(loan_id)
+            item.update(loan_id=loan_id, success=error is None, error=error)
+            items.append(item)
+
+        for loan_id in loan_ids:
+            book_id, return_date = states.get(loan_id, (None, None))
+            error = None
+            if book_id is None:
+                error = f"Emprunt avec l'ID {loan_id} non trouvé"
+            elif return_date:
+                error = "L'emprunt a déjà été retourné"
+            add({"book_id": book_id, "isbn": None}, loan_id, error)
+
+        for isbn in isbns:
+            loan_id, book_id = next(by_isbn.get(isbn, iter(())), (None, None))
+            error = None if loan_id else f"Aucun emprunt en cours pour l'ISBN {isbn}"
+            add({"book_id": book_id, "isbn": isbn}, loan_id, error)
+
+        returned: Dict[int, int] = {}
+        if accepted:
+            with self.unit_of_work():
+                returned = dict(self.loan_repository.mark_returned(
+                    loan_ids=list(accepted), return_date=datetime.utcnow()
+                ))
+                self.book_repository.increment_stock_many(counts=dict(Counter(returned.values())))
+                if returned:
+                    self.counter_repository.record_return(count=len(returned))
+
+        for item in items:
+            if item["success"] and item["loan_id"] not in returned:
+                item["success"] = False
+                item["error"] = "L'emprunt a déjà été retourné"
+        return _batch_report(items)
+
     def extend_loan(self, *, loan_id: int, extension_days: int = 7) -> Loan:
         """
         Prolonge la durée d'un emprunt, en vérifiant les règles métier.
@@ -158,4 +297,10 @@ class LoanService(BaseService[Loan, LoanCreate, LoanUpdate]):
         new_due_date = loan.due_date + timedelta(days=extension_days)
         loan_data = {"due_date": new_due_date}
         
-        return self.loan_repository.update(db_obj=loan, obj_in=loan_data)
\ No newline at end of file
+        with self.unit_of_work():
+            return self.loan_repository.update(db_obj=loan, obj_in=loan_data)
+
+
+def _batch_report(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    succeeded = sum(1 for item in items if item["success"])
+    return {"succeeded": succeeded, "failed": len(items) - succeeded, "items": items}
@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from ..models.books import Book
 from ..models.users import User
 from ..models.loans import Loan
+from ..models.counters import LibraryCounter
+from ..repositories.counters import CounterRepository, loan_month
 
 
 class StatsService:
@@ -14,32 +16,39 @@ class StatsService:
     """
     def __init__(self, db: Session):
         self.db = db
+        self.counter_repository = CounterRepository(LibraryCounter, db)
     
     def get_general_stats(self) -> Dict[str, Any]:
         """
         Récupère des statistiques générales sur la bibliothèque.
+        Les totaux sont lus dans les compteurs maintenus de façon incrémentale ;
+        seuls les retards, qui dépendent de l'heure, sont comptés via l'index
+        (return_date, due_date).
         """
-        total_books = self.db.query(func.sum(Book.quantity)).scalar() or 0
-        unique_books = self.db.query(func.count(Book.id)).scalar() or 0
-        total_users = self.db.query(func.count(User.id)).scalar() or 0
-        active_users = self.db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0
-        total_loans = self.db.query(func.count(Loan.id)).scalar() or 0
-        active_loans = self.db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0
+        counters = self.counter_repository.get_counters()
         overdue_loans = self.db.query(func.count(Loan.id)).filter(
             Loan.return_date == None,
             Loan.due_date < datetime.utcnow()
         ).scalar() or 0
         
         return {
-            "total_books": total_books,
-            "unique_books": unique_books,
-            "total_users": total_users,
-            "active_users": active_users,
-            "total_loans": total_loans,
-            "active_loans": active_loans,
+            "total_books": counters["total_books"],
+            "unique_books": counters["unique_books"],
+            "total_users": counters["total_users"],
+            "active_users": counters["active_users"],
+            "total_loans": counters["total_loans"],
+            "active_loans": counters["active_loans"],
             "overdue_loans": overdue_loans
         }
     
+    def rebuild_counters(self) -> Dict[str, Any]:
+        """
+        Recalcule les compteurs et le cumul mensuel à partir des tables.
+        """
+        counters = self.counter_repository.rebuild()
+        self.db.commit()
+        return counters
+    
     def get_most_borrowed_books(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Récupère les livres les plus empruntés.
@@ -84,27 +93,18 @@ class StatsService:
     
     def get_monthly_loans(self, months: int = 12) -> List[Dict[str, Any]]:
         """
-        Récupère le nombre d'emprunts par mois pour les derniers mois.
+        Récupère le nombre d'emprunts par mois pour les derniers mois,
+        depuis le cumul mensuel.
         """
         start_date = datetime.utcnow() - timedelta(days=30 * months)
         
-        # Cette requête est simplifiée et peut ne pas fonctionner avec tous les SGBD
-        # Pour une solution plus robuste, utilisez des fonctions spécifiques au SGBD
-        result = self.db.query(
-            func.strftime("%Y-%m", Loan.loan_date).label("month"),
-            func.count(Loan.id).label("loan_count")
-        ).filter(
-            Loan.loan_date >= start_date
-        ).group_by(
-            func.strftime("%Y-%m", Loan.loan_date)
-        ).order_by(
-            func.strftime("%Y-%m", Loan.loan_date)
-        ).all()
+        result = self.counter_repository.get_monthly_loans(since=loan_month(start_date))
         
         return [
             {
-                "month": month,
-                "loan_count": loan_count
+                "month": row.month,
+                "loan_count": row.loan_count
             }
-            for month, loan_count in result
-        ]
\ No newline at end of file
+            for row in result
+            if row.loan_count > 0
+        ]
@@ -2,11 +2,48 @@ from typing import Optional, List, Any, Dict, Union
 from sqlalchemy.orm import Session
 
 from ..repositories.users import UserRepository
+from ..repositories.counters import CounterRepository
 from ..models.users import User
-from ..api.schemas.users import UserCreate, UserUpdate
-from ..utils.security import get_password_hash, verify_password
+from ..models.loans import Loan
+from ..models.counters import LibraryCounter
+from ..api.schemas.users import AuthUser, UserCreate, UserUpdate
+from ..config import settings
+from ..utils.cache import LRUCache, _MISSING
+from ..utils.security import get_password_hash, verify_and_update_password
 from .base import BaseService
 
+AUTH_USER_NAMESPACE = "auth.user"
+
+# Cache par processus (id, is_active, is_admin) consulté à chaque requête authentifiée
+auth_user_cache = LRUCache(
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+)
+
+
+def get_cached_auth_user(user_id: int) -> Optional[AuthUser]:
+    """
+    Renvoie les champs d'authentification en cache, ou None.
+    """
+    cached = auth_user_cache.get(AUTH_USER_NAMESPACE, user_id)
+    return None if cached is _MISSING else cached
+
+
+def cache_auth_user(user: User) -> AuthUser:
+    """
+    Met en cache les champs d'authentification d'un utilisateur pour AUTH_USER_CACHE_TTL secondes.
+    """
+    auth_user = AuthUser.model_validate(user)
+    auth_user_cache.set(AUTH_USER_NAMESPACE, auth_user.id, auth_user, settings.AUTH_USER_CACHE_TTL)
+    return auth_user
+
+
+def invalidate_auth_user(user_id: int) -> None:
+    """
+    Retire un utilisateur du cache d'authentification.
+    """
+    auth_user_cache.delete(AUTH_USER_NAMESPACE, user_id)
+
 
 class UserService(BaseService[User, UserCreate, UserUpdate]):
     """
@@ -15,6 +52,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
     def __init__(self, repository: UserRepository):
         super().__init__(repository)
         self.repository = repository
+        self.counter_repository = CounterRepository(LibraryCounter, repository.db)
     
     def get_by_email(self, *, email: str) -> Optional[User]:
         """
@@ -37,8 +75,21 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
         del user_data["password"]
         user_data["hashed_password"] = hashed_password
         
-        return self.repository.create(obj_in=user_data)
+        with self.unit_of_work():
+            self.counter_repository.increment(total_users=1, active_users=int(obj_in.is_active))
+            return self.repository.create(obj_in=user_data)
     
+    def get_auth_user(self, *, id: int) -> Optional[AuthUser]:
+        """
+        Récupère les champs d'authentification d'un utilisateur, depuis le cache si possible.
+        """
+        auth_user = get_cached_auth_user(id)
+        if auth_user is None:
+            user = self.get(id=id)
+            if user:
+                auth_user = cache_auth_user(user)
+        return auth_user
+
     def update(self, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]) -> User:
         update_data = obj_in.dict(exclude_unset=True)
 
@@ -46,18 +97,42 @@ class UserService(BaseService[User, UserCreate, UserUpdate]):
             hashed_pw = get_password_hash(update_data.pop("password"))
             update_data["hashed_password"] = hashed_pw
 
-        return super().update(db_obj=db_obj, obj_in=update_data)
+        with self.unit_of_work():
+            if update_data.get("is_active") is not None and update_data["is_active"] != db_obj.is_active:
+                self.counter_repository.increment(active_users=1 if update_data["is_active"] else -1)
+
+            user = super().update(db_obj=db_obj, obj_in=update_data)
+        invalidate_auth_user(user.id)
+        return user
+
+    def remove(self, *, id: int) -> User:
+        """
+        Supprime un utilisateur et ses emprunts, en mettant à jour les compteurs.
+        """
+        user = self.get(id=id)
+        with self.unit_of_work():
+            if user:
+                self.counter_repository.discount_loans(Loan.user_id == id)
+                self.counter_repository.increment(total_users=-1, active_users=-int(user.is_active))
+            removed = self.repository.remove(id=id)
+        invalidate_auth_user(id)
+        return removed
 
     
     def authenticate(self, *, email: str, password: str) -> Optional[User]:
         """
         Authentifie un utilisateur par email et mot de passe.
+        Le hash est recalculé si le coût bcrypt configuré a changé.
         """
         user = self.get_by_email(email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            with self.unit_of_work():
+                user = self.repository.update(db_obj=user, obj_in={"hashed_password": new_hash})
         return user
     
     def is_active(self, *, user: User) -> bool:
@@ -1,44 +1,542 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Tuple
-import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 import hashlib
-import json
+import logging
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
 
-# Cache en mémoire simple
-cache_store: Dict[str, Tuple[float, Any]] = {}
 DEFAULT_EXPIRY = 300  # 5 minutes
 
+_MISSING = object()
+# Sépare les arguments positionnels des arguments nommés dans une clé
+_KWARGS_MARK = object()
+
+
+def _approximate_size(value: Any, depth: int = 0) -> int:
+    """
+    Estime la taille mémoire d'une valeur mise en cache (conteneurs parcourus sur quelques niveaux).
+    """
+    size = sys.getsizeof(value)
+    if depth >= 3:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            _approximate_size(k, depth + 1) + _approximate_size(v, depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_approximate_size(item, depth + 1) for item in value)
+    return size
+
+
+def _namespace_prefixes(namespace: str) -> Tuple[str, ...]:
+    """
+    Préfixes pointés d'un espace de noms : "a.b.c" -> ("a", "a.b", "a.b.c").
+    """
+    parts = namespace.split(".")
+    return tuple(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+
+class LRUCache:
+    """
+    Cache mémoire borné (nombre d'entrées et taille approximative), thread-safe.
+
+    - éviction LRU lorsque l'une des bornes est dépassée ;
+    - expiration paresseuse à la lecture, plus un balayage périodique des entrées expirées ;
+    - invalidation par préfixe en O(1) : chaque préfixe pointé d'un espace de noms a un
+      numéro de génération, une entrée n'est valide que si les générations enregistrées
+      à l'écriture sont toujours les générations courantes.
+    """
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._lock = threading.RLock()
+        # (namespace, key) -> (expiry_time, generations, size, value)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Tuple[int, ...], int, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _current_generations(self, namespace: str) -> Tuple[int, ...]:
+        return (self._epoch,) + tuple(
+            self._generations.get(prefix, 0) for prefix in _namespace_prefixes(namespace)
+        )
+
+    def _discard(self, entry_key: Tuple[str, Hashable]) -> None:
+        _, _, size, _ = self._entries.pop(entry_key)
+        self._bytes -= size
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        """
+        Renvoie la valeur en cache, ou _MISSING si elle est absente, expirée ou invalidée.
+        """
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                expiry_time, generations, _, value = entry
+                if expiry_time > time.monotonic() and generations == self._current_generations(namespace):
+                    self._entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return value
+                self._discard(entry_key)
+                self.expirations += 1
+            self.misses += 1
+            return _MISSING
+
+    def set(self, namespace: str, key: Hashable, value: Any, expiry: float) -> None:
+        """
+        Met une valeur en cache pour `expiry` secondes.
+        """
+        entry_key = (namespace, key)
+        size = _approximate_size(value)
+        now = time.monotonic()
+        with self._lock:
+            if entry_key in self._entries:
+                self._discard(entry_key)
+            if size > self.max_bytes:
+                return
+            self._entries[entry_key] = (now + expiry, self._current_generations(namespace), size, value)
+            self._bytes += size
+
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, namespace: str, key: Hashable) -> None:
+        """
+        Retire une entrée du cache si elle est présente.
+        """
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._discard((namespace, key))
+
+    def _sweep(self, now: float) -> None:
+        """
+        Supprime les entrées expirées ou invalidées (appelé sous verrou).
+        """
+        self._last_sweep = now
+        stale = [
+            entry_key
+            for entry_key, (expiry_time, generations, _, _) in self._entries.items()
+            if expiry_time <= now or generations != self._current_generations(entry_key[0])
+        ]
+        for entry_key in stale:
+            self._discard(entry_key)
+        self.expirations += len(stale)
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """
+        Invalide les entrées dont l'espace de noms commence par le préfixe pointé
+        donné (par exemple un nom de module), ou tout le cache sans préfixe.
+        """
+        with self._lock:
+            if prefix:
+                self._generations[prefix] = self._generations.get(prefix, 0) + 1
+            else:
+                self._epoch += 1
+
+    def clear(self) -> None:
+        """
+        Vide le cache et remet les compteurs à zéro.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Statistiques d'utilisation du cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class CacheTier(ABC):
+    """
+    Second niveau de cache partagé entre processus (workers uvicorn).
+
+    Les valeurs y sont sérialisées ; les invalidations y sont publiées sous forme
+    de générations par préfixe, que chaque processus relève avec poll_invalidations().
+    Chaque entrée porte la génération de son namespace connue de l'écrivain au dernier
+    relevé : une entrée écrite après une invalidation qu'il n'avait pas encore vue
+    (valeur calculée avant celle-ci) est ignorée à la lecture.
+    """
+    @abstractmethod
+    def get(self, namespace: str, key: Hashable) -> Tuple[Any, float]:
+        """
+        Renvoie (valeur, instant d'expiration en secondes epoch), ou (_MISSING, 0).
+        """
+
+    @abstractmethod
+    def set(self, namespace: str, key: Hashable, value: Any, expiry: float) -> None:
+        """
+        Enregistre une valeur pour `expiry` secondes.
+        """
+
+    @abstractmethod
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """
+        Supprime les entrées du préfixe (toutes si None) et publie l'invalidation.
+        """
+
+    @abstractmethod
+    def poll_invalidations(self) -> List[Optional[str]]:
+        """
+        Préfixes invalidés par un autre processus depuis le dernier appel
+        (None pour une invalidation globale).
+        """
+
+
+def _matches_prefix(namespace: str, prefix: Optional[str]) -> bool:
+    return not prefix or namespace == prefix or namespace.startswith(prefix + ".")
+
+
+def _generation(generations: Dict[str, int], namespace: str) -> int:
+    """
+    Génération d'un namespace : somme des générations de ses préfixes et de
+    l'invalidation globale "" (croissante à chaque invalidation qui le concerne).
+    """
+    return sum(generations.get(prefix, 0) for prefix in ("", *_namespace_prefixes(namespace)))
+
+
+def _serialize_key(namespace: str, key: Hashable) -> str:
+    return hashlib.sha1(pickle.dumps((namespace, key), protocol=4)).hexdigest()
+
 
-def cache_key(*args, **kwargs) -> str:
+class InMemoryCacheTier(CacheTier):
     """
-    Génère une clé de cache à partir des arguments.
+    Tier partagé en mémoire, limité au processus courant : double de test.
+    worker() renvoie une vue sur le même stockage, pour simuler un autre worker.
     """
-    key_dict = {"args": args, "kwargs": kwargs}
-    key_str = json.dumps(key_dict, sort_keys=True)
-    return hashlib.md5(key_str.encode()).hexdigest()
+    def __init__(self, _store: Optional[Dict[str, Any]] = None):
+        self._store = _store if _store is not None else {
+            "lock": threading.Lock(),
+            "entries": {},
+            "generations": {},
+        }
+        self._seen: Dict[str, int] = dict(self._store["generations"])
 
+    def worker(self) -> "InMemoryCacheTier":
+        return InMemoryCacheTier(self._store)
 
-def cache(expiry: int = DEFAULT_EXPIRY):
+    def get(self, namespace: str, key: Hashable) -> Tuple[Any, float]:
+        with self._store["lock"]:
+            entry = self._store["entries"].get(_serialize_key(namespace, key))
+            generation = _generation(self._store["generations"], namespace)
+        if entry is None or entry[1] <= time.time() or entry[3] < generation:
+            return _MISSING, 0
+        return pickle.loads(entry[2]), entry[1]
+
+    def set(self, namespace: str, key: Hashable, value: Any, expiry: float) -> None:
+        payload = pickle.dumps(value)
+        generation = _generation(self._seen, namespace)
+        with self._store["lock"]:
+            self._store["entries"][_serialize_key(namespace, key)] = (
+                namespace, time.time() + expiry, payload, generation
+            )
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        with self._store["lock"]:
+            entries = self._store["entries"]
+            for entry_key in [k for k, v in entries.items() if _matches_prefix(v[0], prefix)]:
+                del entries[entry_key]
+            generations = self._store["generations"]
+            generations[prefix or ""] = generations.get(prefix or "", 0) + 1
+
+    def poll_invalidations(self) -> List[Optional[str]]:
+        with self._store["lock"]:
+            generations = dict(self._store["generations"])
+        changed = [p for p, g in generations.items() if self._seen.get(p, 0) != g]
+        self._seen.update(generations)
+        return [p or None for p in changed]
+
+
+class SQLiteCacheTier(CacheTier):
+    """
+    Tier partagé stocké dans un fichier SQLite (mode WAL), sans serveur externe :
+    tous les workers d'une même machine ouvrent le même fichier.
+    """
+    def __init__(self, path: str, max_entries: int = 10000, sweep_interval: float = 60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._last_sweep = time.time()
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entry (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                value BLOB NOT NULL,
+                generation INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entry_namespace ON cache_entry (namespace);
+            CREATE TABLE IF NOT EXISTS cache_generation (
+                prefix TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+        """)
+        # Les invalidations antérieures au démarrage ne concernent pas ce processus
+        self._seen = self._generations()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Une connexion par thread, en autocommit
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _generations(self) -> Dict[str, int]:
+        return dict(self._connection().execute("SELECT prefix, generation FROM cache_generation"))
+
+    def get(self, namespace: str, key: Hashable) -> Tuple[Any, float]:
+        prefixes = ("", *_namespace_prefixes(namespace))
+        row = self._connection().execute(
+            "SELECT expires_at, value FROM cache_entry WHERE key = ? AND expires_at > ? AND generation >= ("
+            " SELECT COALESCE(SUM(generation), 0) FROM cache_generation"
+            f" WHERE prefix IN ({', '.join('?' * len(prefixes))}))",
+            (_serialize_key(namespace, key), time.time(), *prefixes)
+        ).fetchone()
+        if row is None:
+            return _MISSING, 0
+        return pickle.loads(row[1]), row[0]
+
+    def set(self, namespace: str, key: Hashable, value: Any, expiry: float) -> None:
+        now = time.time()
+        payload = pickle.dumps(value)
+        with self._lock:
+            generation = _generation(self._seen, namespace)
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, namespace, expires_at, value, generation)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (_serialize_key(namespace, key), namespace, now + expiry, payload, generation)
+        )
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            connection.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (now,))
+            connection.execute(
+                "DELETE FROM cache_entry WHERE key IN ("
+                " SELECT key FROM cache_entry ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if prefix:
+                connection.execute(
+                    "DELETE FROM cache_entry WHERE namespace = ? OR substr(namespace, 1, ?) = ?",
+                    (prefix, len(prefix) + 1, prefix + ".")
+                )
+            else:
+                connection.execute("DELETE FROM cache_entry")
+            connection.execute(
+                "INSERT INTO cache_generation (prefix, generation) VALUES (?, 1) "
+                "ON CONFLICT(prefix) DO UPDATE SET generation = generation + 1",
+                (prefix or "",)
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def poll_invalidations(self) -> List[Optional[str]]:
+        generations = self._generations()
+        with self._lock:
+            changed = [p for p, g in generations.items() if self._seen.get(p, 0) != g]
+            self._seen.update(generations)
+        return [p or None for p in changed]
+
+
+class TieredCache:
+    """
+    Cache à deux niveaux : LRUCache locale au processus, puis tier partagé.
+    Avant chaque lecture, les invalidations publiées par les autres workers
+    (au plus toutes les `poll_interval` secondes) sont appliquées localement.
+    """
+    def __init__(self, local: LRUCache, shared: CacheTier, poll_interval: float = 0.0):
+        self.local = local
+        self.shared = shared
+        self.poll_interval = poll_interval
+        self._last_poll = 0.0
+        self.shared_hits = 0
+
+    def _sync(self) -> None:
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        try:
+            prefixes = self.shared.poll_invalidations()
+        except sqlite3.Error:
+            # Relevé repris au prochain appel : les générations vues ne sont pas mises à jour
+            logger.warning("Relevé des invalidations du cache partagé impossible", exc_info=True)
+            return
+        for prefix in prefixes:
+            self.local.invalidate(prefix)
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        self._sync()
+        value = self.local.get(namespace, key)
+        if value is not _MISSING:
+            return value
+        try:
+            value, expires_at = self.shared.get(namespace, key)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+            # Entrée corrompue ou écrite par une version incompatible : traitée comme absente
+            return _MISSING
+        except sqlite3.Error:
+            # Tier indisponible (base verrouillée...) : simple échec, il ne sert qu'à accélérer
+            logger.warning("Lecture du cache partagé impossible", exc_info=True)
+            return _MISSING
+        if value is not _MISSING:
+            self.shared_hits += 1
+            self.local.set(namespace, key, value, expires_at - time.time())
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, expiry: float) -> None:
+        self.local.set(namespace, key, value, expiry)
+        try:
+            self.shared.set(namespace, key, value, expiry)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Valeur non sérialisable : elle reste dans le cache local uniquement
+            pass
+        except sqlite3.Error:
+            logger.warning("Écriture dans le cache partagé impossible", exc_info=True)
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        self.local.invalidate(prefix)
+        try:
+            self.shared.invalidate(prefix)
+        except sqlite3.Error:
+            # Appelé après le commit : l'erreur ne doit pas faire échouer la requête, mais les
+            # autres workers peuvent servir l'ancienne valeur jusqu'à son expiration
+            logger.error("Invalidation du cache partagé impossible (préfixe %r)", prefix, exc_info=True)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.local.stats()
+        stats["shared_hits"] = self.shared_hits
+        return stats
+
+
+def create_cache_backend():
+    """
+    Construit le cache selon la configuration : local seul, ou local + tier
+    SQLite partagé lorsque CACHE_SHARED_PATH est défini.
+    """
+    local = LRUCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+    )
+    if not settings.CACHE_SHARED_PATH:
+        return local
+    shared = SQLiteCacheTier(
+        settings.CACHE_SHARED_PATH,
+        sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+    )
+    return TieredCache(local, shared, poll_interval=settings.CACHE_SHARED_POLL_INTERVAL)
+
+
+cache_backend = create_cache_backend()
+
+
+def cache_key(*args, **kwargs) -> Hashable:
+    """
+    Génère une clé de cache à partir des arguments : un simple tuple,
+    les arguments doivent donc être hashables.
+    """
+    if kwargs:
+        return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    return args
+
+
+def cache(
+    expiry: int = DEFAULT_EXPIRY,
+    *,
+    ignore_self: bool = False,
+    key: Optional[Callable[..., Hashable]] = None
+):
     """
     Décorateur pour mettre en cache le résultat d'une fonction.
+
+    - ignore_self : ne pas inclure le premier argument (l'instance) dans la clé,
+      pour partager le cache entre instances (ex. un repository par requête) ;
+    - key : fonction recevant les arguments de l'appel et renvoyant la clé.
+
+    Un appel dont les arguments ne sont pas hashables n'est pas mis en cache.
     """
     def decorator(func: Callable) -> Callable:
+        namespace = f"{func.__module__}.{func.__qualname__}"
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             # Générer la clé de cache
-            key = f"{func.__module__}.{func.__name__}:{cache_key(*args, **kwargs)}"
-            
+            if key is not None:
+                call_key = key(*args, **kwargs)
+            elif ignore_self:
+                call_key = cache_key(*args[1:], **kwargs)
+            else:
+                call_key = cache_key(*args, **kwargs)
+            try:
+                hash(call_key)
+            except TypeError:
+                return func(*args, **kwargs)
+
             # Vérifier si la valeur est dans le cache et n'a pas expiré
-            now = time.time()
-            if key in cache_store:
-                expiry_time, value = cache_store[key]
-                if expiry_time > now:
-                    return value
-            
+            value = cache_backend.get(namespace, call_key)
+            if value is not _MISSING:
+                return value
+
             # Exécuter la fonction et mettre en cache le résultat
             result = func(*args, **kwargs)
-            cache_store[key] = (now + expiry, result)
-            
+            cache_backend.set(namespace, call_key, result, expiry)
+
             return result
         return wrapper
     return decorator
@@ -48,10 +546,11 @@ def invalidate_cache(prefix: str = None) -> None:
     """
     Invalide le cache.
     """
-    global cache_store
-    if prefix:
-        # Invalider uniquement les clés qui commencent par le préfixe
-        cache_store = {k: v for k, v in cache_store.items() if not k.startswith(prefix)}
-    else:
-        # Invalider tout le cache
-        cache_store = {}
\ No newline at end of file
+    cache_backend.invalidate(prefix)
+
+
+def cache_stats() -> Dict[str, int]:
+    """
+    Statistiques du cache (entrées, taille, succès, échecs, évictions).
+    """
+    return cache_backend.stats()
@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Nombre de lignes regroupées par morceau envoyé au client
+CHUNK_ROWS = 500
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(value).__name__}")
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    Sérialise des lignes en NDJSON (un objet JSON par ligne), par morceaux.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row, default=_default, separators=(",", ":")))
+        if len(chunk) >= chunk_rows:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fieldnames: List[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """
+    Sérialise des lignes en CSV avec en-tête, par morceaux.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow({
+            key: value.isoformat() if isinstance(value, (datetime, date)) else value
+            for key, value in row.items()
+        })
+        count += 1
+        if count >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
@@ -0,0 +1,57 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# (numéro de ligne, données brutes, erreur de lecture)
+ImportRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: Optional[str], default: str = "jsonl") -> str:
+    """
+    Déduit le format d'import de l'extension du fichier.
+    """
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return default
+
+
+def iter_records(lines: Iterable[str], format: str) -> Iterator[ImportRecord]:
+    """
+    Lit un flux CSV (avec en-tête) ou JSONL ligne par ligne, sans le charger
+    entièrement. Les champs CSV vides deviennent None.
+    """
+    if format not in IMPORT_FORMATS:
+        raise ValueError(f"Format d'import inconnu : {format}")
+
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key: value if value != "" else None for key, value in row.items()}, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON invalide : {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Un objet JSON est attendu"
+            continue
+        yield line_number, data, None
+
+
+def chunked(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Découpe un itérable en listes de size éléments.
+    """
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -1,5 +1,11 @@
-from typing import Generic, TypeVar, List, Optional, Dict, Any
+from typing import Generic, TypeVar, List, Optional, Dict, Any, Tuple
+from datetime import datetime
+import base64
+import binascii
+import json
 from pydantic import BaseModel
+from sqlalchemy import DateTime, Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Query
 from fastapi import Query as QueryParam
 
@@ -12,33 +18,57 @@ class PaginationParams:
         skip: int = 0,
         limit: int = 100,
         sort_by: Optional[str] = None,
-        sort_desc: bool = False
+        sort_desc: bool = False,
+        cursor: bool = False,
+        after: Optional[str] = None
     ):
         self.skip = skip
         self.limit = limit
         self.sort_by = sort_by
         self.sort_desc = sort_desc
+        # Mode curseur (keyset) : activé explicitement ou dès qu'un jeton "after" est fourni
+        self.cursor = cursor or after is not None
+        self.after = after
 
 
 class Page(BaseModel, Generic[T]):
     items: List[T]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     
     class Config:
         arbitrary_types_allowed = True
 
 
-def paginate(query: Query, params: PaginationParams, schema) -> Page:
+def encode_cursor(sort_by: Optional[str], sort_desc: bool, value: Any, id: int) -> str:
     """
-    Pagine une requête SQLAlchemy.
+    Encode la position du dernier élément d'une page en jeton opaque.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_by, sort_desc, value, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[str], bool, Any, int]:
+    """
+    Décode un jeton produit par encode_cursor.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_by, sort_desc, value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return sort_by, bool(sort_desc), value, int(id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Curseur de pagination invalide")
+
+
+def _apply_sort(query, params: PaginationParams, schema):
+    """
+    Applique le tri demandé à une Query ou un Select.
     """
-    # Compter le nombre total d'éléments
-    total = query.count()
-    
-    # Appliquer le tri si spécifié
     if params.sort_by:
         if hasattr(schema, params.sort_by):
             column = getattr(schema, params.sort_by)
@@ -46,10 +76,10 @@ def paginate(query: Query, params: PaginationParams, schema) -> Page:
                 query = query.order_by(column.desc())
             else:
                 query = query.order_by(column)
-    
-    # Appliquer la pagination
-    items = query.offset(params.skip).limit(params.limit).all()
-    
+    return query
+
+
+def _offset_page(items: List[Any], total: int, params: PaginationParams) -> Page:
     # Calculer le nombre de pages
     pages = (total + params.limit - 1) // params.limit if params.limit > 0 else 1
     page = (params.skip // params.limit) + 1 if params.limit > 0 else 1
@@ -60,4 +90,100 @@ def paginate(query: Query, params: PaginationParams, schema) -> Page:
         page=page,
         size=params.limit,
         pages=pages
-    )
\ No newline at end of file
+    )
+
+
+def paginate(query: Query, params: PaginationParams, schema) -> Page:
+    """
+    Pagine une requête SQLAlchemy.
+    """
+    if params.cursor:
+        return paginate_cursor(query, params, schema)
+
+    # Compter le nombre total d'éléments
+    total = query.count()
+    
+    # Appliquer le tri si spécifié
+    query = _apply_sort(query, params, schema)
+    
+    # Appliquer la pagination
+    items = query.offset(params.skip).limit(params.limit).all()
+    return _offset_page(items, total, params)
+
+
+def _seek(query, params: PaginationParams, schema) -> Tuple[Any, Optional[str]]:
+    """
+    Applique l'ordre et la condition de curseur (keyset) à une Query ou un Select ;
+    renvoie la requête limitée à une page plus un élément, et la colonne de tri.
+    """
+    sort_by = params.sort_by if params.sort_by and params.sort_by != "id" else None
+    column = None
+    if sort_by:
+        column = getattr(schema, sort_by, None)
+        expression = getattr(column, "expression", None)
+        if expression is None or not hasattr(expression, "nullable"):
+            raise ValueError(f"Tri par curseur impossible sur '{sort_by}'")
+        if expression.nullable:
+            raise ValueError(f"Tri par curseur impossible sur la colonne nullable '{sort_by}'")
+
+    # L'ordre du curseur remplace tout tri déjà présent sur la requête
+    query = query.order_by(None)
+
+    if params.after:
+        cursor_sort_by, cursor_desc, value, last_id = decode_cursor(params.after)
+        if cursor_sort_by != sort_by or cursor_desc != params.sort_desc:
+            raise ValueError("Le curseur ne correspond pas au tri demandé")
+        if column is not None:
+            if isinstance(column.expression.type, DateTime) and value is not None:
+                value = datetime.fromisoformat(value)
+            key, bound = tuple_(column, schema.id), tuple_(value, last_id)
+        else:
+            key, bound = schema.id, last_id
+        query = query.filter(key < bound if params.sort_desc else key > bound)
+
+    order = [column, schema.id] if column is not None else [schema.id]
+    if params.sort_desc:
+        order = [criterion.desc() for criterion in order]
+
+    # Un élément de plus pour savoir s'il existe une page suivante
+    return query.order_by(*order).limit(params.limit + 1), sort_by
+
+
+def _cursor_page(rows: List[Any], params: PaginationParams, sort_by: Optional[str]) -> Page:
+    items = rows[:params.limit]
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        last = items[-1]
+        value = getattr(last, sort_by) if sort_by else None
+        next_cursor = encode_cursor(sort_by, params.sort_desc, value, last.id)
+
+    return Page(
+        items=items,
+        size=params.limit,
+        next_cursor=next_cursor
+    )
+
+
+def paginate_cursor(query: Query, params: PaginationParams, schema) -> Page:
+    """
+    Pagine une requête par curseur (keyset) : WHERE (colonne, id) > (dernière valeur)
+    au lieu d'un OFFSET, sans COUNT. Le coût d'une page ne dépend pas de sa profondeur.
+    """
+    query, sort_by = _seek(query, params, schema)
+    return _cursor_page(query.all(), params, sort_by)
+
+
+async def paginate_async(db: AsyncSession, statement: Select, params: PaginationParams, schema) -> Page:
+    """
+    Variante asynchrone de paginate pour un Select exécuté par une AsyncSession.
+    """
+    if params.cursor:
+        statement, sort_by = _seek(statement, params, schema)
+        rows = list(await db.scalars(statement))
+        return _cursor_page(rows, params, sort_by)
+
+    total = await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+    statement = _apply_sort(statement, params, schema)
+    items = list(await db.scalars(statement.offset(params.skip).limit(params.limit)))
+    return _offset_page(items, total, params)
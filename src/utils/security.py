@@ -1,15 +1,38 @@
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from ..config import settings
+from .cache import LRUCache, _MISSING
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Les hashs d'un autre coût que BCRYPT_ROUNDS sont signalés par needs_update / verify_and_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 ALGORITHM = "HS256"
 
+TOKEN_NAMESPACE = "jwt"
+
+# Claims des tokens déjà vérifiés, par empreinte de (clé de signature, token)
+token_cache = LRUCache(
+    max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+    sweep_interval=settings.CACHE_SWEEP_INTERVAL,
+)
+
+
+@lru_cache(maxsize=4)
+def _key_fingerprint(secret_key: str) -> bytes:
+    return hashlib.sha256(secret_key.encode()).digest()
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -29,15 +52,157 @@ def create_access_token(
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Vérifie un token JWT et renvoie ses claims (lève JWTError s'il est invalide).
+
+    Les claims d'un token valide restent en cache jusqu'à son expiration ; la clé de
+    signature fait partie de la clé du cache, une rotation de SECRET_KEY l'ignore donc.
+    """
+    digest = hashlib.sha256(_key_fingerprint(settings.SECRET_KEY) + token.encode()).digest()
+    claims = token_cache.get(TOKEN_NAMESPACE, digest)
+    if claims is _MISSING:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            token_cache.set(TOKEN_NAMESPACE, digest, claims, exp - time.time())
+    return dict(claims)
+
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Levée lorsque le pool de hachage des mots de passe est saturé.
+    """
+
+
+class PasswordHasher:
+    """
+    Exécute bcrypt dans un pool de processus dédié, pour ne pas occuper le GIL
+    ni les threads des requêtes.
+
+    Au plus `workers` calculs en cours et `max_pending` en attente : au-delà,
+    PasswordHasherBusy est levée immédiatement (429 côté API). Avec workers=0,
+    les calculs sont faits dans le thread appelant (un thread du pool par défaut
+    pour run_async). Un pool cassé (worker tué) est remplacé au calcul suivant.
+    """
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max(max_pending, 0))
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _reset(self, executor: Executor) -> None:
+        """
+        Abandonne un pool cassé : le prochain calcul en crée un nouveau.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _done(self, executor: Executor, future: Future) -> None:
+        self._slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._reset(executor)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future:
+        """
+        Soumet fn(*args) au pool, ou lève PasswordHasherBusy s'il est saturé.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._reset(executor)
+                executor = self._get_executor()
+                future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda done: self._done(executor, done))
+        return future
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Exécute fn(*args) dans le pool et attend son résultat (bloque le thread appelant).
+        """
+        if self.workers <= 0:
+            return fn(*args)
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Exécute fn(*args) dans le pool et attend son résultat sans occuper de thread.
+        """
+        if self.workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Vérifie si un mot de passe en clair correspond à un hash.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.run(_verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Vérifie un mot de passe et renvoie un nouveau hash si le coût bcrypt a changé.
+    """
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Variante asynchrone de verify_and_update_password, pour les routes async def.
+    """
+    return await password_hasher.run_async(_verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Génère un hash à partir d'un mot de passe en clair.
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return password_hasher.run(_hash, password)
\ No newline at end of file
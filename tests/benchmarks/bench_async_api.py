@@ -0,0 +1,185 @@
+"""
+Test de charge de la pile asynchrone (AsyncSession + aiosqlite).
+
+Sert la liste paginée des livres (avec catégories) par deux routes équivalentes
+dans un serveur uvicorn : l'une en def synchrone (Session, threadpool de 40
+threads), l'autre en async def (AsyncSession, paginate_async). 500 clients
+concurrents les interrogent tour à tour. Les erreurs sont détaillées par code
+HTTP ou type d'exception.
+
+    python -m tests.benchmarks.bench_async_api --clients 500 --requests 5000
+
+Mesures relevées (1 CPU, client et serveur sur la même machine, 5 000 livres,
+un lancement par route) :
+
+    clients  requêtes  route   req/s  p50 (ms)  p99 (ms)  erreurs
+         20     1 000  async     122       169       468        0
+         20     1 000  sync      112       113       781        0
+        500     2 000  async      46     8 310    30 932        2  (connexions coupées)
+        500     2 000  sync        8       976    31 192    1 981  (1 936 délais dépassés, 40 erreurs 500)
+
+Aucun gain de débit à concurrence modérée : à 20 clients les deux routes sont
+équivalentes, à l'écart de mesure près (une autre machine a mesuré 128 req/s en
+async contre 146 en sync). À 500 clients, la route synchrone s'effondre : ses 40
+threads attendent une connexion du pool et les requêtes dépassent leurs délais.
+La route asynchrone sert presque toutes les requêtes, mais avec des latences de
+plusieurs secondes : elle ne va pas plus vite, elle tient la charge. Seule la
+lecture de la liste est mesurée ; l'emprunt asynchrone passe encore par run_sync
+pour les compteurs.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from src.api.schemas.books import Book as BookSchema
+from src.db.session import create_async_db_engine, create_db_engine
+from src.models.base import Base
+from src.models.books import Book
+from src.repositories.books import AsyncBookRepository
+from src.utils.pagination import Page, PaginationParams, paginate, paginate_async
+
+PORT = 8765
+
+
+def create_app(url: str) -> FastAPI:
+    engine = create_db_engine(url, read_only=True)
+    async_engine = create_async_db_engine(url, read_only=True)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/books", response_model=Page[BookSchema])
+    def sync_books(skip: int = 0, db: Session = Depends(get_sync_db)) -> Any:
+        query = db.query(Book).options(selectinload(Book.categories))
+        return paginate(query, PaginationParams(skip=skip, limit=50), Book)
+
+    @app.get("/async/books", response_model=Page[BookSchema])
+    async def async_books(skip: int = 0, db: AsyncSession = Depends(get_async_db)) -> Any:
+        statement = AsyncBookRepository(Book, db).list_statement()
+        return await paginate_async(db, statement, PaginationParams(skip=skip, limit=50), Book)
+
+    return app
+
+
+if os.environ.get("BENCH_ASYNC_DB"):
+    app = create_app(f"sqlite:///{os.environ['BENCH_ASYNC_DB']}")
+
+
+def seed(path: str, books: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"title": f"Book {i}", "author": f"Author {i % 500}", "isbn": f"{i:013d}",
+             "publication_year": 1950 + i % 70, "quantity": 5}
+            for i in range(1, books + 1)
+        ])
+    engine.dispose()
+
+
+async def load(path: str, clients: int, requests: int):
+    latencies = []
+    errors: Counter = Counter()
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def client(http: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await http.get(path, params={"skip": (i * 50) % 10_000})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            except httpx.HTTPStatusError as e:
+                errors[str(e.response.status_code)] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, latencies, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--routes", nargs="+", choices=("async", "sync"), default=["async", "sync"])
+    args = parser.parse_args()
+
+    try:
+        httpx.get(f"http://127.0.0.1:{PORT}/docs")
+        sys.exit(f"Le port {PORT} est déjà utilisé")
+    except httpx.HTTPError:
+        pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        seed(path, args.books)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "tests.benchmarks.bench_async_api:app",
+             "--port", str(PORT), "--log-level", "warning", "--backlog", "4096"],
+            env={**os.environ, "BENCH_ASYNC_DB": path},
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"http://127.0.0.1:{PORT}/docs")
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+
+            print(f"{'route':>8} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'erreurs':>8}")
+            for label in args.routes:
+                asyncio.run(load(f"/{label}/books", 50, 500))  # échauffement
+                throughput, latencies, errors = asyncio.run(load(f"/{label}/books", args.clients, args.requests))
+                latencies = sorted(latencies) or [float("nan")]
+                p50 = statistics.median(latencies) * 1000
+                p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+                failed = sum(errors.values())
+                detail = ", ".join(f"{name}: {count}" for name, count in errors.most_common())
+                print(f"{label:>8} {throughput:>8.0f} {p50:>9.1f} {p99:>9.1f} {failed:>8}  {detail}")
+        finally:
+            # Les threads bloqués de la route synchrone empêchent un arrêt propre
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
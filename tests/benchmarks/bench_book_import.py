@@ -0,0 +1,77 @@
+"""
+Micro-benchmark de l'import de catalogue.
+
+Compare la création livre par livre (BookService.create : get_by_isbn, commit
+et refresh à chaque ligne) à BookService.bulk_import, sur une base SQLite
+temporaire avec l'index FTS et ses triggers.
+
+    python -m tests.benchmarks.bench_book_import --rows 200000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api.schemas.books import BookCreate
+from src.models.base import Base
+from src.models.books import Book
+from src.repositories.books import BookRepository
+from src.services.books import BookService
+from src.utils.importers import iter_records
+
+
+def catalog(rows: int, offset: int = 0):
+    for i in range(offset, offset + rows):
+        yield json.dumps({
+            "title": f"Book {i}", "author": f"Author {i % 500}", "isbn": f"{i:013d}",
+            "publication_year": 1950 + i % 70, "quantity": 1 + i % 5, "language": "French",
+        }) + "\n"
+
+
+def import_one_by_one(session, rows: int) -> None:
+    service = BookService(BookRepository(Book, session))
+    for _, data, _ in iter_records(catalog(rows), "jsonl"):
+        service.create(obj_in=BookCreate(**data))
+
+
+def import_bulk(session, rows: int) -> None:
+    service = BookService(BookRepository(Book, session))
+    report = service.bulk_import(iter_records(catalog(rows), "jsonl"), batch_size=1000)
+    assert report["created"] == rows, report
+
+
+def measure(fn, rows: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        try:
+            started = time.perf_counter()
+            fn(session, rows)
+            return time.perf_counter() - started
+        finally:
+            session.close()
+            engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--legacy-rows", type=int, default=5_000, help="Lignes pour l'import ligne à ligne")
+    args = parser.parse_args()
+
+    print(f"{'méthode':>14} {'lignes':>10} {'durée (s)':>10} {'lignes/s':>10}")
+    for label, fn, rows in [
+        ("ligne à ligne", import_one_by_one, args.legacy_rows),
+        ("bulk_import", import_bulk, args.rows),
+    ]:
+        elapsed = measure(fn, rows)
+        print(f"{label:>14} {rows:>10} {elapsed:>10.2f} {rows / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
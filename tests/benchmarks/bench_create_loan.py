@@ -0,0 +1,90 @@
+"""
+Micro-benchmark de LoanService.create_loan en fonction du nombre d'emprunts actifs.
+
+Les vérifications (doublon, limite de 5 emprunts) sont des requêtes indexées
+limitées à l'utilisateur : la latence d'un emprunt doit rester stable quand
+le nombre total d'emprunts actifs de la bibliothèque augmente.
+
+    python -m tests.benchmarks.bench_create_loan --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.models.base import Base
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+
+
+def seed_active_loans(engine, count: int, users: int = 10_000, books: int = 5_000) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"title": f"Book {i}", "author": "Author", "isbn": f"{i:013d}",
+             "publication_year": 2000, "quantity": 1_000}
+            for i in range(1, books + 1)
+        ])
+        conn.execute(insert(User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x", "full_name": f"User {i}",
+             "is_active": True, "is_admin": False}
+            for i in range(1, users + 1)
+        ])
+        conn.execute(insert(Loan), [
+            {"user_id": 1 + i % users, "book_id": 1 + i % books, "loan_date": now,
+             "due_date": now + timedelta(days=14), "return_date": None, "extended": False}
+            for i in range(count)
+        ])
+
+
+def measure_borrow(engine, repeat: int) -> float:
+    session = sessionmaker(bind=engine)()
+    service = LoanService(
+        LoanRepository(Loan, session),
+        BookRepository(Book, session),
+        UserRepository(User, session)
+    )
+    # Un emprunteur sans emprunt en cours, qui rend chaque livre aussitôt
+    borrower = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    session.add(borrower)
+    session.commit()
+    try:
+        elapsed = 0.0
+        for i in range(repeat):
+            started = time.perf_counter()
+            loan = service.create_loan(user_id=borrower.id, book_id=1 + i % 100)
+            elapsed += time.perf_counter() - started
+            service.return_loan(loan_id=loan.id)
+        return elapsed / repeat
+    finally:
+        session.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'emprunts actifs':>16}{'latence emprunt (ms)':>24}")
+    for size in args.sizes:
+        path = os.path.join(tempfile.mkdtemp(), "bench_loans.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        seed_active_loans(engine, size)
+        latency = measure_borrow(engine, args.repeat)
+        print(f"{size:>16}{latency * 1000:>24.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
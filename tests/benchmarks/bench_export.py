@@ -0,0 +1,88 @@
+"""
+Micro-benchmark de l'export en flux (/export/loans).
+
+Mesure le pic mémoire (tracemalloc) et le débit de l'export NDJSON/CSV pour
+des tables de tailles croissantes, comparé à la lecture par pages de 100
+avec modèles Pydantic qu'utilisait le job de reporting.
+
+    python -m tests.benchmarks.bench_export --loans 20000 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api.schemas.loans import Loan as LoanSchema
+from src.models.base import Base
+from src.models.loans import Loan
+from src.repositories.loans import LoanRepository
+from src.utils.export import iter_csv, iter_ndjson
+from tests.benchmarks.bench_general_stats import seed
+
+
+def export_stream(session, format: str) -> int:
+    repository = LoanRepository(Loan, session)
+    columns = repository.export_columns()
+    rows = repository.iter_rows(columns=columns)
+    chunks = iter_csv(rows, columns) if format == "csv" else iter_ndjson(rows)
+    return sum(len(chunk) for chunk in chunks)
+
+
+def export_pages(session, format: str) -> int:
+    """
+    Ancienne méthode : pages de 100 via OFFSET, réponse JSON complète par page.
+    """
+    size, skip = 0, 0
+    while True:
+        loans = session.query(Loan).offset(skip).limit(100).all()
+        if not loans:
+            return size
+        page = [LoanSchema.model_validate(loan).model_dump_json() for loan in loans]
+        size += sum(len(item) for item in page)
+        skip += 100
+        session.expunge_all()
+
+
+def measure(engine, fn, format: str):
+    session = sessionmaker(bind=engine)()
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        size = fn(session, format)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        session.close()
+    return size, peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--loans", type=int, nargs="+", default=[20_000, 200_000])
+    args = parser.parse_args()
+
+    print(f"{'emprunts':>10} {'méthode':>14} {'pic (Mo)':>10} {'durée (s)':>10} {'lignes/s':>10}")
+    for loans in args.loans:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+            Base.metadata.create_all(engine)
+            seed(engine, books=1_000, users=1_000, loans=loans)
+            for label, fn, format in [
+                ("pages+pydantic", export_pages, "json"),
+                ("ndjson", export_stream, "ndjson"),
+                ("csv", export_stream, "csv"),
+            ]:
+                if fn is export_pages and loans > 50_000:
+                    continue  # OFFSET quadratique : inutilisable à cette taille
+                _, peak, elapsed = measure(engine, fn, format)
+                print(f"{loans:>10} {label:>14} {peak / 1e6:>10.2f} {elapsed:>10.2f} {loans / elapsed:>10.0f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
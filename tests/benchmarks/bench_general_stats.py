@@ -0,0 +1,142 @@
+"""
+Micro-benchmark de StatsService.get_general_stats.
+
+Compare, sur une base SQLite temporaire :
+- l'implémentation d'origine (une requête par indicateur, 7 requêtes) ;
+- l'agrégat conditionnel (CounterRepository.compute_counters, utilisé par la
+  reconstruction des compteurs) plus le comptage des retards (2 requêtes) ;
+- la lecture actuelle des compteurs maintenus par get_general_stats, plus le
+  comptage des retards (2 requêtes, indépendantes de la taille des tables).
+Le nombre de requêtes affiché est mesuré, pas supposé.
+
+    python -m tests.benchmarks.bench_general_stats --loans 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from src.models.base import Base
+from src.models.books import Book
+from src.models.counters import LibraryCounter
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.counters import CounterRepository
+from src.services.stats import StatsService
+
+
+def legacy_general_stats(db):
+    """
+    Implémentation d'origine : sept allers-retours.
+    """
+    return {
+        "total_books": db.query(func.sum(Book.quantity)).scalar() or 0,
+        "unique_books": db.query(func.count(Book.id)).scalar() or 0,
+        "total_users": db.query(func.count(User.id)).scalar() or 0,
+        "active_users": db.query(func.count(User.id)).filter(User.is_active == True).scalar() or 0,
+        "total_loans": db.query(func.count(Loan.id)).scalar() or 0,
+        "active_loans": db.query(func.count(Loan.id)).filter(Loan.return_date == None).scalar() or 0,
+        "overdue_loans": overdue_loans(db),
+    }
+
+
+def overdue_loans(db) -> int:
+    return db.query(func.count(Loan.id)).filter(
+        Loan.return_date == None,
+        Loan.due_date < datetime.utcnow()
+    ).scalar() or 0
+
+
+def aggregate_general_stats(db):
+    """
+    Agrégat conditionnel recalculé à chaque appel, plus le comptage des retards.
+    """
+    return {
+        **CounterRepository(LibraryCounter, db).compute_counters(),
+        "overdue_loans": overdue_loans(db),
+    }
+
+
+def seed(engine, books: int, users: int, loans: int, batch: int = 50_000) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"title": f"Book {i}", "author": f"Author {i % 500}", "isbn": f"{i:013d}",
+             "publication_year": 1950 + i % 70, "quantity": i % 5}
+            for i in range(1, books + 1)
+        ])
+        conn.execute(insert(User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x", "full_name": f"User {i}",
+             "is_active": i % 10 != 0, "is_admin": False}
+            for i in range(1, users + 1)
+        ])
+        for start in range(0, loans, batch):
+            rows = []
+            for i in range(start, min(start + batch, loans)):
+                loan_date = now - timedelta(days=i % 400)
+                returned = i % 3 != 0
+                rows.append({
+                    "user_id": 1 + i % users,
+                    "book_id": 1 + i % books,
+                    "loan_date": loan_date,
+                    "due_date": loan_date + timedelta(days=14),
+                    "return_date": loan_date + timedelta(days=7) if returned else None,
+                    "extended": False,
+                })
+            conn.execute(insert(Loan), rows)
+
+
+def measure(engine, fn, repeat: int):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    session = sessionmaker(bind=engine)()
+    try:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(session)
+        elapsed = (time.perf_counter() - started) / repeat
+    finally:
+        session.close()
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements) // repeat, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--loans", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_stats.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    print(f"Insertion de {args.loans} emprunts...")
+    seed(engine, args.books, args.users, args.loans)
+
+    # Les lignes ont été insérées directement : construire les compteurs une fois
+    with sessionmaker(bind=engine)() as db:
+        StatsService(db).rebuild_counters()
+
+    cases = [
+        ("par indicateur", legacy_general_stats),
+        ("agrégat", aggregate_general_stats),
+        ("compteurs", lambda db: StatsService(db).get_general_stats()),
+    ]
+    print(f"{'implémentation':<16}{'requêtes':>10}{'latence (ms)':>15}")
+    expected = None
+    for label, fn in cases:
+        result, queries, elapsed = measure(engine, fn, args.repeat)
+        assert expected is None or result == expected, (label, result, expected)
+        expected = result
+        print(f"{label:<16}{queries:>10}{elapsed * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
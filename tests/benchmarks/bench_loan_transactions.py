@@ -0,0 +1,85 @@
+"""
+Nombre de commits (fsync), de requêtes et latence par opération d'emprunt.
+
+Chaque emprunt/retour de LoanService doit se faire en une seule transaction :
+un commit, sans SELECT de rafraîchissement entre les écritures.
+
+    python -m tests.benchmarks.bench_loan_transactions --repeat 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.models.base import Base
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_transactions.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    books = [
+        Book(title=f"Book {i}", author="Author", isbn=f"{i:013d}", publication_year=2000, quantity=10)
+        for i in range(100)
+    ]
+    session.add_all([user] + books)
+    session.commit()
+    user_id, book_ids = user.id, [book.id for book in books]
+
+    service = LoanService(
+        LoanRepository(Loan, session),
+        BookRepository(Book, session),
+        UserRepository(User, session)
+    )
+
+    totals = {"borrow": [0, 0, 0.0], "return": [0, 0, 0.0]}
+    current = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        totals[current[0]][0] += 1
+
+    @event.listens_for(engine, "commit")
+    def count_commit(*_):
+        totals[current[0]][1] += 1
+
+    for i in range(args.repeat):
+        current[:] = ["borrow"]
+        started = time.perf_counter()
+        loan = service.create_loan(user_id=user_id, book_id=book_ids[i % len(book_ids)])
+        loan_id = loan.id
+        totals["borrow"][2] += time.perf_counter() - started
+
+        current[:] = ["return"]
+        started = time.perf_counter()
+        service.return_loan(loan_id=loan_id)
+        totals["return"][2] += time.perf_counter() - started
+
+    session.close()
+    print(f"{'opération':<12}{'requêtes':>10}{'commits':>10}{'latence (ms)':>15}")
+    for name, (statements, commits, elapsed) in totals.items():
+        print(
+            f"{name:<12}{statements / args.repeat:>10.1f}{commits / args.repeat:>10.1f}"
+            f"{elapsed / args.repeat * 1000:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark du profil SQLite (db/session.py).
+
+Lance des threads lecteurs et écrivains concurrents, comme le threadpool de
+FastAPI, sur un fichier SQLite : moteur d'origine (check_same_thread seul,
+journal DELETE, synchronous FULL) contre le profil de Settings (WAL,
+synchronous NORMAL, busy_timeout, cache, mmap, pool dimensionné).
+
+    python -m tests.benchmarks.bench_sqlite_profile --threads 16 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.db.session import create_db_engine
+from src.models.base import Base
+from src.models.books import Book
+
+
+def legacy_engine(url: str):
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def seed(engine, books: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"title": f"Book {i}", "author": f"Author {i % 500}", "isbn": f"{i:013d}",
+             "publication_year": 1950 + i % 70, "quantity": 5}
+            for i in range(1, books + 1)
+        ])
+
+
+def run(engine, threads: int, writers: int, seconds: float, books: int):
+    Session = sessionmaker(bind=engine)
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(writer: bool) -> None:
+        rng = random.Random()
+        done = locked = 0
+        while time.perf_counter() < deadline:
+            session = Session()
+            try:
+                if writer:
+                    session.execute(
+                        update(Book).where(Book.id == rng.randint(1, books))
+                        .values(quantity=Book.quantity + 1, updated_at=datetime.utcnow())
+                    )
+                    session.commit()
+                else:
+                    session.query(Book).filter(Book.id == rng.randint(1, books)).one()
+                    session.query(func.count(Book.id)).filter(Book.author == f"Author {rng.randint(0, 499)}").scalar()
+                done += 1
+            except OperationalError:
+                session.rollback()
+                locked += 1
+            finally:
+                session.close()
+        with lock:
+            counts["writes" if writer else "reads"] += done
+            counts["locked"] += locked
+
+    workers = [threading.Thread(target=worker, args=(i < writers,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--books", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'profil':>10} {'lectures/s':>12} {'écritures/s':>12} {'verrouillé':>11}")
+    for label, factory in [("origine", legacy_engine), ("tuned", create_db_engine)]:
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            engine = factory(url)
+            Base.metadata.create_all(engine)
+            seed(engine, args.books)
+            counts = run(engine, args.threads, args.writers, args.seconds, args.books)
+            engine.dispose()
+        print(
+            f"{label:>10} {counts['reads'] / args.seconds:>12.0f} "
+            f"{counts['writes'] / args.seconds:>12.0f} {counts['locked']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
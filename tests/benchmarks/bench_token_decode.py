@@ -0,0 +1,65 @@
+"""
+Micro-benchmark de la vérification des tokens JWT.
+
+Compare jwt.decode à chaque requête à decode_access_token (claims en cache
+jusqu'à l'expiration du token), pour un petit nombre de tokens réutilisés
+comme le fait le frontend. --profile affiche le profil cProfile des deux variantes.
+
+    python -m tests.benchmarks.bench_token_decode --calls 50000 --tokens 10 --profile
+"""
+import argparse
+import cProfile
+import pstats
+import time
+
+from jose import jwt
+
+from src.config import settings
+from src.utils.security import ALGORITHM, create_access_token, decode_access_token, token_cache
+
+
+def legacy_decode(token: str) -> dict:
+    """
+    Implémentation d'origine : vérification de la signature à chaque appel.
+    """
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+
+def run(decode, tokens, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        decode(tokens[i % len(tokens)])
+    return time.perf_counter() - start
+
+
+def profile(decode, tokens, calls: int) -> None:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    run(decode, tokens, calls)
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(8)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    tokens = [create_access_token(subject=i) for i in range(1, args.tokens + 1)]
+
+    for name, decode in (("jwt.decode", legacy_decode), ("decode_access_token", decode_access_token)):
+        token_cache.clear()
+        elapsed = run(decode, tokens, args.calls)
+        print(f"{name:<20} {args.calls} appels  {elapsed:.3f} s  {elapsed / args.calls * 1e6:.1f} µs/appel")
+
+    if args.profile:
+        for name, decode in (("jwt.decode", legacy_decode), ("decode_access_token", decode_access_token)):
+            token_cache.clear()
+            print(f"\n--- {name} ---")
+            profile(decode, tokens, args.calls)
+
+
+if __name__ == "__main__":
+    main()
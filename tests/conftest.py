@@ -4,8 +4,9 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from src.models.base import Base
-from src.db.session import get_db
+from src.db.session import get_db, get_read_db, get_write_db
 from src.main import app
+from src.services.users import auth_user_cache
 
 
 @pytest.fixture(scope="session")
@@ -36,6 +37,8 @@ def db_session(engine):
     session.close()
     transaction.rollback()
     connection.close()
+    # Les identifiants sont réutilisés d'un test à l'autre après le rollback
+    auth_user_cache.clear()
 
 
 @pytest.fixture(scope="function")
@@ -50,6 +53,8 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_write_db] = override_get_db
     
     from fastapi.testclient import TestClient
     with TestClient(app) as client:
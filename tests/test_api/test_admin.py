@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_user
+from src.main import app
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+
+URL = "/api/v2/admin/api/admin/users_loans"
+
+
+def _login_as_admin(db_session: Session) -> User:
+    admin = User(email="root@example.com", hashed_password="x", full_name="Admin", is_admin=True)
+    db_session.add(admin)
+    db_session.commit()
+    app.dependency_overrides[get_current_user] = lambda: admin
+    return admin
+
+
+def _create_users_with_loans(db_session: Session, count: int, start: int = 0):
+    book = Book(title="Book", author="Author", isbn=f"978{start:010d}", publication_year=2020, quantity=1)
+    db_session.add(book)
+    now = datetime.utcnow()
+    for i in range(start, start + count):
+        user = User(email=f"user{i}@example.com", hashed_password="x", full_name=f"User {i}")
+        user.loans = [
+            Loan(book=book, loan_date=now, due_date=now + timedelta(days=14)),
+            Loan(book=book, loan_date=now, due_date=now + timedelta(days=7), return_date=now)
+        ]
+        db_session.add(user)
+    db_session.commit()
+
+
+def _count_statements(db_session: Session, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_users_loans_query_count_is_constant(client, db_session: Session):
+    """
+    Teste que le nombre de requêtes ne dépend pas du nombre d'utilisateurs.
+    """
+    _login_as_admin(db_session)
+    _create_users_with_loans(db_session, 5)
+    response, small = _count_statements(db_session, lambda: client.get(URL))
+    assert response.status_code == 200
+    # Sans cursor=true, la réponse reste la liste complète
+    assert len(response.json()) == 6
+
+    _create_users_with_loans(db_session, 55, start=5)
+    response, large = _count_statements(db_session, lambda: client.get(URL))
+    assert response.status_code == 200
+    items = response.json()
+    assert len(items) == 61
+    assert sum(len(item["loans"]) for item in items) == 120
+    assert len(large) == len(small)
+    # Une requête pour la page d'utilisateurs, une seule pour tous leurs emprunts
+    assert sum("FROM loan" in statement for statement in large) == 1
+
+
+def test_users_loans_pagination_and_stream(client, db_session: Session):
+    """
+    Teste la pagination par curseur et la sortie NDJSON.
+    """
+    admin = _login_as_admin(db_session)
+    _create_users_with_loans(db_session, 4)
+
+    seen = []
+    after = None
+    while True:
+        params = {"cursor": True, "limit": 2, **({"after": after} if after else {})}
+        page = client.get(URL, params=params).json()
+        seen += [item["user"]["id"] for item in page["items"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert len(seen) == 5 and seen == sorted(seen)
+
+    response = client.get(URL, params={"stream": True})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["user"]["id"] for row in rows] == seen
+    assert rows[0]["user"]["id"] == admin.id and rows[0]["loans"] == []
+    assert len(rows[1]["loans"]) == 2
+
+    assert client.get(URL, params={"cursor": True, "after": "not-a-cursor"}).status_code == 400
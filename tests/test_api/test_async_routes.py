@@ -0,0 +1,243 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from src.db.session import get_async_read_db, get_async_write_db
+from src.main import app
+from src.models.base import Base
+from src.models.books import Book
+from src.models.categories import Category
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.utils.cache import invalidate_cache
+from src.utils import security
+from src.utils.security import create_access_token
+
+API = "/api/v2"
+
+
+@pytest.fixture(scope="function")
+def async_env(tmp_path):
+    """
+    Base SQLite sur fichier partagée par une session synchrone (données de test)
+    et les sessions asynchrones des routes async def.
+    """
+    path = os.path.join(tmp_path, "async.db")
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_async_read_db] = override_async_db
+    app.dependency_overrides[get_async_write_db] = override_async_db
+    with Session(sync_engine) as db:
+        admin = User(email="admin@example.com", hashed_password="x", full_name="Admin", is_admin=True)
+        db.add(admin)
+        db.add_all([
+            Book(title=f"Python {i}", author="Author", isbn=f"{i:013d}", publication_year=2020, quantity=1)
+            for i in range(3)
+        ])
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+        with TestClient(app) as client:
+            yield client, headers, db
+    app.dependency_overrides = {}
+    sync_engine.dispose()
+
+
+def test_async_book_list_and_search(async_env):
+    """
+    Teste la liste et la recherche de livres servies par les routes asynchrones.
+    """
+    client, headers, db = async_env
+
+    page = client.get(f"{API}/books/", headers=headers).json()
+    assert page["total"] == 3 and [book["title"] for book in page["items"]] == ["Python 0", "Python 1", "Python 2"]
+    assert page["items"][0]["categories"] == []
+
+    page = client.get(f"{API}/books/", headers=headers, params={"cursor": True, "limit": 2}).json()
+    assert len(page["items"]) == 2 and page["next_cursor"]
+    page = client.get(f"{API}/books/", headers=headers, params={"after": page["next_cursor"], "limit": 2}).json()
+    assert [book["title"] for book in page["items"]] == ["Python 2"]
+
+    page = client.get(f"{API}/books/search/", headers=headers, params={"query": "pyth"}).json()
+    assert page["total"] == 3
+
+    # Recherche classée par pertinence : pas de curseur sans tri explicite
+    response = client.get(f"{API}/books/search/", headers=headers, params={"query": "pyth", "cursor": True})
+    assert response.status_code == 400
+    page = client.get(f"{API}/books/search/", headers=headers,
+                      params={"query": "pyth", "cursor": True, "sort_by": "title", "limit": 2}).json()
+    assert [book["title"] for book in page["items"]] == ["Python 0", "Python 1"] and page["next_cursor"]
+
+    me = client.get(f"{API}/auth/me", headers=headers).json()
+    assert me["email"] == "admin@example.com"
+    assert client.get(f"{API}/auth/me", headers={"Authorization": "Bearer invalid"}).status_code == 401
+
+
+def test_async_book_listing_query_count(async_env):
+    """
+    Teste que la liste et la recherche chargent les catégories en une seule requête :
+    total, page, catégories.
+    """
+    client, headers, db = async_env
+    categories = [Category(name=f"Catégorie {i}") for i in range(3)]
+    for i, book in enumerate(db.query(Book).all()):
+        book.categories = categories[:i + 1]
+    db.add_all([
+        Book(title=f"Python extra {i}", author="Author", isbn=f"978{i:010d}", publication_year=2021,
+             quantity=1, categories=categories)
+        for i in range(30)
+    ])
+    db.commit()
+    client.get(f"{API}/books/", headers=headers)  # utilisateur courant mis en cache
+
+    for url, params in ((f"{API}/books/", {}), (f"{API}/books/search/", {"query": "python"})):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(Engine, "before_cursor_execute", listener)
+        try:
+            page = client.get(url, headers=headers, params=params).json()
+        finally:
+            event.remove(Engine, "before_cursor_execute", listener)
+        assert page["total"] == 33 and len(page["items"][-1]["categories"]) == 3
+        assert len(statements) == 3
+
+
+def test_async_search_facets(async_env):
+    """
+    Teste les comptes par facette de la recherche : plafond par facette et cache
+    par filtres normalisés.
+    """
+    client, headers, db = async_env
+    invalidate_cache()
+    novels = Category(name="Romans")
+    db.add_all([
+        Book(title=f"Python extra {i}", author="Author", isbn=f"978{i:010d}", publication_year=1960 + 10 * i,
+             quantity=i % 2, language="fr", categories=[novels])
+        for i in range(6)
+    ])
+    db.commit()
+
+    page = client.get(f"{API}/books/search/", headers=headers,
+                      params={"query": "python", "facets": True, "facet_limit": 3, "limit": 2}).json()
+    assert page["total"] == 9 and len(page["items"]) == 2
+    facets = page["facets"]
+    assert facets["category"] == [{"value": str(novels.id), "label": "Romans", "count": 6}]
+    assert {(f["value"], f["count"]) for f in facets["availability"]} == {("available", 6), ("unavailable", 3)}
+    assert [(f["value"], f["count"]) for f in facets["decade"]] == [("2020", 3), ("1960", 1), ("1970", 1)]
+    assert {(f["value"], f["count"]) for f in facets["language"]} == {(None, 3), ("fr", 6)}
+    assert client.get(f"{API}/books/search/", headers=headers, params={"query": "python"}).json()["facets"] is None
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(Engine, "before_cursor_execute", listener)
+    try:
+        again = client.get(f"{API}/books/search/", headers=headers,
+                           params={"query": " PYTHON ", "facets": True, "facet_limit": 3, "limit": 2}).json()
+    finally:
+        event.remove(Engine, "before_cursor_execute", listener)
+    assert again["facets"] == facets
+    assert len(statements) == 3  # total, page, catégories : les facettes viennent du cache
+
+    # L'auteur est normalisé de la même façon pour le filtre et la clé du cache
+    for author, count in (("author", 9), (" AUTHOR ", 9)):
+        page = client.get(f"{API}/books/search/", headers=headers,
+                          params={"query": "python", "author": author, "facets": True}).json()
+        assert page["total"] == count and sum(f["count"] for f in page["facets"]["availability"]) == count
+
+    # Une variation de stock invalide les comptes de disponibilité
+    book_id = db.query(Book.id).filter(Book.isbn == f"{0:013d}").scalar()
+    assert client.post(f"{API}/books/{book_id}/borrow", headers=headers).status_code == 200
+    page = client.get(f"{API}/books/search/", headers=headers, params={"query": "python", "facets": True}).json()
+    assert sum(f["count"] for f in page["facets"]["availability"] if f["value"] == "available") == 5
+
+
+def test_async_login(async_env, monkeypatch):
+    """
+    Teste la connexion par la route asynchrone, avec recalcul du hash si le coût bcrypt change.
+    """
+    client, headers, db = async_env
+    monkeypatch.setattr(security.password_hasher, "workers", 0)
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    user = User(email="reader@example.com", hashed_password=security.pwd_context.hash("password123"),
+                full_name="Reader")
+    db.add(user)
+    db.commit()
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=5))
+
+    response = client.post(f"{API}/auth/login", data={"username": user.email, "password": "wrong"})
+    assert response.status_code == 401
+    response = client.post(f"{API}/auth/login", data={"username": user.email, "password": "password123"})
+    assert response.status_code == 200 and response.json()["token_type"] == "bearer"
+    db.expire_all()
+    assert db.get(User, user.id).hashed_password.startswith("$2b$05$")
+
+
+def test_async_borrow_and_return(async_env):
+    """
+    Teste l'emprunt et le retour par les routes asynchrones.
+    """
+    client, headers, db = async_env
+    book_id = db.query(Book.id).filter(Book.isbn == f"{0:013d}").scalar()
+
+    response = client.post(f"{API}/loans/{book_id}/borrow", headers=headers)
+    assert response.status_code == 200
+    response = client.post(f"{API}/loans/{book_id}/borrow", headers=headers)
+    assert response.status_code == 400
+
+    loan_id = db.query(Loan.id).filter(Loan.book_id == book_id).scalar()
+    response = client.post(f"{API}/loans/{loan_id}/return", headers=headers)
+    assert response.status_code == 200
+    loan = response.json()
+    assert loan["return_date"] is not None and loan["book"]["id"] == book_id
+
+    # Les statistiques en cache suivent le stock modifié par la route asynchrone
+    invalidate_cache("src.repositories.books")
+    assert BookRepository(Book, db).get_stats()["total_books"] == 3
+    response = client.post(f"{API}/books/{book_id}/borrow", headers=headers)
+    assert response.status_code == 200
+    response = client.post(f"{API}/books/{book_id}/borrow", headers=headers)
+    assert response.status_code == 400
+    db.expire_all()
+    assert db.get(Book, book_id).quantity == 0
+    assert BookRepository(Book, db).get_stats()["total_books"] == 2
+
+
+def test_async_batch_checkout_and_return(async_env):
+    """
+    Teste les routes d'emprunt et de retour par lot.
+    """
+    client, headers, db = async_env
+    admin_id = db.query(User.id).scalar()
+    book_ids = [book_id for book_id, in db.query(Book.id).order_by(Book.id)]
+
+    response = client.post(f"{API}/loans/batch-checkout", headers=headers,
+                           json={"user_id": admin_id, "book_ids": book_ids + [999]})
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["succeeded"], report["failed"]) == (3, 1)
+    loan_ids = [item["loan_id"] for item in report["items"][:3]]
+
+    isbn = db.query(Book.isbn).filter(Book.id == book_ids[2]).scalar()
+    response = client.post(f"{API}/loans/batch-return", headers=headers,
+                           json={"loan_ids": loan_ids[:2], "isbns": [isbn]})
+    assert response.json()["succeeded"] == 3
+    db.expire_all()
+    assert [book.quantity for book in db.query(Book).order_by(Book.id)] == [1, 1, 1]
+
+    assert client.post(f"{API}/loans/batch-return", headers=headers, json={}).status_code == 400
+    assert client.post(f"{API}/loans/batch-checkout", headers=headers,
+                       json={"user_id": 999, "book_ids": book_ids}).status_code == 400
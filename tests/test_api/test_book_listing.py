@@ -0,0 +1,38 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_active_user
+from src.main import app
+from src.models.books import Book
+from src.models.categories import Category
+from src.models.users import User
+
+API = "/api/v2"
+
+
+def test_title_search_loads_categories_in_one_query(client, db_session: Session):
+    """
+    Teste que les catégories des livres listés sont chargées en une seule requête.
+    """
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=0, is_active=True)
+    categories = [Category(name=f"Catégorie {i}") for i in range(3)]
+    db_session.add_all([
+        Book(title=f"Roman {i}", author="Author", isbn=f"978{i:010d}", publication_year=2020,
+             quantity=1, categories=categories[:1 + i % 3])
+        for i in range(20)
+    ])
+    db_session.commit()
+    db_session.expire_all()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        response = client.get(f"{API}/books/search/title/Roman")
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    books = response.json()
+    assert len(books) == 20 and len(books[2]["categories"]) == 3
+    assert len(statements) == 2
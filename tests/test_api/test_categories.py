@@ -0,0 +1,62 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_active_user
+from src.main import app
+from src.models.books import Book
+from src.models.categories import Category
+from src.models.users import User
+
+API = "/api/v2"
+
+
+def _create_catalog(db_session: Session):
+    novels, essays, empty = Category(name="Romans"), Category(name="Essais"), Category(name="Vide")
+    db_session.add_all([novels, essays, empty])
+    db_session.add_all([
+        Book(title=f"Book {i}", author="Author", isbn=f"978{i:010d}", publication_year=2020, quantity=1,
+             categories=[novels, essays] if i % 3 == 0 else [novels])
+        for i in range(25)
+    ])
+    db_session.commit()
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=0, is_active=True)
+    return novels, essays, empty
+
+
+def test_categories_with_counts(client, db_session: Session):
+    """
+    Teste le nombre de livres par catégorie.
+    """
+    _create_catalog(db_session)
+
+    categories = client.get(f"{API}/categories/", params={"with_counts": True}).json()
+    assert [(c["name"], c["book_count"]) for c in categories] == [("Romans", 25), ("Essais", 9), ("Vide", 0)]
+    assert "book_count" not in client.get(f"{API}/categories/").json()[0]
+
+
+def test_category_books_keyset_pages(client, db_session: Session):
+    """
+    Teste la pagination par curseur des livres d'une catégorie.
+    """
+    _, essays, _ = _create_catalog(db_session)
+
+    titles, after = [], None
+    while True:
+        params = {"limit": 4, **({"after": after} if after else {})}
+        page = client.get(f"{API}/categories/{essays.id}/books", params=params).json()
+        titles += [book["title"] for book in page["items"]]
+        after = page["next_cursor"]
+        if not after:
+            break
+    assert titles == [f"Book {i}" for i in range(0, 25, 3)]
+    assert client.get(f"{API}/categories/999/books").status_code == 404
+
+
+def test_book_category_reverse_index_is_used(db_session: Session):
+    """
+    Teste que la recherche par catégorie passe par l'index (category_id, book_id).
+    """
+    plan = db_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT book_id FROM book_category WHERE category_id = 1"
+    )).all()
+    assert "idx_book_category_category_book" in " ".join(str(row[-1]) for row in plan)
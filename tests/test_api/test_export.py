@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_admin_user
+from src.main import app
+from src.models.books import Book
+from src.models.users import User
+from src.utils.export import iter_csv, iter_ndjson
+
+URL = "/api/v2/export"
+
+
+def _login_as_admin():
+    app.dependency_overrides[get_current_admin_user] = lambda: User(id=0, is_admin=True)
+
+
+def test_export_books_ndjson_and_csv(client, db_session: Session):
+    """
+    Teste l'export des livres en NDJSON et en CSV.
+    """
+    _login_as_admin()
+    db_session.add_all([
+        Book(title=f"Book {i}", author="Author", isbn=f"{i:013d}", publication_year=2020, quantity=i + 1)
+        for i in range(3)
+    ])
+    db_session.commit()
+
+    response = client.get(f"{URL}/books")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Book 0", "Book 1", "Book 2"]
+    assert rows[2]["quantity"] == 3
+    datetime.fromisoformat(rows[0]["created_at"])
+
+    response = client.get(f"{URL}/books", params={"format": "csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["isbn"] for row in rows] == [f"{i:013d}" for i in range(3)]
+
+
+def test_export_users_updated_since_hides_password(client, db_session: Session):
+    """
+    Teste le filtre updated_since et l'exclusion du mot de passe haché.
+    """
+    _login_as_admin()
+    old = datetime.utcnow() - timedelta(days=30)
+    db_session.add_all([
+        User(email="old@example.com", hashed_password="x", full_name="Old", updated_at=old),
+        User(email="new@example.com", hashed_password="x", full_name="New")
+    ])
+    db_session.commit()
+
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    response = client.get(f"{URL}/users", params={"updated_since": since})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["email"] for row in rows] == ["new@example.com"]
+    assert "hashed_password" not in rows[0]
+
+    assert client.get(f"{URL}/unknown").status_code == 422
+    assert client.get(f"{URL}/books", params={"format": "xml"}).status_code == 422
+
+
+def test_export_serializers_chunk_rows():
+    """
+    Teste le regroupement des lignes en morceaux.
+    """
+    rows = [{"id": i, "at": datetime(2024, 1, 1)} for i in range(5)]
+    chunks = list(iter_ndjson(rows, chunk_rows=2))
+    assert len(chunks) == 3
+    assert json.loads(chunks[0].splitlines()[0]) == {"id": 0, "at": "2024-01-01T00:00:00"}
+
+    chunks = list(iter_csv(rows, ["id", "at"], chunk_rows=2))
+    assert "".join(chunks).splitlines() == ["id,at"] + [f"{i},2024-01-01T00:00:00" for i in range(5)]
@@ -0,0 +1,35 @@
+import json
+
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_admin_user
+from src.main import app
+from src.models.books import Book
+from src.models.users import User
+
+URL = "/api/v2/books/import"
+
+
+def test_import_books_endpoint(client, db_session: Session):
+    """
+    Teste l'import d'un catalogue JSONL par l'API.
+    """
+    app.dependency_overrides[get_current_admin_user] = lambda: User(id=0, is_admin=True)
+    content = "\n".join(
+        json.dumps({"title": f"Book {i}", "author": "Author", "isbn": f"97800000000{i:02d}",
+                    "publication_year": 2020, "quantity": 1})
+        for i in range(25)
+    ) + "\n{\"title\": \"\"}\n"
+
+    response = client.post(
+        URL, params={"batch_size": 10}, files={"file": ("catalog.jsonl", content, "application/x-ndjson")}
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["received"], report["created"], report["failed"]) == (26, 25, 1)
+    assert report["errors"][0]["line"] == 26
+    assert report["rows_per_second"] > 0
+    assert db_session.query(Book).count() == 25
+
+    response = client.post(URL, params={"format": "xml"}, files={"file": ("catalog.xml", "", "text/xml")})
+    assert response.status_code == 400
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.api.dependencies import get_current_active_user, get_current_admin_user
+from src.main import app
+from src.models.books import Book
+from src.models.categories import Category
+from src.models.loans import Loan
+from src.models.users import User
+
+API = "/api/v2"
+
+
+def _create_loans(db_session: Session, count: int) -> None:
+    categories = [Category(name=f"Catégorie {i}") for i in range(3)]
+    users = [User(email=f"reader{i}@example.com", hashed_password="x", full_name=f"Reader {i}") for i in range(5)]
+    books = [
+        Book(title=f"Book {i}", author=f"Author {i}", isbn=f"978{i:010d}", publication_year=2020,
+             quantity=5, categories=categories)
+        for i in range(10)
+    ]
+    now = datetime.utcnow()
+    db_session.add_all([
+        Loan(user=users[i % 5], book=books[i % 10], loan_date=now - timedelta(days=i), due_date=now + timedelta(days=14 - i))
+        for i in range(count)
+    ])
+    db_session.commit()
+    db_session.expire_all()
+
+
+def _get(client, db_session: Session, url: str, **params):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        response = client.get(url, params=params)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    return response, statements
+
+
+def test_loan_lists_compact_and_expanded(client, db_session: Session):
+    """
+    Teste la vue compacte des listes d'emprunts et la forme complète via ?expand.
+    """
+    app.dependency_overrides[get_current_admin_user] = lambda: User(id=0, is_active=True, is_admin=True)
+    _create_loans(db_session, 40)
+
+    compact, statements = _get(client, db_session, f"{API}/loans/")
+    assert compact.status_code == 200
+    loans = compact.json()
+    assert len(loans) == 40 and len(statements) == 1
+    assert (loans[0]["book_title"], loans[0]["book_author"], loans[0]["user_full_name"]) == (
+        "Book 0", "Author 0", "Reader 0"
+    )
+    assert "book" not in loans[0]
+
+    expanded, statements = _get(client, db_session, f"{API}/loans/", expand="book,user")
+    loans = expanded.json()
+    assert loans[0]["book"]["title"] == "Book 0" and len(loans[0]["book"]["categories"]) == 3
+    assert loans[0]["user"]["full_name"] == "Reader 0"
+    assert len(statements) == 4  # emprunts, livres, catégories, utilisateurs
+    assert len(expanded.content) > 2 * len(compact.content)
+
+    loans = client.get(f"{API}/loans/overdue/", params={"expand": "book"}).json()
+    assert loans and loans[0]["book"]["id"] and loans[0]["user"] is None
+    assert len(client.get(f"{API}/loans/active/").json()) == 40
+
+    assert client.get(f"{API}/loans/", params={"expand": "author"}).status_code == 400
+
+
+def test_my_loans_filters_pages_and_summary(client, db_session: Session):
+    """
+    Teste /loans/me : filtre par statut, pagination par curseur et décompte par statut.
+    """
+    _create_loans(db_session, 40)
+    reader = db_session.query(User).filter(User.email == "reader0@example.com").one()
+    now = datetime.utcnow()
+    loans = db_session.query(Loan).filter(Loan.user_id == reader.id).order_by(Loan.id).all()
+    for loan in loans:
+        loan.due_date = now + timedelta(days=7)
+    loans[0].return_date = now  # retourné
+    loans[1].loan_date, loans[1].due_date = now - timedelta(days=30), now - timedelta(days=2)  # en retard
+    reader_id = reader.id
+    db_session.commit()
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=reader_id, is_active=True)
+
+    response, statements = _get(client, db_session, f"{API}/loans/me", limit=3)
+    page = response.json()
+    assert page["summary"] == {"total": 8, "active": 7, "overdue": 1, "returned": 1}
+    assert [loan["id"] for loan in page["items"]] == [loan.id for loan in reversed(loans[-3:])]
+    assert page["items"][0]["book_title"] and page["next_cursor"]
+    assert len(statements) == 2  # page, décompte
+
+    page = client.get(f"{API}/loans/me", params={"limit": 3, "after": page["next_cursor"]}).json()
+    assert [loan["id"] for loan in page["items"]] == [loan.id for loan in reversed(loans[2:5])]
+
+    overdue = client.get(f"{API}/loans/me", params={"status": "overdue"}).json()
+    assert [loan["id"] for loan in overdue["items"]] == [loans[1].id] and overdue["next_cursor"] is None
+    returned = client.get(f"{API}/loans/me", params={"status": "returned"}).json()
+    assert [loan["id"] for loan in returned["items"]] == [loans[0].id]
+    assert len(client.get(f"{API}/loans/me", params={"status": "active"}).json()["items"]) == 7
+
+    assert client.get(f"{API}/loans/me", params={"status": "lost"}).status_code == 422
+    assert client.get(f"{API}/loans/me", params={"after": "invalide"}).status_code == 400
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.config import settings
+from src.db import session as db_session_module
+from src.db.session import READ_ONLY_KEY, create_db_engine, get_async_engine, get_async_sessionmaker, sqlite_pragmas
+from src.models.counters import LibraryCounter
+from src.repositories.counters import CounterRepository
+
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    """
+    Teste que le profil de pragmas est appliqué à chaque connexion du pool.
+    """
+    engine = create_db_engine(f"sqlite:///{os.path.join(tmp_path, 'app.db')}")
+    try:
+        with engine.connect() as connection:
+            pragma = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == sqlite_pragmas()["busy_timeout"]
+            assert pragma("cache_size") == sqlite_pragmas()["cache_size"]
+            assert pragma("temp_store") == 2  # MEMORY
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_profile_can_be_disabled(tmp_path):
+    """
+    Teste qu'un profil vide laisse les valeurs par défaut de SQLite.
+    """
+    engine = create_db_engine(f"sqlite:///{os.path.join(tmp_path, 'app.db')}", pragmas={})
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    finally:
+        engine.dispose()
+
+
+def test_read_engine_is_query_only_and_not_blocked_by_writer(tmp_path):
+    """
+    Teste que le moteur de lecture refuse les écritures et n'attend pas le verrou d'écriture.
+    """
+    url = f"sqlite:///{os.path.join(tmp_path, 'app.db')}"
+    write_engine = create_db_engine(url)
+    read_engine = create_db_engine(url, read_only=True)
+    try:
+        with write_engine.begin() as connection:
+            connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+            connection.execute(text("INSERT INTO item VALUES (1)"))
+
+        with pytest.raises(OperationalError, match="readonly"):
+            with read_engine.begin() as connection:
+                connection.execute(text("INSERT INTO item VALUES (2)"))
+
+        # Une transaction d'écriture reste ouverte pendant la lecture
+        with write_engine.connect() as writer:
+            writer.exec_driver_sql("BEGIN IMMEDIATE")
+            writer.execute(text("INSERT INTO item VALUES (3)"))
+            started = time.perf_counter()
+            with read_engine.connect() as reader:
+                assert reader.execute(text("SELECT count(*) FROM item")).scalar() == 1
+            assert time.perf_counter() - started < 1
+            writer.rollback()
+    finally:
+        read_engine.dispose()
+        write_engine.dispose()
+
+
+def test_read_session_computes_missing_counters_without_writing(db_session):
+    """
+    Teste qu'une session de lecture calcule les compteurs absents sans les enregistrer.
+    """
+    db_session.info[READ_ONLY_KEY] = True
+    try:
+        counters = CounterRepository(LibraryCounter, db_session).get_counters()
+    finally:
+        db_session.info.pop(READ_ONLY_KEY)
+    assert counters["unique_books"] == 0
+    assert db_session.query(LibraryCounter).count() == 0
+
+
+def test_async_engines_created_on_first_use(tmp_path, monkeypatch):
+    """
+    Teste que les moteurs asynchrones sont créés au premier usage (pas à l'import),
+    avec le pool d'écriture asynchrone dédié.
+    """
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{os.path.join(tmp_path, 'app.db')}")
+    monkeypatch.setattr(settings, "DATABASE_READ_URL", None)
+    monkeypatch.setattr(db_session_module, "_async_engines", {})
+    monkeypatch.setattr(db_session_module, "_async_sessionmakers", {})
+
+    write_engine = get_async_engine()
+    read_engine = get_async_engine(read_only=True)
+    try:
+        assert get_async_engine() is write_engine and read_engine is not write_engine
+        assert write_engine.pool.size() == settings.DB_ASYNC_POOL_SIZE
+        assert read_engine.pool.size() == settings.DB_READ_POOL_SIZE
+        assert get_async_sessionmaker(read_only=True).kw["info"] == {READ_ONLY_KEY: True}
+    finally:
+        write_engine.sync_engine.dispose()
+        read_engine.sync_engine.dispose()
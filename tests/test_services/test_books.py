@@ -6,6 +6,8 @@ from src.models.books import Book as BookModel
 from src.repositories.books import BookRepository
 from src.services.books import BookService
 from src.api.schemas.books import BookCreate, BookUpdate
+from src.utils.cache import cache_stats, invalidate_cache
+from src.utils.importers import iter_records
 
 
 def test_create_book(db_session: Session):
@@ -257,4 +259,206 @@ def test_search_books(db_session: Session):
     
     # Assert
     assert len(python_books) == 2
-    assert all("Python" in book.title for book in python_books)
\ No newline at end of file
+    assert all("Python" in book.title for book in python_books)
+
+def test_search_books_ranked_by_relevance(db_session: Session):
+    """
+    Test du classement BM25 de la recherche plein texte.
+    """
+    # Arrange
+    repository = BookRepository(BookModel, db_session)
+    service = BookService(repository)
+    
+    books_data = [
+        {
+            "title": "Cooking for Beginners",
+            "author": "Alice Martin",
+            "isbn": "1111111111111",
+            "publication_year": 2020,
+            "description": "A short chapter mentions python snakes",
+            "quantity": 1
+        },
+        {
+            "title": "Python Python Python",
+            "author": "Guido Python",
+            "isbn": "2222222222222",
+            "publication_year": 2021,
+            "quantity": 2
+        }
+    ]
+    
+    for book_data in books_data:
+        db_session.add(BookModel(**book_data))
+    
+    db_session.commit()
+    
+    # Act
+    books = service.search(query="pyth")
+    
+    # Assert
+    assert [book.isbn for book in books] == ["2222222222222", "1111111111111"]
+
+
+def test_search_index_follows_update_and_delete(db_session: Session):
+    """
+    Test de la synchronisation de l'index plein texte lors des mises à jour et suppressions.
+    """
+    # Arrange
+    repository = BookRepository(BookModel, db_session)
+    service = BookService(repository)
+    
+    book_model = BookModel(
+        title="Original Title",
+        author="Test Author",
+        isbn="1234567890123",
+        publication_year=2023,
+        quantity=5
+    )
+    db_session.add(book_model)
+    db_session.commit()
+    db_session.refresh(book_model)
+    
+    # Act
+    service.update(db_obj=book_model, obj_in=BookUpdate(title="Renamed Title"))
+    
+    # Assert
+    assert service.search(query="Original") == []
+    assert [book.id for book in service.search(query="Renamed")] == [book_model.id]
+    
+    # Act
+    service.remove(id=book_model.id)
+    
+    # Assert
+    assert service.search(query="Renamed") == []
+
+
+def test_book_stats_cache_shared_across_requests(db_session: Session):
+    """
+    Test du partage du cache des statistiques entre repositories (un par requête).
+    """
+    # Arrange
+    invalidate_cache("src.repositories.books")
+    db_session.add(BookModel(
+        title="Cached Book",
+        author="Cached Author",
+        isbn="1234567890123",
+        publication_year=2020,
+        quantity=4
+    ))
+    db_session.commit()
+    before = cache_stats()
+    
+    # Act
+    results = [BookRepository(BookModel, db_session).get_stats() for _ in range(10)]
+    
+    # Assert
+    after = cache_stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 9
+    assert all(result == results[0] for result in results)
+    assert results[0]["total_books"] == 4
+    
+    # Une écriture invalide le cache
+    BookRepository(BookModel, db_session).create(obj_in={
+        "title": "Another Book",
+        "author": "Cached Author",
+        "isbn": "1234567890124",
+        "publication_year": 2021,
+        "quantity": 1
+    })
+    assert BookRepository(BookModel, db_session).get_stats()["total_books"] == 5
+
+
+def test_bulk_import_dedupes_and_reports_errors(db_session: Session):
+    """
+    Test de l'import en masse : doublons d'ISBN, erreurs par ligne et mise à jour.
+    """
+    repository = BookRepository(BookModel, db_session)
+    service = BookService(repository)
+    service.create(obj_in=BookCreate(
+        title="Existing", author="Author", isbn="9780000000000", publication_year=2000, quantity=1
+    ))
+
+    lines = [
+        "title,author,isbn,publication_year,quantity,pages\n",
+        "Existing,Author,9780000000000,2000,4,\n",
+        "New 1,Author,9780000000001,2001,2,120\n",
+        "New 2,Author,9780000000002,2002,3,\n",
+        "Duplicate,Author,9780000000001,2001,9,\n",
+        "Bad,Author,123,1800x,1,\n",
+    ]
+    report = service.bulk_import(iter_records(lines, "csv"), batch_size=2)
+
+    assert report["received"] == 5
+    assert (report["created"], report["updated"], report["skipped"], report["failed"]) == (2, 0, 2, 1)
+    error, = report["errors"]
+    assert error["line"] == 6 and error["isbn"] == "123"
+    assert "isbn" in error["message"] and "publication_year" in error["message"]
+    assert repository.get_by_isbn(isbn="9780000000001").pages == 120
+    assert repository.get_by_isbn(isbn="9780000000000").quantity == 1
+
+    jsonl = [
+        '{"title": "Existing", "author": "Author", "isbn": "9780000000000", "publication_year": 2000, "quantity": 4}\n',
+        "not json\n",
+    ]
+    report = service.bulk_import(iter_records(jsonl, "jsonl"), update_existing=True)
+    assert (report["updated"], report["failed"]) == (1, 1)
+    db_session.expire_all()
+    assert repository.get_by_isbn(isbn="9780000000000").quantity == 4
+    assert repository.get_stats.__wrapped__(repository)["total_books"] == 4 + 2 + 3
+
+
+def test_bulk_import_partial_update_keeps_other_columns(db_session: Session):
+    """
+    Test de la mise à jour par import d'une ligne partielle : les colonnes absentes sont conservées.
+    """
+    repository = BookRepository(BookModel, db_session)
+    service = BookService(repository)
+    service.create(obj_in=BookCreate(
+        title="Existing", author="Author", isbn="9780000000010", publication_year=2000, quantity=1,
+        description="Description d'origine", language="fr", pages=200
+    ))
+    service.create(obj_in=BookCreate(
+        title="Other", author="Author", isbn="9780000000011", publication_year=2001, quantity=1
+    ))
+
+    jsonl = [
+        '{"title": "Existing v2", "author": "Author", "isbn": "9780000000010", "publication_year": 2000, "quantity": 3}\n',
+        '{"title": "Other", "author": "Author", "isbn": "9780000000011", "publication_year": 2001, "quantity": 2, '
+        '"language": "en"}\n',
+    ]
+    report = service.bulk_import(iter_records(jsonl, "jsonl"), update_existing=True)
+
+    assert (report["updated"], report["failed"]) == (2, 0)
+    db_session.expire_all()
+    existing = repository.get_by_isbn(isbn="9780000000010")
+    assert (existing.title, existing.quantity) == ("Existing v2", 3)
+    assert (existing.description, existing.language, existing.pages) == ("Description d'origine", "fr", 200)
+    assert repository.get_by_isbn(isbn="9780000000011").language == "en"
+
+
+def test_book_cache_invalidated_after_commit(db_session: Session):
+    """
+    Test de l'invalidation du cache des livres au commit de l'unité de travail, pas avant.
+    """
+    # Arrange
+    invalidate_cache("src.repositories.books")
+    repository = BookRepository(BookModel, db_session)
+    service = BookService(repository)
+    assert repository.get_stats()["total_books"] == 0
+
+    # Act
+    with service.unit_of_work():
+        repository.create(obj_in={
+            "title": "Pending Book",
+            "author": "Pending Author",
+            "isbn": "1234567890125",
+            "publication_year": 2022,
+            "quantity": 2
+        })
+        # Avant le COMMIT, le cache n'est pas encore invalidé
+        stats_before_commit = repository.get_stats()
+
+    # Assert
+    assert stats_before_commit["total_books"] == 0
+    assert repository.get_stats()["total_books"] == 2
@@ -0,0 +1,255 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.base import Base
+
+from src.models.books import Book
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.loans import LoanService
+from src.services.stats import StatsService
+from src.utils.cache import invalidate_cache
+
+
+def _loan_service(db_session: Session) -> LoanService:
+    return LoanService(
+        LoanRepository(Loan, db_session),
+        BookRepository(Book, db_session),
+        UserRepository(User, db_session)
+    )
+
+
+def _create_books(db_session: Session, count: int, quantity: int = 2):
+    books = [
+        Book(title=f"Book {i}", author="Author", isbn=f"{i:013d}", publication_year=2020, quantity=quantity)
+        for i in range(count)
+    ]
+    db_session.add_all(books)
+    db_session.commit()
+    return books
+
+
+def test_create_loan_rejects_duplicate_active_loan(db_session: Session):
+    """
+    Teste le refus d'un second emprunt non rendu du même livre.
+    """
+    service = _loan_service(db_session)
+    user = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    db_session.add(user)
+    book, = _create_books(db_session, 1)
+    
+    loan = service.create_loan(user_id=user.id, book_id=book.id)
+    with pytest.raises(ValueError, match="déjà emprunté"):
+        service.create_loan(user_id=user.id, book_id=book.id)
+    
+    # Une fois rendu, le livre peut être emprunté à nouveau
+    service.return_loan(loan_id=loan.id)
+    service.create_loan(user_id=user.id, book_id=book.id)
+
+
+def test_book_stats_follow_borrow_and_return(db_session: Session):
+    """
+    Teste que les statistiques des livres en cache suivent le stock après un emprunt et un retour.
+    """
+    invalidate_cache("src.repositories.books")
+    service = _loan_service(db_session)
+    user = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    db_session.add(user)
+    book, = _create_books(db_session, 1, quantity=3)
+    assert service.book_repository.get_stats()["total_books"] == 3
+
+    loan = service.create_loan(user_id=user.id, book_id=book.id)
+    assert service.book_repository.get_stats()["total_books"] == 2
+
+    service.return_loan(loan_id=loan.id)
+    assert service.book_repository.get_stats()["total_books"] == 3
+
+
+def test_create_loan_limit_is_per_user(db_session: Session):
+    """
+    Teste que la limite de 5 emprunts simultanés ne compte que les emprunts de l'utilisateur.
+    """
+    service = _loan_service(db_session)
+    reader = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    other = User(email="other@example.com", hashed_password="x", full_name="Other")
+    db_session.add_all([reader, other])
+    books = _create_books(db_session, 6)
+    
+    for book in books[:5]:
+        service.create_loan(user_id=other.id, book_id=book.id)
+    for book in books[:5]:
+        service.create_loan(user_id=reader.id, book_id=book.id)
+    
+    with pytest.raises(ValueError, match="limite"):
+        service.create_loan(user_id=reader.id, book_id=books[5].id)
+
+
+def test_concurrent_borrows_never_oversell(tmp_path):
+    """
+    Teste que des emprunts concurrents du même livre ne dépassent jamais le stock.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrency.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    
+    setup = SessionLocal()
+    book = Book(title="Popular Book", author="Author", isbn="1234567890123", publication_year=2020, quantity=5)
+    users = [User(email=f"reader{i}@example.com", hashed_password="x", full_name=f"Reader {i}") for i in range(40)]
+    setup.add_all([book] + users)
+    setup.commit()
+    book_id, user_ids = book.id, [user.id for user in users]
+    setup.close()
+    
+    barrier = threading.Barrier(len(user_ids))
+    outcomes = []
+    
+    def borrow(user_id):
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            _loan_service(session).create_loan(user_id=user_id, book_id=book_id)
+            outcomes.append("ok")
+        except ValueError:
+            outcomes.append("unavailable")
+        except Exception as e:  # pragma: no cover - rendu visible par l'assertion
+            outcomes.append(repr(e))
+        finally:
+            session.close()
+    
+    threads = [threading.Thread(target=borrow, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    check = SessionLocal()
+    try:
+        assert sorted(set(outcomes)) == ["ok", "unavailable"]
+        assert outcomes.count("ok") == 5
+        assert check.get(Book, book_id).quantity == 0
+        assert check.query(Loan).count() == 5
+    finally:
+        check.close()
+        engine.dispose()
+
+
+def test_concurrent_returns_restock_once(tmp_path):
+    """
+    Teste qu'un emprunt retourné par deux sessions concurrentes ne remet l'exemplaire en stock qu'une fois.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'returns.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    setup = SessionLocal()
+    book = Book(title="Book", author="Author", isbn="1234567890123", publication_year=2020, quantity=1)
+    user = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    setup.add_all([book, user])
+    setup.commit()
+    loan = _loan_service(setup).create_loan(user_id=user.id, book_id=book.id)
+    book_id, loan_id = book.id, loan.id
+    setup.close()
+
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Les deux sessions ont lu l'emprunt encore actif avant le premier retour
+        loaded = [session.get(Loan, loan_id) for session in (first, second)]
+        assert all(loan.return_date is None for loan in loaded)
+        _loan_service(first).return_loan(loan_id=loan_id)
+        with pytest.raises(ValueError, match="déjà été retourné"):
+            _loan_service(second).return_loan(loan_id=loan_id)
+
+        second.expire_all()
+        assert second.get(Book, book_id).quantity == 1
+        assert second.get(Loan, loan_id).return_date is not None
+    finally:
+        first.close()
+        second.close()
+        engine.dispose()
+
+
+def test_batch_checkout_and_return(db_session: Session):
+    """
+    Teste l'emprunt et le retour par lot : résultats par élément, stock, compteurs,
+    nombre de requêtes indépendant de la taille du lot.
+    """
+    service = _loan_service(db_session)
+    StatsService(db_session).rebuild_counters()
+    reader = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    db_session.add(reader)
+    books = _create_books(db_session, 6, quantity=1)
+    books[1].quantity = 0
+    db_session.commit()
+    book_ids = [book.id for book in books]
+    reader_id = reader.id
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        report = service.batch_checkout(user_id=reader_id, book_ids=book_ids + [book_ids[0], 999])
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert (report["succeeded"], report["failed"]) == (5, 3)
+    errors = [item["error"] for item in report["items"]]
+    assert errors[0] is None and "disponible" in errors[1] and "déjà emprunté" in errors[6]
+    assert "non trouvé" in errors[7] and errors[2:6] == [None] * 4
+    # utilisateur, stock, emprunts en cours, UPDATE, INSERT, compteurs, mois (+ création de la ligne du mois)
+    assert len(statements) == 8
+    db_session.expire_all()
+    assert [book.quantity for book in books] == [0] * 6
+    assert StatsService(db_session).get_general_stats()["active_loans"] == 5
+
+    # Limite de 5 emprunts simultanés
+    extra = Book(title="Extra", author="Author", isbn="9999999999999", publication_year=2020, quantity=1)
+    db_session.add(extra)
+    db_session.commit()
+    report = service.batch_checkout(user_id=reader.id, book_ids=[extra.id])
+    assert "limite" in report["items"][0]["error"]
+
+    loans = db_session.query(Loan).filter(Loan.user_id == reader.id).order_by(Loan.id).all()
+    report = service.batch_return(
+        loan_ids=[loans[0].id, loans[0].id, 999],
+        isbns=[books[2].isbn, "0000000000999"]
+    )
+    assert [item["success"] for item in report["items"]] == [True, False, False, True, False]
+    assert report["items"][3]["loan_id"] == loans[1].id
+    db_session.expire_all()
+    assert (books[0].quantity, books[2].quantity, books[3].quantity) == (1, 1, 0)
+    assert StatsService(db_session).get_general_stats()["active_loans"] == 3
+
+    with pytest.raises(ValueError):
+        service.batch_return()
+
+
+def test_batch_return_duplicate_isbn_and_stats(db_session: Session):
+    """
+    Teste qu'un ISBN présent N fois dans un lot désigne N emprunts distincts, et
+    que les statistiques des livres en cache suivent le stock des lots.
+    """
+    invalidate_cache("src.repositories.books")
+    service = _loan_service(db_session)
+    readers = [User(email=f"reader{i}@example.com", hashed_password="x", full_name="Reader") for i in range(2)]
+    db_session.add_all(readers)
+    book, = _create_books(db_session, 1, quantity=2)
+    reader_ids = [reader.id for reader in readers]
+    assert service.book_repository.get_stats()["total_books"] == 2
+
+    for reader_id in reader_ids:
+        assert service.batch_checkout(user_id=reader_id, book_ids=[book.id])["succeeded"] == 1
+    assert service.book_repository.get_stats()["total_books"] == 0
+
+    report = service.batch_return(isbns=[book.isbn] * 3)
+    assert [item["success"] for item in report["items"]] == [True, True, False]
+    assert len({item["loan_id"] for item in report["items"][:2]}) == 2
+    assert "Aucun emprunt en cours" in report["items"][2]["error"]
+    assert service.book_repository.get_stats()["total_books"] == 2
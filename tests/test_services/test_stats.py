@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.books import Book
+from src.models.counters import LibraryCounter
+from src.models.loans import Loan
+from src.models.users import User
+from src.repositories.books import BookRepository
+from src.repositories.counters import CounterRepository
+from src.repositories.loans import LoanRepository
+from src.repositories.users import UserRepository
+from src.services.books import BookService
+from src.services.loans import LoanService
+from src.services.stats import StatsService
+from src.services.users import UserService
+from src.api.schemas.books import BookCreate
+from src.api.schemas.users import UserCreate
+
+
+def _count_statements(db_session: Session, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_general_stats_from_counters(db_session: Session):
+    """
+    Teste que les statistiques générales sont justes et lues sans parcourir les tables.
+    """
+    now = datetime.utcnow()
+    book = Book(title="Stats Book", author="Author", isbn="1234567890123", publication_year=2020, quantity=4)
+    other_book = Book(title="Other Book", author="Author", isbn="1234567890124", publication_year=2021, quantity=2)
+    active_user = User(email="active@example.com", hashed_password="x", full_name="Active", is_active=True)
+    inactive_user = User(email="inactive@example.com", hashed_password="x", full_name="Inactive", is_active=False)
+    db_session.add_all([book, other_book, active_user, inactive_user])
+    db_session.flush()
+    db_session.add_all([
+        # Retourné
+        Loan(user_id=active_user.id, book_id=book.id, loan_date=now - timedelta(days=30),
+             due_date=now - timedelta(days=16), return_date=now - timedelta(days=20)),
+        # Actif
+        Loan(user_id=active_user.id, book_id=other_book.id, loan_date=now,
+             due_date=now + timedelta(days=14)),
+        # En retard
+        Loan(user_id=inactive_user.id, book_id=book.id, loan_date=now - timedelta(days=20),
+             due_date=now - timedelta(days=6)),
+    ])
+    db_session.commit()
+    
+    service = StatsService(db_session)
+    # Compteurs construits par la migration ou scripts/rebuild_counters.py
+    service.rebuild_counters()
+    
+    stats, statements = _count_statements(db_session, service.get_general_stats)
+    
+    assert len(statements) == 2
+    assert stats == {
+        "total_books": 6,
+        "unique_books": 2,
+        "total_users": 2,
+        "active_users": 1,
+        "total_loans": 3,
+        "active_loans": 2,
+        "overdue_loans": 1
+    }
+
+
+def test_counters_follow_service_operations(db_session: Session):
+    """
+    Teste que les compteurs restent égaux à un recalcul complet après chaque opération.
+    """
+    counter_repository = CounterRepository(LibraryCounter, db_session)
+    stats_service = StatsService(db_session)
+    stats_service.rebuild_counters()
+    
+    book_service = BookService(BookRepository(Book, db_session))
+    user_service = UserService(UserRepository(User, db_session))
+    loan_service = LoanService(
+        LoanRepository(Loan, db_session),
+        BookRepository(Book, db_session),
+        UserRepository(User, db_session)
+    )
+    
+    book = book_service.create(obj_in=BookCreate(
+        title="Counted Book", author="Author", isbn="9999999999999", publication_year=2020, quantity=3
+    ))
+    user = user_service.create(obj_in=UserCreate(
+        email="counted@example.com", password="password123", full_name="Counted User"
+    ))
+    loan = loan_service.create_loan(user_id=user.id, book_id=book.id)
+    assert counter_repository.get_counters() == counter_repository.compute_counters()
+    
+    loan_service.return_loan(loan_id=loan.id)
+    loan_service.create_loan(user_id=user.id, book_id=book.id)
+    book_service.update_quantity(book_id=book.id, quantity_change=5)
+    assert counter_repository.get_counters() == counter_repository.compute_counters()
+    
+    user_service.remove(id=user.id)
+    book_service.remove(id=book.id)
+    assert counter_repository.get_counters() == counter_repository.compute_counters()
+    
+    month = datetime.utcnow().strftime("%Y-%m")
+    monthly = {row["month"]: row["loan_count"] for row in stats_service.get_monthly_loans()}
+    assert monthly.get(month, 0) == db_session.query(Loan).count()
+
+
+def test_stats_read_has_no_side_effect_before_counters_are_built(db_session: Session):
+    """
+    Teste que les lectures calculent les compteurs et le cumul mensuel absents sans les enregistrer.
+    """
+    book = Book(title="Stats Book", author="Author", isbn="1234567890123", publication_year=2020, quantity=4)
+    user = User(email="reader@example.com", hashed_password="x", full_name="Reader")
+    db_session.add_all([book, user])
+    db_session.flush()
+    now = datetime.utcnow()
+    db_session.add(Loan(user_id=user.id, book_id=book.id, loan_date=now, due_date=now + timedelta(days=14)))
+    db_session.commit()
+
+    service = StatsService(db_session)
+    stats = service.get_general_stats()
+    monthly = service.get_monthly_loans()
+
+    assert (stats["total_books"], stats["active_loans"]) == (4, 1)
+    assert [(row["month"], row["loan_count"]) for row in monthly] == [(now.strftime("%Y-%m"), 1)]
+    assert db_session.query(LibraryCounter).count() == 0
+    assert not db_session.new and not db_session.dirty
@@ -1,9 +1,12 @@
 import pytest
+from sqlalchemy import update
+from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from src.models.users import User
 from src.repositories.users import UserRepository
 from src.services.users import UserService
+from src.utils import security
 from src.api.schemas.users import UserCreate, UserUpdate
 
 
@@ -142,4 +145,59 @@ def test_create_user_email_already_used(db_session: Session):
     
     # Tentative de création avec le même email
     with pytest.raises(ValueError):
-        service.create(obj_in=user_in)
\ No newline at end of file
+        service.create(obj_in=user_in)
+
+
+def test_auth_user_cache(db_session: Session):
+    """
+    Teste le cache des champs d'authentification et son invalidation.
+    """
+    repository = UserRepository(User, db_session)
+    service = UserService(repository)
+
+    user = service.create(obj_in=UserCreate(
+        email="cached@example.com",
+        password="password123",
+        full_name="Cached User"
+    ))
+
+    auth_user = service.get_auth_user(id=user.id)
+    assert (auth_user.id, auth_user.is_active, auth_user.is_admin) == (user.id, True, False)
+
+    # Une modification hors service n'est pas vue tant que l'entrée est en cache
+    db_session.execute(update(User).where(User.id == user.id).values(is_admin=True))
+    assert service.get_auth_user(id=user.id).is_admin is False
+
+    # update invalide l'entrée
+    user = service.update(db_obj=service.get(id=user.id), obj_in=UserUpdate(is_active=False))
+    auth_user = service.get_auth_user(id=user.id)
+    assert auth_user.is_admin is True
+    assert auth_user.is_active is False
+
+    # remove aussi
+    service.remove(id=user.id)
+    assert service.get_auth_user(id=user.id) is None
+
+
+def test_authenticate_rehashes_on_cost_change(db_session: Session, monkeypatch):
+    """
+    Teste que le hash est recalculé à la connexion quand le coût bcrypt change.
+    """
+    monkeypatch.setattr(security.password_hasher, "workers", 0)
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    repository = UserRepository(User, db_session)
+    service = UserService(repository)
+    user = service.create(obj_in=UserCreate(
+        email="rehash@example.com",
+        password="password123",
+        full_name="Rehash User"
+    ))
+    assert user.hashed_password.startswith("$2b$04$")
+
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=5))
+    assert service.authenticate(email="rehash@example.com", password="wrong-password") is None
+    assert user.hashed_password.startswith("$2b$04$")
+
+    user = service.authenticate(email="rehash@example.com", password="password123")
+    assert user.hashed_password.startswith("$2b$05$")
+    assert service.authenticate(email="rehash@example.com", password="password123") is not None
@@ -0,0 +1,253 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.utils.cache import (
+    CacheTier, LRUCache, TieredCache, InMemoryCacheTier, SQLiteCacheTier, _MISSING, cache, invalidate_cache
+)
+
+
+def test_lru_eviction_by_entries():
+    """
+    Teste l'éviction de l'entrée la moins récemment utilisée au-delà de la borne.
+    """
+    backend = LRUCache(max_entries=2)
+    backend.set("ns", "a", 1, 60)
+    backend.set("ns", "b", 2, 60)
+    assert backend.get("ns", "a") == 1  # "a" devient la plus récente
+    backend.set("ns", "c", 3, 60)
+    
+    assert backend.get("ns", "b") is _MISSING
+    assert backend.get("ns", "a") == 1
+    assert backend.get("ns", "c") == 3
+    assert backend.stats()["evictions"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    """
+    Teste que la taille totale reste sous la borne en octets.
+    """
+    backend = LRUCache(max_entries=100, max_bytes=2000)
+    for i in range(10):
+        backend.set("ns", str(i), "x" * 500, 60)
+    
+    stats = backend.stats()
+    assert stats["bytes"] <= 2000
+    assert stats["entries"] < 10
+    assert backend.get("ns", "9") == "x" * 500
+
+
+def test_ttl_expiry():
+    """
+    Teste l'expiration paresseuse et le balayage périodique.
+    """
+    backend = LRUCache(sweep_interval=0)
+    backend.set("ns", "short", 1, 0.01)
+    backend.set("ns", "long", 2, 60)
+    time.sleep(0.02)
+    
+    backend.set("ns", "other", 3, 60)  # déclenche le balayage
+    assert backend.stats()["entries"] == 2
+    assert backend.get("ns", "short") is _MISSING
+    assert backend.get("ns", "long") == 2
+
+
+def test_prefix_invalidation():
+    """
+    Teste l'invalidation par préfixe pointé et l'invalidation globale.
+    """
+    backend = LRUCache()
+    backend.set("src.repositories.books.BookRepository.get_stats", "k", 1, 60)
+    backend.set("src.repositories.loans.LoanRepository.get_stats", "k", 2, 60)
+    
+    backend.invalidate("src.repositories.books")
+    assert backend.get("src.repositories.books.BookRepository.get_stats", "k") is _MISSING
+    assert backend.get("src.repositories.loans.LoanRepository.get_stats", "k") == 2
+    
+    backend.set("src.repositories.books.BookRepository.get_stats", "k", 3, 60)
+    assert backend.get("src.repositories.books.BookRepository.get_stats", "k") == 3
+    
+    backend.invalidate()
+    assert backend.get("src.repositories.loans.LoanRepository.get_stats", "k") is _MISSING
+
+
+def test_concurrent_access():
+    """
+    Teste l'accès concurrent depuis plusieurs threads.
+    """
+    backend = LRUCache(max_entries=50)
+    
+    def worker(n):
+        for i in range(500):
+            backend.set("ns", f"{n}-{i % 80}", i, 60)
+            backend.get("ns", f"{(n + 1) % 8}-{i % 80}")
+            if i % 100 == 0:
+                backend.invalidate("ns")
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    stats = backend.stats()
+    assert stats["entries"] <= 50
+    assert stats["hits"] + stats["misses"] == 8 * 500
+
+
+def test_cache_decorator_ignore_self_and_key():
+    """
+    Teste le partage du cache entre instances et les fonctions de clé explicites.
+    """
+    calls = []
+    
+    class Repository:
+        def __init__(self, session):
+            self.session = session
+        
+        @cache(expiry=60, ignore_self=True)
+        def count(self, kind):
+            calls.append(kind)
+            return len(calls)
+        
+        @cache(expiry=60, key=lambda self, payload: payload["id"])
+        def lookup(self, payload):
+            calls.append(payload["id"])
+            return payload["id"]
+    
+    invalidate_cache(__name__)
+    first, second = Repository(object()), Repository(object())
+    
+    assert first.count("books") == second.count("books") == 1
+    assert second.count(kind="users") == 2
+    assert first.lookup({"id": 7}) == second.lookup({"id": 7}) == 7
+    assert calls == ["books", "users", 7]
+
+
+def test_cache_decorator_skips_unhashable_arguments():
+    """
+    Teste qu'un appel avec des arguments non hashables est exécuté sans être mis en cache.
+    """
+    calls = []
+    
+    @cache(expiry=60)
+    def total(values):
+        calls.append(values)
+        return sum(values)
+    
+    assert total([1, 2]) == 3
+    assert total([1, 2]) == 3
+    assert len(calls) == 2
+
+
+def _two_workers(shared):
+    first = TieredCache(LRUCache(), shared)
+    second = TieredCache(LRUCache(), shared.worker() if isinstance(shared, InMemoryCacheTier) else shared)
+    return first, second
+
+
+def test_tiered_cache_shares_values_and_invalidations():
+    """
+    Teste le partage des valeurs et la diffusion des invalidations entre deux workers.
+    """
+    first, second = _two_workers(InMemoryCacheTier())
+    namespace = "src.repositories.books.BookRepository.get_stats"
+    
+    first.set(namespace, (), {"total_books": 4}, 60)
+    assert second.get(namespace, ()) == {"total_books": 4}
+    assert second.stats()["shared_hits"] == 1
+    
+    first.invalidate("src.repositories.books")
+    assert second.get(namespace, ()) is _MISSING
+    assert first.get(namespace, ()) is _MISSING
+
+
+def test_sqlite_cache_tier_across_processes(tmp_path):
+    """
+    Teste le tier SQLite : deux instances sur le même fichier se comportent comme deux workers.
+    """
+    path = str(tmp_path / "cache.db")
+    first = TieredCache(LRUCache(), SQLiteCacheTier(path))
+    second = TieredCache(LRUCache(), SQLiteCacheTier(path))
+    namespace = "src.repositories.books.BookRepository.get_stats"
+    
+    first.set(namespace, (), {"total_books": 4}, 60)
+    assert second.get(namespace, ()) == {"total_books": 4}
+    # Deuxième lecture servie par le cache local
+    assert second.get(namespace, ()) == {"total_books": 4}
+    assert second.stats()["hits"] == 1
+    
+    first.invalidate("src.repositories")
+    assert second.get(namespace, ()) is _MISSING
+    
+    second.set("other", (1,), "value", 60)
+    second.invalidate()
+    assert first.get("other", (1,)) is _MISSING
+
+
+def test_cache_tier_is_abstract():
+    """
+    Teste qu'un tier partagé doit implémenter toute l'interface.
+    """
+    with pytest.raises(TypeError):
+        CacheTier()
+
+
+def test_shared_tier_rejects_entries_older_than_invalidation(tmp_path):
+    """
+    Teste qu'une valeur calculée avant une invalidation d'un autre worker, mais écrite
+    après, est ignorée à la lecture ; une entrée corrompue est un simple échec.
+    """
+    path = str(tmp_path / "cache.db")
+    first = TieredCache(LRUCache(), SQLiteCacheTier(path))
+    second = TieredCache(LRUCache(), SQLiteCacheTier(path))
+    namespace = "src.repositories.books.BookRepository.get_stats"
+
+    # first relève les invalidations et calcule sa valeur, second invalide entre-temps
+    assert first.get(namespace, ()) is _MISSING
+    second.invalidate("src.repositories.books")
+    first.set(namespace, (), {"total_books": 4}, 60)
+    assert second.get(namespace, ()) is _MISSING
+
+    # Après un nouveau relevé, la valeur écrite est servie
+    assert first.get(namespace, ()) is _MISSING
+    first.set(namespace, (), {"total_books": 5}, 60)
+    assert second.get(namespace, ()) == {"total_books": 5}
+
+    connection = sqlite3.connect(path)
+    connection.execute("UPDATE cache_entry SET value = x'00'")
+    connection.commit()
+    connection.close()
+    assert TieredCache(LRUCache(), SQLiteCacheTier(path)).get(namespace, ()) is _MISSING
+
+
+class _LockedCacheTier(CacheTier):
+    """
+    Tier partagé dont chaque appel échoue comme une base SQLite verrouillée.
+    """
+    def get(self, namespace, key):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, namespace, key, value, expiry):
+        raise sqlite3.OperationalError("database is locked")
+
+    def invalidate(self, prefix=None):
+        raise sqlite3.OperationalError("database is locked")
+
+    def poll_invalidations(self):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_tiered_cache_survives_shared_tier_errors():
+    """
+    Teste qu'un tier partagé indisponible dégrade le cache en cache local sans lever d'erreur.
+    """
+    tiered = TieredCache(LRUCache(), _LockedCacheTier())
+
+    assert tiered.get("ns", (1,)) is _MISSING
+    tiered.set("ns", (1,), "value", 60)
+    assert tiered.get("ns", (1,)) == "value"
+    tiered.invalidate("ns")
+    assert tiered.get("ns", (1,)) is _MISSING
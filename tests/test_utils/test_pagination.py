@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from src.models.books import Book as BookModel
+from src.utils.pagination import PaginationParams, paginate
+
+
+def _create_books(db_session: Session, count: int) -> None:
+    for i in range(count):
+        db_session.add(BookModel(
+            title=f"Book {i % 4}",
+            author="Author",
+            isbn=f"{i:013d}",
+            publication_year=2000 + i,
+            quantity=1
+        ))
+    db_session.commit()
+
+
+def test_cursor_pagination_walks_all_rows(db_session: Session):
+    """
+    Teste que le mode curseur parcourt toutes les lignes une seule fois, dans l'ordre du tri.
+    """
+    _create_books(db_session, 11)
+    query = db_session.query(BookModel)
+    
+    ids = []
+    after = None
+    while True:
+        params = PaginationParams(limit=3, sort_by="title", sort_desc=True, cursor=True, after=after)
+        page = paginate(query, params, BookModel)
+        assert page.total is None
+        ids.extend(book.id for book in page.items)
+        after = page.next_cursor
+        if after is None:
+            break
+    
+    expected = [
+        book.id for book in query.order_by(BookModel.title.desc(), BookModel.id.desc()).all()
+    ]
+    assert ids == expected
+
+
+def test_cursor_pagination_rejects_invalid_cursor(db_session: Session):
+    """
+    Teste le rejet d'un curseur illisible ou émis pour un autre tri.
+    """
+    _create_books(db_session, 3)
+    query = db_session.query(BookModel)
+    
+    page = paginate(query, PaginationParams(limit=1, sort_by="title", cursor=True), BookModel)
+    
+    with pytest.raises(ValueError):
+        paginate(query, PaginationParams(limit=1, after="not-a-cursor"), BookModel)
+    with pytest.raises(ValueError):
+        paginate(query, PaginationParams(limit=1, sort_by="author", after=page.next_cursor), BookModel)
@@ -0,0 +1,82 @@
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+import os
+import threading
+import time
+
+import pytest
+from jose import JWTError
+
+from src.config import settings
+from src.utils.security import (
+    PasswordHasher, PasswordHasherBusy, create_access_token, decode_access_token, token_cache
+)
+
+
+def test_decode_access_token_cached():
+    """
+    Teste que la vérification d'un même token n'est faite qu'une fois.
+    """
+    token_cache.clear()
+    token = create_access_token(subject=42)
+
+    assert decode_access_token(token)["sub"] == "42"
+    assert decode_access_token(token)["sub"] == "42"
+    stats = token_cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_decode_access_token_key_rotation(monkeypatch):
+    """
+    Teste qu'un token signé avec l'ancienne clé est refusé après une rotation.
+    """
+    token_cache.clear()
+    token = create_access_token(subject=42)
+    decode_access_token(token)
+
+    monkeypatch.setattr(settings, "SECRET_KEY", settings.SECRET_KEY + "-rotated")
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+
+
+def test_decode_access_token_expired():
+    """
+    Teste qu'un token expiré est refusé et n'est pas mis en cache.
+    """
+    token_cache.clear()
+    token = create_access_token(subject=42, expires_delta=timedelta(seconds=-1))
+
+    with pytest.raises(JWTError):
+        decode_access_token(token)
+    assert token_cache.stats()["entries"] == 0
+
+
+def test_password_hasher_backpressure():
+    """
+    Teste le refus immédiat d'un calcul lorsque le pool et sa file sont pleins.
+    """
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    worker = threading.Thread(target=hasher.run, args=(time.sleep, 1.0))
+    worker.start()
+    try:
+        while hasher._slots._value:
+            time.sleep(0.01)
+        with pytest.raises(PasswordHasherBusy):
+            hasher.run(abs, -1)
+    finally:
+        worker.join()
+    assert hasher.run(abs, -1) == 1
+    hasher.shutdown()
+
+
+def test_password_hasher_replaces_broken_pool():
+    """
+    Teste qu'un pool cassé (worker tué) est remplacé au calcul suivant.
+    """
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            hasher.run(os._exit, 1)
+        assert hasher.run(abs, -1) == 1
+    finally:
+        hasher.shutdown()